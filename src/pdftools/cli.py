@@ -0,0 +1,166 @@
+"""Command-line entry point: single operations and manifest batches."""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Sequence
+
+from pdftools.core.batch import (
+    FAILED,
+    MERGE,
+    PHOTO_TO_PDF,
+    SPLIT,
+    BatchJob,
+    JobResult,
+    load_manifest,
+    run_batch,
+)
+from pdftools.core.stats import BatchStats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pdftools", description="Merge, split and convert PDFs from the command line."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser(MERGE, help="merge PDFs into one file")
+    merge.add_argument("inputs", nargs="+", type=Path, help="PDFs in merge order")
+    merge.add_argument("-o", "--output", required=True, type=Path, help="merged PDF")
+    merge.add_argument(
+        "--deduplicate", action="store_true", help="store identical streams only once"
+    )
+
+    split = commands.add_parser(SPLIT, help="split a PDF into parts")
+    split.add_argument("input", type=Path, help="PDF to split")
+    split.add_argument("-o", "--output", required=True, type=Path, help="directory for parts")
+    split.add_argument("--ranges", help='page ranges such as "1-3,5"; omit to burst')
+    split.add_argument(
+        "--pages-per-part", type=int, default=1, help="pages per part when bursting"
+    )
+
+    photos = commands.add_parser(PHOTO_TO_PDF, help="convert images into one PDF")
+    photos.add_argument("--images", nargs="+", required=True, type=Path, help="images in order")
+    photos.add_argument("-o", "--output", required=True, type=Path, help="PDF to write")
+    photos.add_argument(
+        "--normalize-sizes", action="store_true", help="size every page like the first"
+    )
+    photos.add_argument("--page-size", help='fixed page size such as "A4"')
+
+    batch = commands.add_parser("batch", help="run the jobs of a JSON or CSV manifest")
+    batch.add_argument("manifest", type=Path, help="manifest file (.json or .csv)")
+    batch.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="jobs run in parallel (default: one per CPU)",
+    )
+    batch.add_argument(
+        "--force", action="store_true", help="rerun jobs whose outputs already exist"
+    )
+    batch.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "batch":
+            if args.workers < 1:
+                parser.error("--workers must be at least 1")
+            jobs = load_manifest(args.manifest)
+            resume, quiet = not args.force, args.quiet
+        else:
+            jobs = [_single_job(args)]
+            # A single command always writes its output, like cp overwriting a file.
+            resume, quiet = False, True
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"pdftools: error: {exc}\n")
+
+    stats = BatchStats()
+    progress = _Progress(len(jobs), quiet)
+    try:
+        run_batch(
+            jobs,
+            workers=getattr(args, "workers", 1),
+            resume=resume,
+            stats=stats,
+            on_result=progress,
+        )
+    except KeyboardInterrupt:
+        print(
+            f"\nInterrupted after {stats.jobs} of {len(jobs)} jobs; "
+            "run the same command again to resume.",
+            file=sys.stderr,
+        )
+        return 130
+    except ValueError as exc:
+        parser.exit(2, f"pdftools: error: {exc}\n")
+
+    if args.command == "batch":
+        print(summarize(stats))
+    return 1 if stats.failed else 0
+
+
+def _single_job(args: argparse.Namespace) -> BatchJob:
+    if args.command == MERGE:
+        return BatchJob(
+            MERGE, _resolved(args.inputs), _resolved([args.output])[0], deduplicate=args.deduplicate
+        )
+    if args.command == SPLIT:
+        return BatchJob(
+            SPLIT,
+            _resolved([args.input]),
+            _resolved([args.output])[0],
+            ranges=args.ranges,
+            pages_per_part=args.pages_per_part,
+        )
+    return BatchJob(
+        PHOTO_TO_PDF,
+        _resolved(args.images),
+        _resolved([args.output])[0],
+        normalize_sizes=args.normalize_sizes,
+        page_size=args.page_size,
+    )
+
+
+def _resolved(paths: Sequence[Path]) -> tuple[Path, ...]:
+    return tuple(path.expanduser().resolve() for path in paths)
+
+
+class _Progress:
+    """Print one line per finished job; failures are printed even when quiet."""
+
+    def __init__(self, total: int, quiet: bool) -> None:
+        self.total = total
+        self.quiet = quiet
+        self.count = 0
+
+    def __call__(self, result: JobResult) -> None:
+        self.count += 1
+        target = result.job.output
+        if result.status == FAILED:
+            print(f"[{self.count}/{self.total}] failed {target}: {result.error}", file=sys.stderr)
+        elif not self.quiet:
+            detail = f" ({result.pages} pages, {result.elapsed:.2f} s)" if result.pages else ""
+            print(f"[{self.count}/{self.total}] {result.status} {target}{detail}")
+
+
+def summarize(stats: BatchStats) -> str:
+    """The throughput summary printed at the end of a batch."""
+
+    return (
+        f"{stats.jobs} jobs: {stats.done} done, {stats.skipped} skipped, "
+        f"{stats.failed} failed in {stats.elapsed:.2f} s\n"
+        f"{stats.jobs_per_second:.1f} jobs/s, {stats.pages_per_second:.1f} pages/s, "
+        f"{stats.bytes_per_second / (1024 * 1024):.2f} MiB/s written "
+        f"({stats.pages} pages, {stats.bytes_written / (1024 * 1024):.2f} MiB)"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
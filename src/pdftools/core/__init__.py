@@ -1,6 +1,43 @@
 """Core PDF operations shared across UI layers."""
 
-from .operations import convert_images_to_pdf, merge_pdfs, split_pdf
+from .batch import BatchJob, load_manifest, run_batch
+from .events import Event, TimingRecorder
+from .operations import (
+    burst_pdf,
+    convert_images_to_pdf,
+    convert_images_to_pdf_io,
+    merge_pdfs,
+    merge_pdfs_io,
+    split_pdf,
+    split_pdf_io,
+)
+from .output import OutputOptions
+from .pipeline import Pipeline
+from .probe import PdfInfo, ProbeIndex, probe_pdf, probe_pdfs
 from .ranges import parse_page_ranges
+from .stats import BatchStats, MergeStats, SplitStats
 
-__all__ = ["merge_pdfs", "split_pdf", "convert_images_to_pdf", "parse_page_ranges"]
+__all__ = [
+    "merge_pdfs",
+    "split_pdf",
+    "burst_pdf",
+    "convert_images_to_pdf",
+    "merge_pdfs_io",
+    "split_pdf_io",
+    "convert_images_to_pdf_io",
+    "Pipeline",
+    "parse_page_ranges",
+    "SplitStats",
+    "MergeStats",
+    "BatchStats",
+    "OutputOptions",
+    "Event",
+    "TimingRecorder",
+    "probe_pdf",
+    "probe_pdfs",
+    "PdfInfo",
+    "ProbeIndex",
+    "BatchJob",
+    "load_manifest",
+    "run_batch",
+]
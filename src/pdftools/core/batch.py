@@ -0,0 +1,349 @@
+"""Manifest-driven batches of merge, split and photo-to-PDF jobs run across processes."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+from .events import TimingRecorder
+from .operations import burst_pdf, convert_images_to_pdf, merge_pdfs, split_pdf
+from .parallel import process_pool
+from .probe import probe_pdf
+from .ranges import parse_page_ranges
+from .splitting import burst_ranges, part_filename
+from .stats import BatchStats
+
+MERGE = "merge"
+SPLIT = "split"
+PHOTO_TO_PDF = "photo-to-pdf"
+OPERATIONS = (MERGE, SPLIT, PHOTO_TO_PDF)
+
+# Job outcomes.
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+# Separates the inputs of one job in a CSV manifest; it cannot appear in Windows paths.
+CSV_INPUT_SEPARATOR = "|"
+
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"", "0", "false", "no", "n", "off"}
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One manifest entry.
+
+    ``output`` is the PDF written by a merge or photo-to-PDF job and the directory that
+    receives the parts of a split. A split uses ``ranges`` (see
+    :func:`~pdftools.core.ranges.parse_page_ranges`) or, without it, bursts the input into
+    parts of ``pages_per_part`` pages.
+    """
+
+    operation: str
+    inputs: tuple[Path, ...]
+    output: Path
+    ranges: str | None = None
+    pages_per_part: int = 1
+    deduplicate: bool = False
+    normalize_sizes: bool = False
+    page_size: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {self.operation!r}")
+        if not self.inputs:
+            raise ValueError(f"A {self.operation} job needs at least one input.")
+        if self.operation == SPLIT and len(self.inputs) != 1:
+            raise ValueError("A split job takes exactly one input.")
+        if self.pages_per_part < 1:
+            raise ValueError("pages_per_part must be at least 1")
+
+
+@dataclass
+class JobResult:
+    """What happened to one job: :data:`DONE`, :data:`SKIPPED` or :data:`FAILED`."""
+
+    job: BatchJob
+    status: str
+    pages: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    outputs: list[Path] = field(default_factory=list)
+    error: str | None = None
+
+
+def load_manifest(path: str | Path) -> list[BatchJob]:
+    """Read the jobs of a JSON or CSV manifest (chosen by its suffix).
+
+    A JSON manifest is a list of job objects, or an object holding that list under
+    ``"jobs"``. A CSV manifest has a header row naming the same fields, with the inputs
+    of a job separated by :data:`CSV_INPUT_SEPARATOR`. Every job names its
+    ``operation``, ``inputs`` (or a single ``input``) and ``output``; the remaining
+    :class:`BatchJob` fields are optional. Relative paths are taken from the manifest's
+    directory. Raises ``ValueError`` naming the offending entry.
+    """
+
+    manifest = Path(path).expanduser().resolve()
+    if manifest.suffix.lower() == ".csv":
+        with manifest.open(newline="", encoding="utf-8-sig") as handle:
+            entries: list[Any] = [
+                {key: value for key, value in row.items() if value not in (None, "")}
+                for row in csv.DictReader(handle)
+            ]
+    else:
+        with manifest.open(encoding="utf-8") as handle:
+            document = json.load(handle)
+        entries = document.get("jobs") if isinstance(document, dict) else document
+        if not isinstance(entries, list):
+            raise ValueError(f"{manifest.name}: expected a list of jobs")
+
+    jobs = []
+    for number, entry in enumerate(entries, start=1):
+        try:
+            jobs.append(_parse_job(entry, manifest.parent))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{manifest.name}, job {number}: {exc}") from None
+    return jobs
+
+
+def _parse_job(entry: Any, base: Path) -> BatchJob:
+    if not isinstance(entry, dict):
+        raise ValueError("expected an object with the job fields")
+    unknown = set(entry) - {
+        "operation",
+        "input",
+        "inputs",
+        "output",
+        "ranges",
+        "pages_per_part",
+        "deduplicate",
+        "normalize_sizes",
+        "page_size",
+    }
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    for name in ("operation", "output"):
+        if not entry.get(name):
+            raise ValueError(f"missing {name!r}")
+
+    inputs = entry.get("inputs", entry.get("input", []))
+    if isinstance(inputs, str):
+        inputs = inputs.split(CSV_INPUT_SEPARATOR)
+    return BatchJob(
+        operation=str(entry["operation"]).strip().lower(),
+        inputs=tuple(_resolve(value, base) for value in inputs if str(value).strip()),
+        output=_resolve(entry["output"], base),
+        ranges=entry.get("ranges") or None,
+        pages_per_part=int(entry.get("pages_per_part", 1)),
+        deduplicate=_flag(entry.get("deduplicate", False)),
+        normalize_sizes=_flag(entry.get("normalize_sizes", False)),
+        page_size=entry.get("page_size") or None,
+    )
+
+
+def _resolve(value: Any, base: Path) -> Path:
+    return (base / Path(str(value).strip()).expanduser()).resolve()
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"expected a yes/no value, got {value!r}")
+
+
+def run_batch(
+    jobs: Sequence[BatchJob],
+    *,
+    workers: int = 1,
+    resume: bool = True,
+    stats: BatchStats | None = None,
+    on_result: Callable[[JobResult], None] | None = None,
+) -> list[JobResult]:
+    """Run every job and return their results in manifest order.
+
+    With ``workers > 1`` jobs run in a process pool, at most ``4 * workers`` submitted
+    at a time, and results arrive as jobs end rather than in order. A failing job is
+    reported through its :class:`JobResult` and the others carry on. Outputs appear
+    under their final names only once complete, so with ``resume`` a rerun after an
+    interruption skips every job whose outputs already exist. ``on_result`` is called in
+    this process as each job ends; ``stats`` receives the totals.
+    """
+
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    _check_outputs(jobs)
+
+    started = time.perf_counter()
+    results: list[JobResult | None] = [None] * len(jobs)
+
+    def record(index: int, result: JobResult) -> None:
+        results[index] = result
+        if stats is not None:
+            stats.add(result.status, result.pages, result.bytes_written)
+        if on_result is not None:
+            on_result(result)
+
+    try:
+        if workers == 1:
+            for index, job in enumerate(jobs):
+                record(index, run_job(job, resume=resume))
+        else:
+            with process_pool(workers) as executor:
+                pending: dict[Future[JobResult], int] = {}
+                try:
+                    for index, job in enumerate(jobs):
+                        pending[executor.submit(run_job, job, resume=resume)] = index
+                        while len(pending) >= 4 * workers:
+                            _collect(pending, record)
+                    while pending:
+                        _collect(pending, record)
+                finally:
+                    for future in pending:
+                        future.cancel()
+    finally:
+        if stats is not None:
+            stats.elapsed = time.perf_counter() - started
+    return [result for result in results if result is not None]
+
+
+def _collect(
+    pending: dict[Future[JobResult], int], record: Callable[[int, JobResult], None]
+) -> None:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        record(pending.pop(future), future.result())
+
+
+def _check_outputs(jobs: Iterable[BatchJob]) -> None:
+    seen: dict[Path, BatchJob] = {}
+    for job in jobs:
+        other = seen.setdefault(job.output, job)
+        if other is not job and (job.operation != SPLIT or other.operation != SPLIT):
+            raise ValueError(f"Several jobs write {job.output}")
+
+
+def run_job(job: BatchJob, *, resume: bool = True) -> JobResult:
+    """Run one job; with ``resume`` skip it when its outputs are already complete."""
+
+    started = time.perf_counter()
+    try:
+        if resume:
+            existing = expected_outputs(job)
+            if existing and all(path.is_file() for path in existing):
+                return JobResult(job, SKIPPED, outputs=existing)
+        recorder = TimingRecorder()
+        outputs = _RUNNERS[job.operation](job, recorder)
+    except Exception as exc:  # noqa: BLE001 - reported per job, the batch carries on
+        error = f"{type(exc).__name__}: {exc}"
+        return JobResult(job, FAILED, elapsed=time.perf_counter() - started, error=error)
+    pages = sum(entry["pages"] for entry in recorder.report().values())
+    return JobResult(
+        job,
+        DONE,
+        pages=pages,
+        bytes_written=sum(path.stat().st_size for path in outputs),
+        elapsed=time.perf_counter() - started,
+        outputs=outputs,
+    )
+
+
+def expected_outputs(job: BatchJob) -> list[Path]:
+    """The files ``job`` writes, or an empty list when that cannot be told without running it.
+
+    A split's part names depend on the input's page count, which is probed cheaply.
+    """
+
+    if job.operation != SPLIT:
+        return [job.output]
+    info = probe_pdf(job.inputs[0])
+    if not info.ok or info.pages is None:
+        return []
+    if job.ranges:
+        ranges = parse_page_ranges(job.ranges, info.pages)
+    else:
+        ranges = burst_ranges(info.pages, job.pages_per_part)
+    stem = job.inputs[0].stem
+    return [
+        job.output / part_filename(stem, index, start, end)
+        for index, (start, end) in enumerate(ranges, start=1)
+    ]
+
+
+def _publish(staged: Iterable[Path], directory: Path) -> list[Path]:
+    # Renames within one file system are atomic, so a final name always means a whole file.
+    published = []
+    for path in staged:
+        destination = directory / path.name
+        os.replace(path, destination)
+        published.append(destination)
+    return published
+
+
+def _staging(directory: Path) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=".pdftools-partial-", dir=directory))
+
+
+def _run_merge(job: BatchJob, recorder: TimingRecorder) -> list[Path]:
+    staging = _staging(job.output.parent)
+    try:
+        written = merge_pdfs(
+            job.inputs,
+            staging / job.output.name,
+            streaming=True,
+            deduplicate=job.deduplicate,
+            observer=recorder,
+        )
+        return _publish([written], job.output.parent)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _run_split(job: BatchJob, recorder: TimingRecorder) -> list[Path]:
+    staging = _staging(job.output)
+    try:
+        if job.ranges:
+            parts = split_pdf(job.inputs[0], job.ranges, staging, observer=recorder)
+        else:
+            parts = burst_pdf(
+                job.inputs[0], staging, pages_per_part=job.pages_per_part, observer=recorder
+            )
+        return _publish(parts, job.output)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _run_photo_to_pdf(job: BatchJob, recorder: TimingRecorder) -> list[Path]:
+    staging = _staging(job.output.parent)
+    try:
+        written = convert_images_to_pdf(
+            job.inputs,
+            staging / job.output.name,
+            normalize_sizes=job.normalize_sizes,
+            streaming=True,
+            page_size=job.page_size,
+            observer=recorder,
+        )
+        return _publish([written], job.output.parent)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+_RUNNERS: dict[str, Callable[[BatchJob, TimingRecorder], list[Path]]] = {
+    MERGE: _run_merge,
+    SPLIT: _run_split,
+    PHOTO_TO_PDF: _run_photo_to_pdf,
+}
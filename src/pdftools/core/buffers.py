@@ -0,0 +1,179 @@
+"""File-object, buffer and memory-map inputs for the ``*_io`` operation variants."""
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+
+# Anything an ``*_io`` operation reads from: a path, an object supporting the buffer
+# protocol (bytes, bytearray, memoryview, mmap) or a readable binary file object.
+BinarySource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+# Non-seekable inputs are spooled; beyond this size the spool moves to disk.
+_SPOOL_LIMIT = 16 * 1024 * 1024
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable, read-only file object over a buffer that never copies it as a whole.
+
+    Only the slices handed out by ``read`` are copied, so a memory-mapped PDF can be parsed
+    without being loaded.
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview) -> None:
+        super().__init__()
+        self._source_view = memoryview(buffer)
+        self._view = self._source_view.cast("B")
+        self._position = 0
+
+    def close(self) -> None:
+        # Releasing the views lets a memory map be closed while the reader still exists.
+        if not self.closed:
+            self._view.release()
+            self._source_view.release()
+        super().close()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def readinto(self, target) -> int:
+        chunk = self._view[self._position : self._position + len(target)]
+        size = len(chunk)
+        memoryview(target).cast("B")[:size] = chunk
+        self._position += size
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        chunk = bytes(self._view[self._position : end])
+        self._position += len(chunk)
+        return chunk
+
+
+class InMemoryFile:
+    """A named in-memory file that image code can treat like a :class:`~pathlib.Path`.
+
+    It offers the few path methods the image pipeline relies on (``name``, ``read_bytes``)
+    and :meth:`open` for Pillow. Instances holding ``bytes`` can be sent to worker
+    processes.
+    """
+
+    def __init__(self, name: str, data: bytes | bytearray | memoryview) -> None:
+        self.name = name
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"InMemoryFile({self.name!r}, {len(memoryview(self.data).cast('B'))} bytes)"
+
+    def __reduce__(self):
+        return (InMemoryFile, (self.name, bytes(self.data)))
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+    def open(self, mode: str = "rb") -> BufferReader:
+        if mode != "rb":
+            raise ValueError("In-memory files are read-only.")
+        return BufferReader(self.data)
+
+    def read_bytes(self) -> bytes:
+        return bytes(self.data)
+
+
+def is_path(source: object) -> bool:
+    return isinstance(source, (str, Path))
+
+
+def _is_buffer(source: object) -> bool:
+    # mmap objects also have file methods, so the buffer protocol is checked first.
+    if is_path(source):
+        return False
+    try:
+        memoryview(source).release()
+    except TypeError:
+        return False
+    return True
+
+
+@contextmanager
+def open_binary(source: BinarySource) -> Iterator[BinaryIO]:
+    """Yield a seekable binary file object for ``source``.
+
+    Paths are opened and closed here; buffers are wrapped without copying; caller-owned
+    file objects are used as they are (and left open) when seekable, otherwise spooled.
+    """
+
+    if is_path(source):
+        with Path(source).expanduser().open("rb") as handle:
+            yield handle
+        return
+    if _is_buffer(source):
+        with BufferReader(source) as reader:
+            yield reader
+        return
+    if source.seekable():
+        yield source
+        return
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_LIMIT) as spool:
+        shutil.copyfileobj(source, spool)
+        spool.seek(0)
+        yield spool
+
+
+def as_image_source(source: BinarySource, index: int) -> Path | InMemoryFile:
+    """Turn ``source`` into something the image pipeline can reopen for every strip."""
+
+    if is_path(source):
+        return Path(source).expanduser().resolve()
+    if _is_buffer(source):
+        return InMemoryFile(f"image{index + 1}", source)
+    name = getattr(source, "name", None)
+    name = Path(name).name if isinstance(name, str) and name else f"image{index + 1}"
+    return InMemoryFile(name, source.read())
+
+
+@contextmanager
+def atomic_write(destination: Path) -> Iterator[BinaryIO]:
+    """Yield a file that replaces ``destination`` only once the block completes.
+
+    The data goes to a hidden temporary file in the same directory, which is renamed over
+    ``destination`` on success and removed on any error, so an existing output is never
+    left truncated by an input that fails partway.
+    """
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Opened like any new file, unlike mkstemp's owner-only files, so permissions match.
+    staged = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.partial")
+    try:
+        with staged.open("xb") as handle:
+            yield handle
+        os.replace(staged, destination)
+    except BaseException:
+        staged.unlink(missing_ok=True)
+        raise
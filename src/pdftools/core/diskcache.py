@@ -0,0 +1,129 @@
+"""A size-bounded, least recently used cache of files on local disk."""
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+
+class DiskCache:
+    """Entries stored as files under ``directory`` and evicted least recently used first.
+
+    A SQLite index records each entry's size and last use, so several processes can share
+    one directory: writers take the database lock while they insert and evict, and
+    entries are renamed into place only once complete. ``hits`` and ``misses`` count
+    lookups made through this instance.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+
+    def open(self, key: str) -> BinaryIO | None:
+        """Return the entry for ``key`` opened for reading, or None on a miss.
+
+        The open handle stays readable even if another process evicts the entry.
+        """
+
+        try:
+            handle = self._path(key).open("rb")
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        with self._connect() as connection:
+            connection.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+        self._count(hit=True)
+        return handle
+
+    def tee(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass ``chunks`` through, storing them under ``key`` once all have been produced.
+
+        Nothing is stored if the iteration fails or is abandoned part way through.
+        """
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=path.parent, prefix=".", delete=False)
+        complete = False
+        try:
+            with handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            if complete:
+                self._commit(key, Path(handle.name))
+            else:
+                os.unlink(handle.name)
+
+    def put(self, key: str, data: bytes) -> None:
+        for _ in self.tee(key, [data]):
+            pass
+
+    def _commit(self, key: str, staged: Path) -> None:
+        size = staged.stat().st_size
+        if size > self.max_bytes:
+            staged.unlink()
+            return
+        with self._connect() as connection:
+            # The write lock serializes inserts and evictions across processes.
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                os.replace(staged, self._path(key))
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, size, time.time())
+                )
+                (total,) = connection.execute("SELECT SUM(size) FROM entries").fetchone()
+                evicted = []
+                for old_key, old_size in connection.execute(
+                    "SELECT key, size FROM entries ORDER BY used"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append(old_key)
+                    total -= old_size
+                connection.executemany(
+                    "DELETE FROM entries WHERE key = ?", [(old_key,) for old_key in evicted]
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def _count(self, *, hit: bool) -> None:
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        # A connection per operation keeps the cache usable from any executor thread;
+        # autocommit mode leaves transactions to the explicit BEGIN in _commit.
+        connection = sqlite3.connect(
+            self.directory / "index.sqlite", timeout=30, isolation_level=None
+        )
+        return closing(connection)
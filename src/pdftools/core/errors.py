@@ -0,0 +1,6 @@
+"""Exception types shared by the core modules."""
+from __future__ import annotations
+
+
+class PDFOperationError(RuntimeError):
+    """Raised when a PDF operation fails."""
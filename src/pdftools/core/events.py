@@ -0,0 +1,234 @@
+"""Structured progress and timing events emitted by core operations."""
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+# Event kinds.
+STAGE_START = "stage_start"
+STAGE_END = "stage_end"
+PAGE = "page"
+
+
+@dataclass(frozen=True)
+class Event:
+    """Something that happened while ``operation`` (``"merge"``, ``"split"``, ``"convert"``) ran.
+
+    ``kind`` is :data:`STAGE_START` or :data:`STAGE_END` around a named ``stage``, or
+    :data:`PAGE` once pages reach the output. ``pages`` counts the pages written so far
+    out of ``total_pages`` when the total is known up front (split and convert; a merge
+    only learns each input's size when it opens it, so it reports ``source`` of
+    ``sources`` instead). ``bytes_written`` is the size of the output so far, ``elapsed``
+    the seconds since the operation started and ``duration`` the length of a finished
+    stage. Events of one run share a ``run`` number unique within the process.
+    """
+
+    kind: str
+    operation: str
+    run: int = 0
+    stage: str | None = None
+    pages: int = 0
+    total_pages: int | None = None
+    source: int = 0
+    sources: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    duration: float | None = None
+
+
+# Called synchronously with every event; an exception it raises aborts the operation.
+Observer = Optional[Callable[[Event], None]]
+
+
+class _Stage:
+    __slots__ = ("_tracker", "_name", "_started")
+
+    def __init__(self, tracker: "_ObservedTracker", name: str) -> None:
+        self._tracker = tracker
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+        self._tracker.emit(STAGE_START, self._name)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            duration = time.perf_counter() - self._started
+            self._tracker.emit(STAGE_END, self._name, duration)
+
+
+class _Idle:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_IDLE_STAGE = _Idle()
+
+
+class Tracker:
+    """Reports the progress of one operation run; this base class reports nothing.
+
+    Operations call :meth:`stage`, :meth:`page` and :meth:`next_source` unconditionally,
+    so without an observer the whole cost is a few no-op method calls per page.
+    """
+
+    __slots__ = ()
+
+    def stage(self, name: str) -> Any:
+        """Context manager timing the named stage."""
+
+        return _IDLE_STAGE
+
+    def page(self, bytes_written: int, count: int = 1) -> None:
+        """Record ``count`` more pages written, leaving the output ``bytes_written`` long."""
+
+    def next_source(self) -> None:
+        """Move on to the next input."""
+
+    def set_total(self, pages: int) -> None:
+        """Announce how many pages the operation will write, once it knows."""
+
+
+class _ObservedTracker(Tracker):
+    __slots__ = (
+        "_observer",
+        "_operation",
+        "_run",
+        "_started",
+        "_total_pages",
+        "_sources",
+        "_pages",
+        "_source",
+        "_bytes_written",
+    )
+
+    def __init__(
+        self,
+        observer: Callable[[Event], None],
+        operation: str,
+        total_pages: int | None,
+        sources: int,
+    ) -> None:
+        self._observer = observer
+        self._operation = operation
+        self._run = next(_runs)
+        self._started = time.perf_counter()
+        self._total_pages = total_pages
+        self._sources = sources
+        self._pages = 0
+        self._source = 0
+        self._bytes_written = 0
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def page(self, bytes_written: int, count: int = 1) -> None:
+        self._pages += count
+        self._bytes_written = bytes_written
+        self.emit(PAGE)
+
+    def next_source(self) -> None:
+        self._source += 1
+
+    def set_total(self, pages: int) -> None:
+        self._total_pages = pages
+
+    def emit(self, kind: str, stage: str | None = None, duration: float | None = None) -> None:
+        self._observer(
+            Event(
+                kind,
+                self._operation,
+                self._run,
+                stage,
+                self._pages,
+                self._total_pages,
+                self._source,
+                self._sources,
+                self._bytes_written,
+                time.perf_counter() - self._started,
+                duration,
+            )
+        )
+
+
+IDLE = Tracker()
+_runs = itertools.count(1)
+
+
+def track(
+    observer: Observer, operation: str, *, total_pages: int | None = None, sources: int = 0
+) -> Tracker:
+    """Start reporting ``operation`` to ``observer``, or return :data:`IDLE` without one."""
+
+    if observer is None:
+        return IDLE
+    return _ObservedTracker(observer, operation, total_pages, sources)
+
+
+class TimingRecorder:
+    """Observer that accumulates a per-stage timing breakdown of the operations it sees.
+
+    Pass an instance as ``observer``; :meth:`report` (or :meth:`to_json` / :meth:`dump`)
+    then gives, per operation, its runs, elapsed time, pages and output bytes, and for
+    every stage how often it ran, the seconds spent in it and its share of the elapsed
+    time. Several runs, even concurrent ones, add up.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (operation, run) -> latest event of that run
+        self._runs: dict[tuple[str, int], Event] = {}
+        # operation -> stage -> [count, seconds]
+        self._stages: dict[str, dict[str, list]] = {}
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            self._runs[event.operation, event.run] = event
+            stages = self._stages.setdefault(event.operation, {})
+            if event.kind == STAGE_END:
+                totals = stages.setdefault(event.stage, [0, 0.0])
+                totals[0] += 1
+                totals[1] += event.duration or 0.0
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            report: dict[str, Any] = {}
+            for (operation, _), last in self._runs.items():
+                entry = report.setdefault(
+                    operation, {"runs": 0, "elapsed": 0.0, "pages": 0, "bytes_written": 0}
+                )
+                entry["runs"] += 1
+                entry["elapsed"] += last.elapsed
+                entry["pages"] += last.pages
+                entry["bytes_written"] += last.bytes_written
+            for operation, entry in report.items():
+                elapsed = entry["elapsed"]
+                entry["stages"] = {
+                    name: {
+                        "count": count,
+                        "seconds": seconds,
+                        "share": seconds / elapsed if elapsed else 0.0,
+                    }
+                    for name, (count, seconds) in self._stages[operation].items()
+                }
+            return report
+
+    def to_json(self, *, indent: int | None = 2) -> str:
+        return json.dumps(self.report(), indent=indent)
+
+    def dump(self, path: str | Path) -> Path:
+        """Write :meth:`to_json` to ``path`` and return it."""
+
+        destination = Path(path)
+        destination.write_text(self.to_json() + "\n", encoding="utf-8")
+        return destination
@@ -0,0 +1,482 @@
+"""Image decoding and page emission behind ``convert_images_to_pdf``."""
+from __future__ import annotations
+
+import io
+import math
+import os
+import tempfile
+import zlib
+from dataclasses import dataclass, replace
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Sequence
+
+from PIL import Image, ImageOps
+from pypdf.generic import ArrayObject, DictionaryObject, FloatObject, NameObject, NumberObject
+
+from .buffers import InMemoryFile
+from .errors import PDFOperationError
+from .events import IDLE, Tracker
+from .output import OutputOptions
+from .parallel import ordered_map
+from .pdfwriter import StreamingPdfWriter, document_info
+from .rasters import iter_bands, open_frame
+
+PDF_RESOLUTION = 300.0
+
+_EXIF_ORIENTATION_TAG = 0x0112
+# EXIF orientation -> (mirror horizontally, clockwise page rotation) that displays it upright.
+_ORIENTATION_PLACEMENT: dict[int, tuple[bool, int]] = {
+    1: (False, 0),
+    2: (True, 0),
+    3: (False, 180),
+    4: (True, 180),
+    5: (True, 270),
+    6: (False, 90),
+    7: (True, 90),
+    8: (False, 270),
+}
+_PASSTHROUGH_COLOR_SPACES = {"RGB": "/DeviceRGB", "L": "/DeviceGray"}
+_MULTI_PAGE_FORMATS = {"TIFF"}
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageFrame(NamedTuple):
+    """One page worth of input: a frame of an image file."""
+
+    path: Path | InMemoryFile
+    index: int = 0
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """An image already encoded for embedding as a PDF image XObject.
+
+    ``rotate`` and ``mirror`` describe how the page displays the stored pixels; ``box``
+    overrides the unrotated page size in points (defaults to the pixels at 300 DPI) and
+    ``placement`` the ``(x, y, width, height)`` rectangle the image is drawn into
+    (defaults to the whole page). Large payloads live in the temporary file ``data_path``
+    instead of ``data`` and are removed once written.
+    """
+
+    data: bytes
+    width: int
+    height: int
+    color_space: str = "/DeviceRGB"
+    filter: str = "/DCTDecode"
+    rotate: int = 0
+    mirror: bool = False
+    box: tuple[float, float] | None = None
+    placement: tuple[float, float, float, float] | None = None
+    data_path: Path | None = None
+
+
+@dataclass(frozen=True)
+class ConversionSettings:
+    """Per-page options shared by every image of a conversion.
+
+    ``page_size`` (points) fits each image centred on a fixed page and takes precedence
+    over ``reference_size``; ``dpi`` is the resolution pixels are laid out at and, with a
+    page size, the highest resolution kept; ``max_size`` caps the embedded pixels.
+    ``pixel_budget`` bounds how many pixels a worker decodes at once: larger rasters are
+    processed in bands instead of tripping Pillow's decompression-bomb guard.
+    """
+
+    reference_size: tuple[int, int] | None = None
+    jpeg_passthrough: bool = False
+    page_size: tuple[float, float] | None = None
+    dpi: float = PDF_RESOLUTION
+    max_size: tuple[int, int] | None = None
+    jpeg_quality: int | None = None
+    pixel_budget: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.dpi <= 0:
+            raise ValueError("dpi must be positive")
+        if self.max_size is not None and min(self.max_size) < 1:
+            raise ValueError("max_size must be at least 1x1 pixels")
+        if self.jpeg_quality is not None and not 1 <= self.jpeg_quality <= 100:
+            raise ValueError("jpeg_quality must be between 1 and 100")
+        if self.pixel_budget is not None and self.pixel_budget < 1:
+            raise ValueError("pixel_budget must be positive")
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Where an upright image lands on its page and how many pixels it keeps."""
+
+    pixels: tuple[int, int]
+    box: tuple[float, float]
+    placement: tuple[float, float, float, float]
+
+
+PAGE_SIZES: dict[str, tuple[float, float]] = {
+    "A3": (841.89, 1190.55),
+    "A4": (595.28, 841.89),
+    "A5": (419.53, 595.28),
+    "LETTER": (612.0, 792.0),
+    "LEGAL": (612.0, 1008.0),
+}
+
+
+def resolve_page_size(value: str | tuple[float, float] | None) -> tuple[float, float] | None:
+    """Accept a named paper size (``"A4"``) or an explicit ``(width, height)`` in points."""
+
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            return PAGE_SIZES[value.strip().upper()]
+        except KeyError:
+            raise ValueError(f"Unknown page size: {value}") from None
+    width, height = value
+    if width <= 0 or height <= 0:
+        raise ValueError("Page size must be positive")
+    return float(width), float(height)
+
+
+def prepare_for_pdf(image: Image.Image) -> Image.Image:
+    """Ensure the PIL image is RGB with no alpha channel for PDF export."""
+
+    if image.mode in ("RGBA", "LA"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+        composited = Image.alpha_composite(background, rgba)
+        return composited.convert("RGB")
+
+    if image.mode == "P":
+        return image.convert("RGB")
+
+    if image.mode != "RGB":
+        return image.convert("RGB")
+
+    return image.copy()
+
+
+def resize_to_reference(
+    image: Image.Image, size: tuple[int, int], reducing_gap: float | None = None
+) -> Image.Image:
+    """Resize ``image`` to ``size`` using high-quality resampling.
+
+    ``reducing_gap`` lets Pillow shrink by an integer factor with ``reduce`` before the
+    final LANCZOS pass, which is much cheaper for large downscales.
+    """
+
+    if image.size == size:
+        return image
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+
+
+def _fit_within(size: tuple[int, int], bound: tuple[float, float]) -> tuple[int, int]:
+    """Shrink ``size`` (never enlarge) so it fits in ``bound``, keeping the aspect ratio."""
+
+    width, height = size
+    scale = min(1.0, bound[0] / width, bound[1] / height)
+    if scale == 1.0:
+        return size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _fit_area(size: tuple[int, int], budget: int) -> tuple[int, int]:
+    """Shrink ``size`` (never enlarge) so it covers at most ``budget`` pixels."""
+
+    width, height = size
+    if width * height <= budget:
+        return size
+    scale = math.sqrt(budget / (width * height))
+    return max(1, math.floor(width * scale)), max(1, math.floor(height * scale))
+
+
+def _layout(size: tuple[int, int], settings: ConversionSettings) -> _Layout:
+    """Compute pixel and page geometry for an upright image of ``size`` pixels."""
+
+    width, height = size
+    if settings.page_size is not None:
+        box = settings.page_size
+        scale = min(box[0] / width, box[1] / height)
+        drawn = (width * scale, height * scale)
+        placement = ((box[0] - drawn[0]) / 2, (box[1] - drawn[1]) / 2, *drawn)
+        budget = (box[0] * settings.dpi / 72.0, box[1] * settings.dpi / 72.0)
+        pixels = _fit_within(size, budget)
+    else:
+        pixels = settings.reference_size or size
+        box = (pixels[0] * 72.0 / settings.dpi, pixels[1] * 72.0 / settings.dpi)
+        placement = (0.0, 0.0, *box)
+    if settings.max_size is not None:
+        pixels = _fit_within(pixels, settings.max_size)
+    return _Layout(pixels, box, placement)
+
+
+def exif_orientation(image: Image.Image) -> int:
+    """Return the EXIF orientation of ``image`` (1 when absent or invalid)."""
+
+    orientation = image.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+    return orientation if orientation in _ORIENTATION_PLACEMENT else 1
+
+
+def iter_frames(
+    image_paths: Sequence[Path | InMemoryFile], settings: ConversionSettings = ConversionSettings()
+) -> Iterator[ImageFrame]:
+    """Expand multi-page inputs (TIFF) into one :class:`ImageFrame` per page."""
+
+    lift_guard = settings.pixel_budget is not None
+    for image_path in image_paths:
+        with open_frame(image_path, lift_guard=lift_guard) as img:
+            count = getattr(img, "n_frames", 1) if img.format in _MULTI_PAGE_FORMATS else 1
+        for index in range(count):
+            yield ImageFrame(image_path, index)
+
+
+def displayed_size(frame: ImageFrame, settings: ConversionSettings) -> tuple[int, int]:
+    """Size of ``frame`` as it will appear on the page, honouring EXIF when enabled."""
+
+    with open_frame(*frame, lift_guard=settings.pixel_budget is not None) as img:
+        width, height = img.size
+        if settings.jpeg_passthrough and _ORIENTATION_PLACEMENT[exif_orientation(img)][1] % 180:
+            return height, width
+    return width, height
+
+
+def encode_page(
+    frame: ImageFrame, settings: ConversionSettings = ConversionSettings()
+) -> EncodedImage:
+    """Encode a single image frame for embedding, re-encoding like Pillow's PDF driver if needed.
+
+    With ``jpeg_passthrough`` enabled, eligible JPEGs that need no resampling are embedded
+    byte for byte and their EXIF orientation is carried by the page instead of the pixels;
+    every other input is decoded, upright-rotated and re-encoded. When fewer pixels than
+    the source are needed, JPEGs are decoded at reduced scale via ``draft`` so the full
+    resolution raster is never materialized. Frames above ``pixel_budget`` are decoded at
+    reduced scale (JPEG) or band by band into a lossless Flate stream (other formats).
+    """
+
+    budget = settings.pixel_budget
+    with open_frame(*frame, lift_guard=budget is not None) as img:
+        mirror, rotate = False, 0
+        if settings.jpeg_passthrough:
+            mirror, rotate = _ORIENTATION_PLACEMENT[exif_orientation(img)]
+        upright_size = (img.height, img.width) if rotate % 180 else img.size
+        layout = _layout(upright_size, settings)
+
+        if settings.jpeg_passthrough and layout.pixels == upright_size:
+            passthrough = _passthrough_jpeg(frame.path, img, layout, mirror, rotate)
+            if passthrough is not None:
+                return passthrough
+
+        if budget is not None and img.width * img.height > budget:
+            if img.format != "JPEG":
+                return _encode_in_bands(frame, img.size, layout, budget)
+            layout = replace(layout, pixels=_fit_area(layout.pixels, budget))
+
+        if layout.pixels[0] < upright_size[0] and layout.pixels[1] < upright_size[1]:
+            img.draft(img.mode, layout.pixels[::-1] if rotate % 180 else layout.pixels)
+        if budget is not None and img.width * img.height > budget:
+            raise PDFOperationError(
+                f"{frame.path.name} cannot be decoded within {budget} pixels."
+            )
+        if settings.jpeg_passthrough:
+            upright = ImageOps.exif_transpose(img)
+            processed = prepare_for_pdf(upright)
+            upright.close()
+        else:
+            processed = prepare_for_pdf(img)
+    try:
+        # Plain normalization keeps the single LANCZOS pass of the default writer.
+        reducing_gap = 3.0 if settings.page_size or settings.max_size else None
+        resized = resize_to_reference(processed, layout.pixels, reducing_gap)
+        if resized is not processed:
+            processed.close()
+            processed = resized
+        buffer = io.BytesIO()
+        params = {} if settings.jpeg_quality is None else {"quality": settings.jpeg_quality}
+        processed.save(buffer, "JPEG", **params)
+        return EncodedImage(
+            buffer.getvalue(),
+            processed.width,
+            processed.height,
+            box=layout.box,
+            placement=layout.placement,
+        )
+    finally:
+        processed.close()
+
+
+def _encode_in_bands(
+    frame: ImageFrame, size: tuple[int, int], layout: _Layout, budget: int
+) -> EncodedImage:
+    """Deflate an oversized frame band by band into a temporary file.
+
+    When the layout asks for fewer pixels, each band is shrunk by the same integer factor
+    with ``reduce`` so band seams stay aligned; the result may be a few pixels larger than
+    the exact target.
+    """
+
+    width, height = size
+    factor = max(1, math.ceil(max(width / layout.pixels[0], height / layout.pixels[1])))
+    rows = max(factor, budget // width // factor * factor)
+    compressor = zlib.compressobj()
+    handle = tempfile.NamedTemporaryFile(prefix="pdftools-", suffix=".flate", delete=False)
+    try:
+        with handle:
+            for band in iter_bands(frame.path, frame.index, rows):
+                with band:
+                    rgb = prepare_for_pdf(band)
+                if factor > 1:
+                    reduced = rgb.reduce(factor)
+                    rgb.close()
+                    rgb = reduced
+                handle.write(compressor.compress(rgb.tobytes()))
+                rgb.close()
+            handle.write(compressor.flush())
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return EncodedImage(
+        b"",
+        math.ceil(width / factor),
+        math.ceil(height / factor),
+        filter="/FlateDecode",
+        box=layout.box,
+        placement=layout.placement,
+        data_path=Path(handle.name),
+    )
+
+
+def _passthrough_jpeg(
+    image_path: Path | InMemoryFile,
+    image: Image.Image,
+    layout: _Layout,
+    mirror: bool,
+    rotate: int,
+) -> EncodedImage | None:
+    """Wrap the original JPEG bytes when a PDF viewer can decode them as-is."""
+
+    if image.format != "JPEG" or image.info.get("progressive"):
+        return None
+    color_space = _PASSTHROUGH_COLOR_SPACES.get(image.mode)
+    if color_space is None:
+        return None
+
+    box = layout.box
+    x, y, width, height = layout.placement
+    if rotate % 180:
+        # The layout is computed upright; the page content lives in the unrotated frame.
+        box = box[::-1]
+        x, y, width, height = y, x, height, width
+    return EncodedImage(
+        image_path.read_bytes(),
+        image.width,
+        image.height,
+        color_space=color_space,
+        rotate=rotate,
+        mirror=mirror,
+        box=box,
+        placement=(x, y, width, height),
+    )
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(_COPY_CHUNK_SIZE):
+            yield chunk
+
+
+def write_image_page(writer: StreamingPdfWriter, encoded: EncodedImage) -> None:
+    """Emit the image XObject, content stream and page dictionary for ``encoded``."""
+
+    header = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(encoded.width),
+            NameObject("/Height"): NumberObject(encoded.height),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+            NameObject("/ColorSpace"): NameObject(encoded.color_space),
+            NameObject("/Filter"): NameObject(encoded.filter),
+        }
+    )
+    if encoded.data_path is None:
+        image_ref = writer.write_stream(header, encoded.data)
+    else:
+        try:
+            image_ref = writer.write_stream(header, _read_chunks(encoded.data_path))
+        finally:
+            encoded.data_path.unlink(missing_ok=True)
+    if encoded.box is not None:
+        width, height = encoded.box
+    else:
+        width = encoded.width * 72.0 / PDF_RESOLUTION
+        height = encoded.height * 72.0 / PDF_RESOLUTION
+    x, y, drawn_width, drawn_height = encoded.placement or (0.0, 0.0, width, height)
+    if encoded.mirror:
+        x, drawn_width = x + drawn_width, -drawn_width
+    placement = b"q %f 0 0 %f %f %f cm /image Do Q\n" % (drawn_width, drawn_height, x, y)
+    contents_ref = writer.write_stream(DictionaryObject(), placement)
+    procset = "/ImageB" if encoded.color_space == "/DeviceGray" else "/ImageC"
+    page = DictionaryObject(
+        {
+            NameObject("/Resources"): DictionaryObject(
+                {
+                    NameObject("/ProcSet"): ArrayObject(
+                        [NameObject("/PDF"), NameObject(procset)]
+                    ),
+                    NameObject("/XObject"): DictionaryObject({NameObject("/image"): image_ref}),
+                }
+            ),
+            NameObject("/MediaBox"): ArrayObject(
+                [NumberObject(0), NumberObject(0), FloatObject(width), FloatObject(height)]
+            ),
+            NameObject("/Contents"): contents_ref,
+        }
+    )
+    if encoded.rotate:
+        page[NameObject("/Rotate")] = NumberObject(encoded.rotate)
+    writer.add_page(page)
+
+
+def stream_images_to_pdf(
+    image_paths: Sequence[Path | InMemoryFile],
+    handle: BinaryIO,
+    settings: ConversionSettings = ConversionSettings(),
+    *,
+    normalize_sizes: bool = False,
+    workers: int = 1,
+    title: str | None = None,
+    options: OutputOptions | None = None,
+    tracker: Tracker = IDLE,
+) -> None:
+    """Write ``image_paths`` to ``handle`` one page at a time.
+
+    Only the images currently being converted are held in memory, so peak usage does not
+    grow with the number of pages. Every frame of a multi-page TIFF becomes its own page.
+    With ``workers > 1`` decoding, preparation and resizing run in a process pool while
+    pages are still written in the given order. ``options`` selects compact serialization.
+
+    ``tracker`` sees a ``scan`` stage that counts the frames, then per page a ``decode``
+    stage (decoding, preparing and encoding the image, or with workers waiting for them to
+    finish that) and a ``write`` stage, and finally a ``finish`` stage.
+    """
+
+    with tracker.stage("scan"):
+        frames = list(iter_frames(image_paths, settings))
+    tracker.set_total(len(frames))
+    if normalize_sizes and settings.reference_size is None:
+        first = ImageFrame(image_paths[0])
+        settings = replace(settings, reference_size=displayed_size(first, settings))
+
+    writer = StreamingPdfWriter(handle, options=options)
+    encode = partial(encode_page, settings=settings)
+    pages = ordered_map(encode, frames, workers=workers)
+    try:
+        while True:
+            with tracker.stage("decode"):
+                encoded = next(pages, None)
+            if encoded is None:
+                break
+            with tracker.stage("write"):
+                write_image_page(writer, encoded)
+            tracker.page(writer.bytes_written)
+    finally:
+        pages.close()
+    with tracker.stage("finish"):
+        writer.close(document_info(title))
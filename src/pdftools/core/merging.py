@@ -0,0 +1,380 @@
+"""Streaming merge that copies one source at a time straight to the output."""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Sequence, Tuple
+
+from pypdf import PageObject, PdfReader
+from pypdf.errors import PdfReadError
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    PdfObject,
+    StreamObject,
+    read_object,
+)
+
+from .buffers import BinarySource, open_binary
+from .errors import PDFOperationError
+from .events import IDLE, Tracker
+from .output import OutputOptions
+from .pdfwriter import UPDATE_RECORD, IncrementalPdfWriter, StreamingPdfWriter, document_info
+from .stats import MergeStats, peak_rss_bytes
+
+# Page keys that tie a page to its source document's page tree or structure tree.
+_DROPPED_PAGE_KEYS = frozenset({"/Parent", "/StructParents", "/B"})
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_TAIL_BYTES = 1024
+_HASH_CHUNK = 1 << 20
+
+# (source key, target reference, source object, translated stream header or None)
+_Pending = Tuple[Optional[Tuple[int, int]], IndirectObject, PdfObject, Optional[DictionaryObject]]
+
+
+class SourceCopier:
+    """Copy pages of one reader into ``writer``, writing each object the first time it is seen.
+
+    Object numbers are translated through a per-source table, so once a source is finished
+    the copier, its reader and every parsed object can be released together. When a
+    ``streams`` table is shared between copiers, byte-identical streams are written once and
+    every later copy points at the first. Each written page is reported to ``tracker``.
+    """
+
+    def __init__(
+        self,
+        reader: PdfReader,
+        writer: StreamingPdfWriter,
+        *,
+        streams: dict[bytes, IndirectObject] | None = None,
+        stats: MergeStats | None = None,
+        tracker: Tracker = IDLE,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._streams = streams
+        self._stats = stats
+        self._tracker = tracker
+        self._refs: dict[tuple[int, int], IndirectObject] = {}
+        self._pending: list[_Pending] = []
+
+    def copy_pages(self, pages: Sequence[PageObject] | None = None) -> int:
+        """Copy ``pages`` (every page by default) and return how many were written.
+
+        References to source pages outside ``pages``, such as link targets, become null.
+        """
+
+        pages = list(self._reader.pages) if pages is None else list(pages)
+        # Reserve every page first so links and annotations that point at a sibling page
+        # resolve to the copy rather than dragging the source's page tree along.
+        page_refs = []
+        for page in pages:
+            source_ref = page.indirect_reference
+            target = self._writer.reserve()
+            if source_ref is not None:
+                self._refs[(source_ref.idnum, source_ref.generation)] = target
+            page_refs.append(target)
+
+        for page, target in zip(pages, page_refs):
+            copied = DictionaryObject(
+                {
+                    NameObject(key): self._translate(value)
+                    for key, value in page.items()
+                    if key not in _DROPPED_PAGE_KEYS
+                }
+            )
+            self._writer.add_page(copied, target)
+            self._flush()
+            self._tracker.page(self._writer.bytes_written)
+        # Parsed objects reference the reader, so drop the cache rather than wait for the
+        # cycle collector to reclaim it.
+        self._reader.resolved_objects.clear()
+        return len(pages)
+
+    def _flush(self) -> None:
+        while self._pending:
+            source_key, target, source, header = self._pending.pop()
+            if header is not None:
+                self._writer.write_stream(header, source._data, target)
+            else:
+                self._writer.write_object(self._translate(source), target)
+            self._release(source_key)
+
+    def _release(self, source_key: tuple[int, int] | None) -> None:
+        if source_key is not None:
+            # Every source object is visited once, so its parsed form can go now.
+            idnum, generation = source_key
+            self._reader.resolved_objects.pop((generation, idnum), None)
+
+    def _stream(self, source_key: tuple[int, int] | None, source: StreamObject) -> IndirectObject:
+        # The header is translated up front so nested streams (soft masks, ICC profiles)
+        # are deduplicated first and identical streams serialize to identical headers.
+        header = DictionaryObject(
+            {
+                NameObject(key): self._translate(value)
+                for key, value in source.items()
+                if key != "/Length"
+            }
+        )
+        digest = None
+        if self._streams is not None:
+            buffer = io.BytesIO()
+            header.write_to_stream(buffer)
+            digest = hashlib.sha256(buffer.getvalue() + b"\0" + source._data).digest()
+            existing = self._streams.get(digest)
+            if existing is not None:
+                if self._stats is not None:
+                    self._stats.deduplicated_objects += 1
+                    self._stats.deduplicated_bytes += buffer.tell() + len(source._data)
+                self._release(source_key)
+                return existing
+        target = self._writer.reserve()
+        if digest is not None:
+            self._streams[digest] = target
+        self._pending.append((source_key, target, source, header))
+        return target
+
+    def _translate(self, value: PdfObject) -> PdfObject:
+        if isinstance(value, IndirectObject):
+            return self._reference(value)
+        if isinstance(value, StreamObject):
+            # A direct stream is not valid PDF; give it an object number of its own.
+            return self._stream(None, value)
+        if isinstance(value, DictionaryObject):
+            return DictionaryObject(
+                {NameObject(key): self._translate(item) for key, item in value.items()}
+            )
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self._translate(item) for item in value)
+        return value
+
+    def _reference(self, ref: IndirectObject) -> IndirectObject | NullObject:
+        key = (ref.idnum, ref.generation)
+        target = self._refs.get(key)
+        if target is not None:
+            return target
+        source = ref.get_object()
+        if source is None or isinstance(source, NullObject):
+            return NullObject()
+        if isinstance(source, StreamObject):
+            target = self._stream(key, source)
+        elif isinstance(source, DictionaryObject) and source.get("/Type") == "/Pages":
+            target = self._writer.pages_ref
+        elif isinstance(source, DictionaryObject) and source.get("/Type") == "/Page":
+            return NullObject()
+        else:
+            target = self._writer.reserve()
+            self._pending.append((key, target, source, None))
+        self._refs[key] = target
+        return target
+
+
+def stream_merge(
+    pdf_paths: Sequence[BinarySource],
+    handle: BinaryIO,
+    *,
+    deduplicate: bool = False,
+    options: OutputOptions | None = None,
+    stats: MergeStats | None = None,
+    tracker: Tracker = IDLE,
+) -> int:
+    """Merge ``pdf_paths`` into ``handle`` and return the number of pages written.
+
+    Sources may be paths, buffers or seekable binary file objects; ``handle`` only needs
+    ``write``.
+
+    Only one source is open at a time and its objects are serialized as soon as they are
+    reached from a page, so peak memory follows the largest input rather than the total.
+    Document-level structures (outlines, forms, tagged structure) are not carried over,
+    matching :func:`merge_pdfs`' default mode.
+
+    With ``deduplicate`` every stream is keyed by a SHA-256 of its header and encoded
+    data; repeats across or within inputs are replaced by a reference to the first copy.
+    Only the 32-byte digests are kept between inputs. ``options`` selects the compact
+    serialization described by :class:`OutputOptions`.
+
+    ``tracker`` sees an ``open`` and a ``copy`` stage per source, where copying includes
+    parsing the objects pages reach and serializing them, then a ``finish`` stage for the
+    cross-reference section and trailer.
+
+    The trailer carries an update record, so :func:`stream_append` can later confirm
+    that the file is unchanged before appending to it.
+    """
+
+    started = time.perf_counter()
+    writer = StreamingPdfWriter(handle, options=options, record=True)
+    _copy_sources(pdf_paths, writer, deduplicate=deduplicate, stats=stats, tracker=tracker)
+    with tracker.stage("finish"):
+        writer.close(document_info())
+    _record(stats, pdf_paths, writer, writer.bytes_written, started)
+    return writer.page_count
+
+
+def stream_append(
+    destination: Path,
+    pdf_paths: Sequence[BinarySource],
+    *,
+    deduplicate: bool = False,
+    options: OutputOptions | None = None,
+    stats: MergeStats | None = None,
+    tracker: Tracker = IDLE,
+) -> int:
+    """Append the pages of ``pdf_paths`` to ``destination`` as an incremental update.
+
+    Only the base file's xref, trailer and page tree root are parsed; nothing before the
+    end of the file is rewritten. When the base was last written by :func:`stream_merge`
+    or by this function, its update record is checked first: the whole file up to the
+    recorded xref section is hashed in one sequential read, and a
+    :class:`PDFOperationError` is raised if it has been modified since. Files written by
+    other tools carry no record and are appended to as they are. A failed append
+    truncates the file back to its original length. ``options`` can recompress the new
+    streams, but the update always ends in a classic xref section. ``tracker`` sees the
+    stages of :func:`stream_merge` after a ``verify`` stage for the base file.
+    """
+
+    started = time.perf_counter()
+    with destination.open("rb") as base_handle:
+        with tracker.stage("verify"):
+            size = base_handle.seek(0, os.SEEK_END)
+            base = PdfReader(base_handle)
+            if base.is_encrypted:
+                raise PDFOperationError(f"Cannot append to encrypted PDF {destination.name}.")
+            base_xref = _verified_startxref(destination, base_handle, base, size)
+
+        with destination.open("ab") as handle:
+            writer = IncrementalPdfWriter(
+                handle,
+                offset=size,
+                base_trailer=base.trailer,
+                base_xref=base_xref,
+                options=options,
+            )
+            try:
+                _copy_sources(
+                    pdf_paths, writer, deduplicate=deduplicate, stats=stats, tracker=tracker
+                )
+                with tracker.stage("finish"):
+                    writer.close()
+            except BaseException:
+                handle.truncate(size)
+                raise
+    _record(stats, pdf_paths, writer, writer.bytes_written - size, started)
+    return writer.page_count
+
+
+def stream_pages(
+    reader: PdfReader,
+    pages: Sequence[PageObject],
+    handle: BinaryIO,
+    *,
+    options: OutputOptions | None = None,
+) -> int:
+    """Write ``pages`` of ``reader`` to ``handle`` as a new document; return the page count."""
+
+    writer = StreamingPdfWriter(handle, options=options)
+    SourceCopier(reader, writer).copy_pages(pages)
+    writer.close(document_info())
+    return writer.page_count
+
+
+def _verified_startxref(path: Path, handle: BinaryIO, base: PdfReader, size: int) -> int:
+    """Return the last xref offset after checking the last update against its record.
+
+    Only the bytes of the section the record describes are read, so the check costs the
+    size of the previous update rather than of the whole file.
+    """
+
+    handle.seek(max(0, size - _TAIL_BYTES))
+    match = _STARTXREF.search(handle.read())
+    if match is None:
+        raise PDFOperationError(f"{path.name} does not end with a cross-reference section.")
+    startxref = int(match[1])
+
+    record = _update_record(base, handle, startxref)
+    if record is not None:
+        start = int(record.get("/Start", -1))
+        digest = hashlib.sha256()
+        if 0 <= start <= startxref:
+            _hash_range(handle, digest, start, startxref)
+        if (
+            not 0 <= start <= startxref
+            or int(record["/XRef"]) != startxref
+            or digest.hexdigest() != record["/Digest"]
+        ):
+            raise PDFOperationError(f"{path.name} was modified after it was last written.")
+    return startxref
+
+
+def _update_record(base: PdfReader, handle: BinaryIO, startxref: int) -> DictionaryObject | None:
+    record = base.trailer.get(UPDATE_RECORD)
+    if record is None:
+        # An xref stream's dictionary doubles as the trailer, but readers keep only the
+        # standard keys of it, so the record is read from the stream object itself.
+        handle.seek(startxref)
+        try:
+            base.read_object_header(handle)
+            xref = read_object(handle, base)
+        except (PdfReadError, ValueError):
+            return None
+        if isinstance(xref, DictionaryObject) and xref.get("/Type") == "/XRef":
+            record = xref.get(UPDATE_RECORD)
+    return None if record is None else record.get_object()
+
+
+def _hash_range(handle: BinaryIO, digest: Any, start: int, end: int) -> None:
+    handle.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = handle.read(min(_HASH_CHUNK, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+
+
+def _copy_sources(
+    pdf_paths: Sequence[BinarySource],
+    writer: StreamingPdfWriter,
+    *,
+    deduplicate: bool,
+    stats: MergeStats | None,
+    tracker: Tracker,
+) -> None:
+    streams: dict[bytes, IndirectObject] | None = {} if deduplicate else None
+    for pdf in pdf_paths:
+        tracker.next_source()
+        with open_binary(pdf) as source:
+            with tracker.stage("open"):
+                try:
+                    reader = PdfReader(source)
+                except PdfReadError as exc:
+                    name = Path(pdf).name if isinstance(pdf, (str, Path)) else "input"
+                    raise PDFOperationError(f"Cannot read {name}: {exc}") from exc
+            copier = SourceCopier(reader, writer, streams=streams, stats=stats, tracker=tracker)
+            with tracker.stage("copy"):
+                copier.copy_pages()
+
+
+def _record(
+    stats: MergeStats | None,
+    pdf_paths: Sequence[BinarySource],
+    writer: StreamingPdfWriter,
+    written: int,
+    started: float,
+) -> None:
+    if stats is None:
+        return
+    stats.sources += len(pdf_paths)
+    stats.pages += writer.page_count
+    stats.bytes_written += written
+    stats.elapsed += time.perf_counter() - started
+    stats.peak_rss_bytes = peak_rss_bytes()
+
@@ -1,17 +1,30 @@
 """High-level PDF operations reused by GUI/CLI/server surfaces."""
 from __future__ import annotations
 
+import io
+import time
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import BinaryIO, Iterable, Iterator, Sequence
 
 from pypdf import PdfReader, PdfWriter
 from PIL import Image
 
+from .buffers import BinarySource, as_image_source, atomic_write, open_binary
+from .errors import PDFOperationError  # noqa: F401 - re-exported for callers
+from .events import Observer, track
+from .images import (
+    PDF_RESOLUTION,
+    ConversionSettings,
+    prepare_for_pdf,
+    resize_to_reference,
+    resolve_page_size,
+    stream_images_to_pdf,
+)
+from .merging import stream_append, stream_merge
+from .output import OutputOptions
 from .ranges import parse_page_ranges
-
-
-class PDFOperationError(RuntimeError):
-    """Raised when a PDF operation fails."""
+from .splitting import burst_ranges, part_filename, part_jobs, render_part, write_parts
+from .stats import MergeStats, SplitStats
 
 
 def normalize_paths(paths: Iterable[str | Path]) -> list[Path]:
@@ -24,56 +37,162 @@ def normalize_paths(paths: Iterable[str | Path]) -> list[Path]:
     return resolved
 
 
-def merge_pdfs(files: Sequence[str | Path], output_path: str | Path) -> Path:
-    """Merge the given PDF files into ``output_path`` and return the destination path."""
+def merge_pdfs(
+    files: Sequence[str | Path],
+    output_path: str | Path,
+    *,
+    streaming: bool = False,
+    deduplicate: bool = False,
+    append: bool = False,
+    output_options: OutputOptions | None = None,
+    stats: MergeStats | None = None,
+    observer: Observer = None,
+) -> Path:
+    """Merge the given PDF files into ``output_path`` and return the destination path.
+
+    ``streaming`` copies one input at a time straight to the output instead of building
+    the whole merged document in memory first; use it for many or very large inputs.
+    ``deduplicate`` stores byte-identical streams (fonts, logos, ICC profiles repeated by
+    every input) once. ``output_options`` packs objects into object streams, writes an
+    xref stream and recompresses weakly compressed streams (see :class:`OutputOptions`).
+    These options, and supplying ``stats`` for page, size and deduplication figures,
+    select the streaming writer.
+
+    ``append`` adds the inputs to the end of an existing ``output_path`` as an incremental
+    update instead of rewriting it, so the cost follows the pages added. It raises
+    :class:`PDFOperationError` if the file changed since this function last appended to it.
+    When ``output_path`` does not exist yet a normal streaming merge creates it.
+
+    ``observer`` receives :class:`~pdftools.core.events.Event` objects: ``open`` and
+    ``copy`` stages per input and a final ``finish`` (streaming) or ``write`` stage.
+    """
 
     pdf_paths = normalize_paths(files)
     if not pdf_paths:
         raise ValueError("At least one PDF must be supplied for merging.")
 
+    tracker = track(observer, "merge", sources=len(pdf_paths))
+    destination = Path(output_path).expanduser().resolve()
+    if append and destination.exists():
+        stream_append(
+            destination,
+            pdf_paths,
+            deduplicate=deduplicate,
+            options=output_options,
+            stats=stats,
+            tracker=tracker,
+        )
+        return destination
+    if streaming or append or deduplicate or output_options or stats is not None:
+        with atomic_write(destination) as handle:
+            stream_merge(
+                pdf_paths,
+                handle,
+                deduplicate=deduplicate,
+                options=output_options,
+                stats=stats,
+                tracker=tracker,
+            )
+        return destination
+
     writer = PdfWriter()
     for pdf in pdf_paths:
-        reader = PdfReader(pdf)
-        for page in reader.pages:
-            writer.add_page(page)
-
-    destination = Path(output_path).expanduser().resolve()
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    with destination.open("wb") as handle:
-        writer.write(handle)
+        tracker.next_source()
+        with tracker.stage("open"):
+            reader = PdfReader(pdf)
+        with tracker.stage("copy"):
+            for page in reader.pages:
+                writer.add_page(page)
+
+    with tracker.stage("write"):
+        with atomic_write(destination) as handle:
+            writer.write(handle)
+            tracker.page(handle.tell(), len(writer.pages))
     return destination
 
 
-def split_pdf(source: str | Path, ranges_expr: str, output_dir: str | Path) -> list[Path]:
+def split_pdf(
+    source: str | Path,
+    ranges_expr: str,
+    output_dir: str | Path,
+    *,
+    workers: int = 1,
+    prune_resources: bool = False,
+    output_options: OutputOptions | None = None,
+    stats: SplitStats | None = None,
+    observer: Observer = None,
+) -> list[Path]:
     """Split ``source`` PDF into ``output_dir`` based on ``ranges_expr``.
 
-    Returns a list of generated file paths.
+    Returns a list of generated file paths. ``workers > 1`` writes parts in parallel
+    processes; ``stats`` receives throughput and peak memory figures when supplied.
+    ``prune_resources`` drops fonts and images a part's pages never use from the shared
+    resource dictionaries they were copied with; ``stats.bytes_saved`` reports the savings.
+    ``output_options`` writes every part in the compact form of :func:`merge_pdfs`.
+    ``observer`` receives an ``open`` stage, then a ``write`` stage during which each part
+    reports its pages out of the total.
     """
 
     source_path = Path(source).expanduser().resolve()
     if not source_path.exists():
         raise FileNotFoundError(source_path)
 
-    reader = PdfReader(source_path)
-    ranges = parse_page_ranges(ranges_expr, len(reader.pages))
-
+    tracker = track(observer, "split")
     destination_dir = Path(output_dir).expanduser().resolve()
-    destination_dir.mkdir(parents=True, exist_ok=True)
-
-    exported: list[Path] = []
-    base_name = source_path.stem
-    for index, (start, end) in enumerate(ranges, start=1):
-        writer = PdfWriter()
-        for page_index in range(start - 1, end):
-            writer.add_page(reader.pages[page_index])
-
-        suffix = f"{start:02d}" if start == end else f"{start:02d}-{end:02d}"
-        destination = destination_dir / f"{base_name}_part{index:02d}_{suffix}.pdf"
-        with destination.open("wb") as handle:
-            writer.write(handle)
-        exported.append(destination)
+    with source_path.open("rb") as handle:
+        with tracker.stage("open"):
+            reader = PdfReader(handle)
+            ranges = parse_page_ranges(ranges_expr, len(reader.pages))
+        tracker.set_total(sum(end - start + 1 for start, end in ranges))
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        jobs = part_jobs(
+            source_path,
+            ranges,
+            destination_dir,
+            prune_resources=prune_resources,
+            output_options=output_options,
+        )
+        return write_parts(jobs, reader=reader, workers=workers, stats=stats, tracker=tracker)
+
+
+def burst_pdf(
+    source: str | Path,
+    output_dir: str | Path,
+    *,
+    pages_per_part: int = 1,
+    workers: int = 1,
+    prune_resources: bool = False,
+    output_options: OutputOptions | None = None,
+    stats: SplitStats | None = None,
+    observer: Observer = None,
+) -> list[Path]:
+    """Split ``source`` into one file per page, or per ``pages_per_part`` pages.
+
+    Parts keep the ``{stem}_partNN_...`` naming of :func:`split_pdf`. With ``workers > 1``
+    parts are written by a process pool whose workers each open the source lazily once.
+    ``prune_resources``, ``output_options`` and ``observer`` behave as in :func:`split_pdf`.
+    """
+
+    source_path = Path(source).expanduser().resolve()
+    if not source_path.exists():
+        raise FileNotFoundError(source_path)
 
-    return exported
+    tracker = track(observer, "split")
+    destination_dir = Path(output_dir).expanduser().resolve()
+    with source_path.open("rb") as handle:
+        with tracker.stage("open"):
+            reader = PdfReader(handle)
+            ranges = burst_ranges(len(reader.pages), pages_per_part)
+        tracker.set_total(len(reader.pages))
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        jobs = part_jobs(
+            source_path,
+            ranges,
+            destination_dir,
+            prune_resources=prune_resources,
+            output_options=output_options,
+        )
+        return write_parts(jobs, reader=reader, workers=workers, stats=stats, tracker=tracker)
 
 
 def convert_images_to_pdf(
@@ -81,6 +200,16 @@ def convert_images_to_pdf(
     output_path: str | Path,
     *,
     normalize_sizes: bool = False,
+    streaming: bool = False,
+    jpeg_passthrough: bool = False,
+    workers: int = 1,
+    page_size: str | tuple[float, float] | None = None,
+    dpi: float = PDF_RESOLUTION,
+    max_size: tuple[int, int] | None = None,
+    jpeg_quality: int | None = None,
+    pixel_budget: int | None = None,
+    output_options: OutputOptions | None = None,
+    observer: Observer = None,
 ) -> Path:
     """Convert images into a multi-page PDF, optionally normalizing page size.
 
@@ -88,53 +217,205 @@ def convert_images_to_pdf(
         images: Ordered sequence of paths to supported image files.
         output_path: Destination PDF path.
         normalize_sizes: When True, resize every page to match the first image's dimensions.
+        streaming: When True, decode, prepare and write one page at a time so peak memory
+            stays at roughly a single image regardless of how many pages are produced.
+        jpeg_passthrough: When True, embed baseline RGB/grayscale JPEGs without re-encoding
+            and apply their EXIF orientation through the page ``/Rotate`` and placement
+            matrix; other images are decoded and rotated upright. Implies ``streaming``.
+        workers: Number of processes used to decode, prepare and resize images. Pages keep
+            the given order and only a small window of them is in flight at once. Values
+            above 1 imply ``streaming``.
+        page_size: Fixed page size, either a name such as ``"A4"`` or ``(width, height)``
+            in points. Each image is centred and fitted on the page, and downsampled to at
+            most ``dpi`` on it. Takes precedence over ``normalize_sizes``.
+        dpi: Resolution used to lay pixels out on the page (default 300).
+        max_size: Upper bound ``(width, height)`` in pixels for every embedded image.
+        jpeg_quality: JPEG quality (1-100) for re-encoded images; Pillow's default if unset.
+        pixel_budget: Most pixels decoded at once per worker. Larger scans bypass Pillow's
+            decompression-bomb guard and are processed in strips (uncompressed layouts) or
+            decoded at reduced scale (JPEG) instead of as one full raster.
+        output_options: Compact serialization shared with :func:`merge_pdfs` (object
+            streams, xref stream, recompression).
+        observer: Receives :class:`~pdftools.core.events.Event` objects: ``decode`` and
+            ``write`` stages per page on the streaming writer (after a ``scan`` of the
+            inputs), ``decode`` per image and one ``write`` stage otherwise.
+
+    Any of the output options above selects the streaming writer, which also emits every
+    frame of a multi-page TIFF as its own page. Images that need fewer pixels than their
+    source are decoded at reduced resolution where the format allows.
     """
 
     image_paths = normalize_paths(images)
     if not image_paths:
         raise ValueError("至少需要选择一张图片。")
 
+    tracker = track(observer, "convert")
+    destination = Path(output_path).expanduser().resolve()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    settings = ConversionSettings(
+        jpeg_passthrough=jpeg_passthrough,
+        page_size=resolve_page_size(page_size),
+        dpi=dpi,
+        max_size=max_size,
+        jpeg_quality=jpeg_quality,
+        pixel_budget=pixel_budget,
+    )
+    if streaming or workers > 1 or output_options or settings != ConversionSettings():
+        with atomic_write(destination) as handle:
+            stream_images_to_pdf(
+                image_paths,
+                handle,
+                settings,
+                normalize_sizes=normalize_sizes,
+                workers=workers,
+                title=destination.stem,
+                options=output_options,
+                tracker=tracker,
+            )
+        return destination
+
+    tracker.set_total(len(image_paths))
     prepared: list[Image.Image] = []
     reference_size: tuple[int, int] | None = None
     for image_path in image_paths:
-        with Image.open(image_path) as img:
-            processed = _prepare_for_pdf(img)
+        with tracker.stage("decode"), Image.open(image_path) as img:
+            processed = prepare_for_pdf(img)
             if normalize_sizes:
                 reference_size = reference_size or processed.size
-                processed = _resize_to_reference(processed, reference_size)
+                processed = resize_to_reference(processed, reference_size)
             prepared.append(processed)
 
-    destination = Path(output_path).expanduser().resolve()
-    destination.parent.mkdir(parents=True, exist_ok=True)
     first, *rest = prepared
-    # Pillow writes the first page explicitly; append_images adds subsequent pages in order.
-    first.save(destination, "PDF", save_all=True, append_images=rest, resolution=300.0)
+    with tracker.stage("write"):
+        # Pillow writes the first page explicitly; append_images adds subsequent pages in order.
+        first.save(
+            destination, "PDF", save_all=True, append_images=rest, resolution=PDF_RESOLUTION
+        )
+        tracker.page(destination.stat().st_size, len(prepared))
     for image in prepared:
         image.close()
     return destination
 
 
-def _prepare_for_pdf(image: Image.Image) -> Image.Image:
-    """Ensure the PIL image is RGB with no alpha channel for PDF export."""
-
-    if image.mode in ("RGBA", "LA"):
-        rgba = image.convert("RGBA")
-        background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
-        composited = Image.alpha_composite(background, rgba)
-        return composited.convert("RGB")
-
-    if image.mode == "P":
-        return image.convert("RGB")
-
-    if image.mode != "RGB":
-        return image.convert("RGB")
-
-    return image.copy()
+def merge_pdfs_io(
+    sources: Sequence[BinarySource],
+    output: BinaryIO,
+    *,
+    deduplicate: bool = False,
+    output_options: OutputOptions | None = None,
+    stats: MergeStats | None = None,
+    observer: Observer = None,
+) -> int:
+    """Merge PDFs from paths, buffers or file objects into the writable ``output``.
+
+    Buffers (``bytes``, ``memoryview``, ``mmap``) are parsed in place and ``output`` only
+    needs ``write``, so nothing touches the disk. Returns the number of pages written.
+    Options behave as in :func:`merge_pdfs`.
+    """
 
+    if not sources:
+        raise ValueError("At least one PDF must be supplied for merging.")
+    return stream_merge(
+        sources,
+        output,
+        deduplicate=deduplicate,
+        options=output_options,
+        stats=stats,
+        tracker=track(observer, "merge", sources=len(sources)),
+    )
+
+
+def split_pdf_io(
+    source: BinarySource,
+    ranges_expr: str,
+    *,
+    stem: str = "document",
+    prune_resources: bool = False,
+    output_options: OutputOptions | None = None,
+    stats: SplitStats | None = None,
+    observer: Observer = None,
+) -> Iterator[tuple[str, bytes]]:
+    """Split ``source`` in memory, yielding ``(filename, pdf_bytes)`` per part as produced.
+
+    File names follow :func:`split_pdf` with ``stem`` standing in for the source name;
+    only one part is held in memory at a time. Options behave as in :func:`split_pdf`,
+    except that ``observer`` sees a ``render`` stage per part, which leaves out the time
+    the caller spends between parts.
+    """
 
-def _resize_to_reference(image: Image.Image, size: tuple[int, int]) -> Image.Image:
-    """Resize ``image`` to ``size`` using high-quality resampling."""
+    started = time.perf_counter()
+    tracker = track(observer, "split")
+    written = 0
+    with open_binary(source) as handle:
+        with tracker.stage("open"):
+            reader = PdfReader(handle)
+            ranges = parse_page_ranges(ranges_expr, len(reader.pages))
+        tracker.set_total(sum(end - start + 1 for start, end in ranges))
+        for index, (start, end) in enumerate(ranges, start=1):
+            name = part_filename(stem, index, start, end)
+            buffer = io.BytesIO()
+            with tracker.stage("render"):
+                saved = render_part(
+                    reader,
+                    start,
+                    end,
+                    buffer,
+                    prune_resources=prune_resources,
+                    output_options=output_options,
+                )
+                data = buffer.getvalue()
+            written += len(data)
+            tracker.page(written, end - start + 1)
+            if stats is not None:
+                stats.parts += 1
+                stats.pages += end - start + 1
+                stats.bytes_written += len(data)
+                stats.elapsed = time.perf_counter() - started
+                if saved:
+                    stats.bytes_saved[Path(name)] = saved
+            yield name, data
+
+
+def convert_images_to_pdf_io(
+    images: Sequence[BinarySource],
+    output: BinaryIO,
+    *,
+    normalize_sizes: bool = False,
+    jpeg_passthrough: bool = False,
+    workers: int = 1,
+    page_size: str | tuple[float, float] | None = None,
+    dpi: float = PDF_RESOLUTION,
+    max_size: tuple[int, int] | None = None,
+    jpeg_quality: int | None = None,
+    pixel_budget: int | None = None,
+    output_options: OutputOptions | None = None,
+    title: str | None = None,
+    observer: Observer = None,
+) -> None:
+    """Convert images from paths, buffers or file objects into a PDF written to ``output``.
+
+    Always uses the streaming writer; options behave as in :func:`convert_images_to_pdf`.
+    File objects are read into memory once, since large scans are reopened per strip.
+    """
 
-    if image.size == size:
-        return image
-    return image.resize(size, Image.Resampling.LANCZOS)
+    if not images:
+        raise ValueError("至少需要选择一张图片。")
+    settings = ConversionSettings(
+        jpeg_passthrough=jpeg_passthrough,
+        page_size=resolve_page_size(page_size),
+        dpi=dpi,
+        max_size=max_size,
+        jpeg_quality=jpeg_quality,
+        pixel_budget=pixel_budget,
+    )
+    stream_images_to_pdf(
+        [as_image_source(image, index) for index, image in enumerate(images)],
+        output,
+        settings,
+        normalize_sizes=normalize_sizes,
+        workers=workers,
+        title=title,
+        options=output_options,
+        tracker=track(observer, "convert"),
+    )
@@ -0,0 +1,85 @@
+"""Output-size options shared by every writer in ``pdftools.core``."""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+
+from pypdf import filters
+from pypdf.errors import PdfReadError
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject
+
+# Filters that only re-encode bytes losslessly and can be replaced by a single Flate pass.
+# Image codecs (DCT, JPX, JBIG2, CCITT) are never touched.
+_GENERIC_DECODERS = {
+    "/FlateDecode": filters.FlateDecode.decode,
+    "/LZWDecode": filters.LZWDecode.decode,
+    "/ASCIIHexDecode": filters.ASCIIHexDecode.decode,
+    "/ASCII85Decode": filters.ASCII85Decode.decode,
+    "/RunLengthDecode": filters.RunLengthDecode.decode,
+}
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """How compactly a document is serialized.
+
+    ``object_streams`` packs up to ``objects_per_stream`` non-stream objects into each
+    compressed object stream and implies ``xref_stream``, a compressed cross-reference
+    stream in place of the classic table. ``recompress`` re-deflates streams that are
+    unfiltered or only carry generic filters, at ``compression_level``, whenever that makes
+    them smaller. The defaults are the most compact output; both stream kinds need PDF 1.5.
+    """
+
+    object_streams: bool = True
+    xref_stream: bool = True
+    recompress: bool = True
+    compression_level: int = 9
+    objects_per_stream: int = 100
+
+    def __post_init__(self) -> None:
+        if self.object_streams and not self.xref_stream:
+            raise ValueError("object_streams requires xref_stream")
+        if not 0 <= self.compression_level <= 9:
+            raise ValueError("compression_level must be between 0 and 9")
+        if self.objects_per_stream < 1:
+            raise ValueError("objects_per_stream must be at least 1")
+
+    @property
+    def minimum_version(self) -> str:
+        return "1.5" if self.xref_stream else "1.0"
+
+
+def recompressed(
+    dictionary: DictionaryObject, data: bytes, options: OutputOptions
+) -> tuple[DictionaryObject, bytes]:
+    """Return ``dictionary`` and ``data`` re-encoded with one Flate pass if that is smaller.
+
+    Streams with image codecs, predictors or anything that fails to decode come back
+    unchanged.
+    """
+
+    chain = dictionary.get("/Filter")
+    if chain is None:
+        names: list[str] = []
+    elif isinstance(chain, ArrayObject):
+        names = [str(name) for name in chain]
+    else:
+        names = [str(chain)]
+    if "/DecodeParms" in dictionary or "/DP" in dictionary or "/F" in dictionary:
+        return dictionary, data
+    if any(name not in _GENERIC_DECODERS for name in names):
+        return dictionary, data
+
+    decoded = data
+    try:
+        for name in names:
+            decoded = _GENERIC_DECODERS[name](decoded)
+    except (PdfReadError, ValueError, zlib.error):
+        return dictionary, data
+    packed = zlib.compress(decoded, options.compression_level)
+    if len(packed) >= len(data):
+        return dictionary, data
+
+    header = DictionaryObject(dictionary)
+    header[NameObject("/Filter")] = NameObject("/FlateDecode")
+    return header, packed
@@ -0,0 +1,52 @@
+"""Process-pool helpers shared by the batch-oriented core operations."""
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Create a pool whose workers start fresh, which is safe from GUI and server threads."""
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int = 1,
+    window: int | None = None,
+) -> Iterator[R]:
+    """Yield ``fn(item)`` for every item, in input order.
+
+    With ``workers > 1`` the calls run in a process pool, but at most ``window`` results
+    (default ``2 * workers``) are in flight or buffered at any time so memory stays bounded
+    no matter how many items are supplied. ``fn`` and the items must be picklable.
+    """
+
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if workers == 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    limit = max(window or 2 * workers, 1)
+    pending: deque[Future[R]] = deque()
+    with process_pool(workers) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(fn, item))
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
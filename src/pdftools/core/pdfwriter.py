@@ -0,0 +1,433 @@
+"""Incremental PDF writer that emits objects as soon as they are produced."""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import io
+import time
+import zlib
+from typing import BinaryIO, Iterable
+
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    TextStringObject,
+)
+
+from .output import OutputOptions, recompressed
+
+
+class StreamingPdfWriter:
+    """Write a PDF front to back without keeping finished objects in memory.
+
+    Objects are serialized to ``handle`` the moment they are added; only their byte
+    offsets are retained so the cross-reference table can be emitted by :meth:`close`.
+    Pages are collected into a single flat page tree whose node is written last.
+
+    With :class:`OutputOptions` non-stream objects are buffered into compressed object
+    streams of ``objects_per_stream`` entries, the cross-reference section becomes a
+    compressed xref stream and weakly compressed streams are re-deflated.
+
+    With ``record`` the trailer carries an :data:`UPDATE_RECORD` (see
+    :class:`IncrementalPdfWriter`) so a later append can check the file is unchanged.
+    """
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        *,
+        version: str = "1.4",
+        options: OutputOptions | None = None,
+        record: bool = False,
+    ) -> None:
+        self._start(handle, offset=0, next_number=1, options=options, record=record)
+        self.pages_ref = self.reserve()
+        if options is not None:
+            version = max(version, options.minimum_version, key=float)
+        self._write(f"%PDF-{version}\n".encode("ascii") + b"%\xe2\xe3\xcf\xd3\n")
+
+    def _start(
+        self,
+        handle: BinaryIO,
+        *,
+        offset: int,
+        next_number: int,
+        options: OutputOptions | None,
+        record: bool = False,
+    ) -> None:
+        self._handle = handle
+        self._offset = offset
+        # Where this writer's section starts and, with an update record, a SHA-256 of
+        # every byte it has written.
+        self._section_start = offset
+        self._digest = hashlib.sha256() if record else None
+        self._options = options
+        self._offsets: dict[int, tuple[int, int]] = {}
+        # Objects packed into object streams: number -> (object stream number, index).
+        self._packed: dict[int, tuple[int, int]] = {}
+        self._batch: list[tuple[int, bytes]] = []
+        self._batch_ref: IndirectObject | None = None
+        self._next_number = next_number
+        self._kids: list[IndirectObject] = []
+        self._closed = False
+
+    def __enter__(self) -> "StreamingPdfWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and not self._closed:
+            self.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._kids)
+
+    @property
+    def bytes_written(self) -> int:
+        return self._offset
+
+    def reserve(self) -> IndirectObject:
+        """Allocate an object number that will be written later."""
+
+        ref = IndirectObject(self._next_number, 0, None)
+        self._next_number += 1
+        return ref
+
+    def write_object(self, obj: PdfObject, ref: IndirectObject | None = None) -> IndirectObject:
+        """Serialize a non-stream object and return its indirect reference."""
+
+        ref = ref or self.reserve()
+        buffer = io.BytesIO()
+        obj.write_to_stream(buffer)
+        if self._options is not None and self._options.object_streams and not ref.generation:
+            self._check_unwritten(ref)
+            if self._batch_ref is None:
+                self._batch_ref = self.reserve()
+            self._packed[ref.idnum] = (self._batch_ref.idnum, len(self._batch))
+            self._batch.append((ref.idnum, buffer.getvalue()))
+            if len(self._batch) >= self._options.objects_per_stream:
+                self._flush_batch()
+            return ref
+        self._begin_object(ref)
+        self._write(buffer.getvalue())
+        self._write(b"\nendobj\n")
+        return ref
+
+    def write_stream(
+        self,
+        dictionary: DictionaryObject,
+        data: bytes | Iterable[bytes],
+        ref: IndirectObject | None = None,
+    ) -> IndirectObject:
+        """Write a stream object whose (already encoded) payload is ``data``.
+
+        ``data`` may be an iterable of chunks; the stream length is then written as a
+        separate indirect object so the payload never has to be held in memory at once.
+        """
+
+        if self._options is not None and self._options.recompress:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                dictionary, data = recompressed(dictionary, bytes(data), self._options)
+        return self._emit_stream(dictionary, data, ref)
+
+    def _emit_stream(
+        self,
+        dictionary: DictionaryObject,
+        data: bytes | Iterable[bytes],
+        ref: IndirectObject | None = None,
+    ) -> IndirectObject:
+        ref = ref or self.reserve()
+        header = DictionaryObject(dictionary)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            chunks: Iterable[bytes] = (bytes(data),)
+            header[NameObject("/Length")] = NumberObject(len(data))
+            length_ref = None
+        else:
+            chunks = data
+            length_ref = self.reserve()
+            header[NameObject("/Length")] = length_ref
+
+        buffer = io.BytesIO()
+        header.write_to_stream(buffer)
+        self._begin_object(ref)
+        self._write(buffer.getvalue())
+        self._write(b"\nstream\n")
+        length = 0
+        for chunk in chunks:
+            if chunk:
+                self._write(chunk)
+                length += len(chunk)
+        self._write(b"\nendstream\nendobj\n")
+        if length_ref is not None:
+            self.write_object(NumberObject(length), length_ref)
+        return ref
+
+    def add_page(self, page: DictionaryObject, ref: IndirectObject | None = None) -> IndirectObject:
+        """Attach ``page`` to the page tree and write it immediately."""
+
+        page[NameObject("/Type")] = NameObject("/Page")
+        page[NameObject("/Parent")] = self.pages_ref
+        ref = self.write_object(page, ref)
+        self._kids.append(ref)
+        return ref
+
+    def close(self, info: DictionaryObject | None = None) -> None:
+        """Write the page tree, catalog, cross-reference table and trailer."""
+
+        if self._closed:
+            return
+        if not self._kids:
+            raise ValueError("A PDF needs at least one page.")
+        pages = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Pages"),
+                NameObject("/Kids"): ArrayObject(self._kids),
+                NameObject("/Count"): NumberObject(len(self._kids)),
+            }
+        )
+        self.write_object(pages, self.pages_ref)
+        catalog = DictionaryObject(
+            {NameObject("/Type"): NameObject("/Catalog"), NameObject("/Pages"): self.pages_ref}
+        )
+        root_ref = self.write_object(catalog)
+        trailer = DictionaryObject({NameObject("/Root"): root_ref})
+        if info is not None:
+            trailer[NameObject("/Info")] = self.write_object(info)
+        self._finish(trailer)
+
+    def _finish(self, trailer: DictionaryObject, numbers: Iterable[int] | None = None) -> int:
+        """Write the xref section for ``numbers`` and ``trailer``; return the xref offset.
+
+        ``numbers`` defaults to every allocated object number. Consecutive numbers share a
+        subsection; numbers that were never written are listed as free entries.
+        """
+
+        self._flush_batch()
+        xref_ref = None
+        if self._options is not None and self._options.xref_stream:
+            xref_ref = self.reserve()
+            # The xref stream lists itself, so its offset is recorded before it is written.
+            self._offsets[xref_ref.idnum] = (self._offset, 0)
+        numbers = range(self._next_number) if numbers is None else [*numbers]
+        if xref_ref is not None and xref_ref.idnum not in numbers:
+            numbers.append(xref_ref.idnum)
+        sections = _subsections(sorted(numbers))
+        trailer[NameObject("/Size")] = NumberObject(self._next_number)
+
+        xref_offset = self._offset
+        if self._digest is not None:
+            trailer[NameObject(UPDATE_RECORD)] = DictionaryObject(
+                {
+                    NameObject("/Start"): NumberObject(self._section_start),
+                    NameObject("/XRef"): NumberObject(xref_offset),
+                    NameObject("/Digest"): TextStringObject(self._digest.hexdigest()),
+                }
+            )
+        if xref_ref is not None:
+            self._write_xref_stream(xref_ref, trailer, sections)
+        else:
+            self._write_xref_table(trailer, sections)
+        self._write(f"\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+        self._closed = True
+        return xref_offset
+
+    def _write_xref_table(self, trailer: DictionaryObject, sections: list[range]) -> None:
+        lines = [b"xref\n"]
+        for section in sections:
+            lines.append(f"{section.start} {len(section)}\n".encode("ascii"))
+            for number in section:
+                entry = self._offsets.get(number)
+                if entry is None:
+                    lines.append(b"0000000000 65535 f \n")
+                else:
+                    lines.append(f"{entry[0]:010d} {entry[1]:05d} n \n".encode("ascii"))
+        self._write(b"".join(lines))
+        buffer = io.BytesIO()
+        trailer.write_to_stream(buffer)
+        self._write(b"trailer\n" + buffer.getvalue())
+
+    def _write_xref_stream(
+        self, ref: IndirectObject, trailer: DictionaryObject, sections: list[range]
+    ) -> None:
+        rows = []
+        for section in sections:
+            for number in section:
+                if number in self._offsets:
+                    offset, generation = self._offsets[number]
+                    rows.append((1, offset, generation))
+                elif number in self._packed:
+                    rows.append((2, *self._packed[number]))
+                else:
+                    rows.append((0, 0, 65535))
+        width = max(1, (max(row[1] for row in rows).bit_length() + 7) // 8)
+        data = b"".join(
+            kind.to_bytes(1, "big") + field.to_bytes(width, "big") + extra.to_bytes(2, "big")
+            for kind, field, extra in rows
+        )
+        header = DictionaryObject(trailer)
+        header.update(
+            {
+                NameObject("/Type"): NameObject("/XRef"),
+                NameObject("/W"): ArrayObject(
+                    [NumberObject(1), NumberObject(width), NumberObject(2)]
+                ),
+                NameObject("/Index"): ArrayObject(
+                    NumberObject(value)
+                    for section in sections
+                    for value in (section.start, len(section))
+                ),
+                NameObject("/Filter"): NameObject("/FlateDecode"),
+            }
+        )
+        del self._offsets[ref.idnum]
+        self._emit_stream(header, zlib.compress(data, self._options.compression_level), ref)
+
+    def _flush_batch(self) -> None:
+        """Write the buffered objects as one compressed object stream."""
+
+        if not self._batch:
+            return
+        batch, stream_ref = self._batch, self._batch_ref
+        self._batch, self._batch_ref = [], None
+        pairs = []
+        bodies = []
+        position = 0
+        for number, body in batch:
+            pairs.append(f"{number} {position}")
+            bodies.append(body)
+            position += len(body) + 1
+        index_line = " ".join(pairs).encode("ascii") + b"\n"
+        payload = index_line + b"\n".join(bodies) + b"\n"
+        header = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/ObjStm"),
+                NameObject("/N"): NumberObject(len(batch)),
+                NameObject("/First"): NumberObject(len(index_line)),
+                NameObject("/Filter"): NameObject("/FlateDecode"),
+            }
+        )
+        level = self._options.compression_level
+        self._emit_stream(header, zlib.compress(payload, level), stream_ref)
+
+    # ------------------------------------------------------------------ helpers
+    def _check_unwritten(self, ref: IndirectObject) -> None:
+        if ref.idnum in self._offsets or ref.idnum in self._packed:
+            raise ValueError(f"Object {ref.idnum} has already been written.")
+
+    def _begin_object(self, ref: IndirectObject) -> None:
+        self._check_unwritten(ref)
+        self._offsets[ref.idnum] = (self._offset, ref.generation)
+        self._write(f"{ref.idnum} {ref.generation} obj\n".encode("ascii"))
+
+    def _write(self, data: bytes) -> None:
+        self._handle.write(data)
+        self._offset += len(data)
+        if self._digest is not None:
+            self._digest.update(data)
+
+
+def _subsections(numbers: list[int]) -> list[range]:
+    """Group sorted object numbers into runs of consecutive numbers."""
+
+    sections: list[range] = []
+    for number in numbers:
+        if sections and sections[-1].stop == number:
+            sections[-1] = range(sections[-1].start, number + 1)
+        else:
+            sections.append(range(number, number + 1))
+    return sections
+
+
+# Trailer key recording where the last section written by this module starts, its xref
+# offset and a SHA-256 of the bytes between the two.
+UPDATE_RECORD = "/PdfToolsUpdate"
+
+
+class IncrementalPdfWriter(StreamingPdfWriter):
+    """Append pages to an existing PDF as an incremental update.
+
+    New objects are numbered after the base document's ``/Size`` and written from
+    ``offset`` (the base file's length) onwards; :meth:`close` rewrites the root page tree
+    node with the new kids appended, then adds an xref section covering only the objects
+    written here and a trailer whose ``/Prev`` points at the base xref. Nothing before
+    ``offset`` is read or rewritten, so the cost follows the pages added.
+
+    The trailer's :data:`UPDATE_RECORD` covers the update's own bytes up to its xref
+    section, so the next append can confirm the last update is intact by reading only
+    that section.
+    """
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        *,
+        offset: int,
+        base_trailer: DictionaryObject,
+        base_xref: int,
+        options: OutputOptions | None = None,
+    ) -> None:
+        if options is not None:
+            # The update keeps a classic xref section: the update record must survive in the
+            # trailer, which readers do not carry over from xref stream dictionaries.
+            options = dataclasses.replace(options, object_streams=False, xref_stream=False)
+        self._start(
+            handle,
+            offset=offset,
+            next_number=int(base_trailer["/Size"]),
+            options=options,
+            record=True,
+        )
+        root = base_trailer["/Root"].get_object()
+        pages_ref = root.raw_get("/Pages")
+        if not isinstance(pages_ref, IndirectObject):
+            raise ValueError("The base document's page tree is not an indirect object.")
+        self.pages_ref = IndirectObject(pages_ref.idnum, pages_ref.generation, None)
+        # Everything needed from the base is resolved now, before any bytes are appended.
+        self._base_pages = DictionaryObject(pages_ref.get_object())
+        self._base_kids = list(self._base_pages["/Kids"].get_object())
+        self._base_count = int(self._base_pages["/Count"])
+        self._base_trailer = DictionaryObject(
+            {
+                NameObject(key): base_trailer.raw_get(key)
+                for key in ("/Root", "/Info", "/ID")
+                if key in base_trailer
+            }
+        )
+        self._base_xref = base_xref
+
+    def close(self, info: DictionaryObject | None = None) -> None:
+        """Write the extended page tree node, the update's xref section and trailer.
+
+        ``info`` replaces the base document's ``/Info`` dictionary when given.
+        """
+
+        if self._closed:
+            return
+        if not self._kids:
+            raise ValueError("An incremental update needs at least one page.")
+        pages = DictionaryObject(self._base_pages)
+        pages[NameObject("/Kids")] = ArrayObject(self._base_kids + self._kids)
+        pages[NameObject("/Count")] = NumberObject(self._base_count + len(self._kids))
+        self.write_object(pages, self.pages_ref)
+
+        trailer = DictionaryObject(self._base_trailer)
+        if info is not None:
+            trailer[NameObject("/Info")] = self.write_object(info)
+        trailer[NameObject("/Prev")] = NumberObject(self._base_xref)
+        self._finish(trailer, [*self._offsets])
+
+
+def document_info(title: str | None = None) -> DictionaryObject:
+    """Build a minimal ``/Info`` dictionary stamped with the current time."""
+
+    info = DictionaryObject()
+    if title:
+        info[NameObject("/Title")] = TextStringObject(title)
+    stamp = time.strftime("D:%Y%m%d%H%M%SZ", time.gmtime())
+    info[NameObject("/CreationDate")] = TextStringObject(stamp)
+    info[NameObject("/ModDate")] = TextStringObject(stamp)
+    return info
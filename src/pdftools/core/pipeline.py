@@ -0,0 +1,336 @@
+"""Chained convert / merge / select / split runs that only serialize their final outputs."""
+from __future__ import annotations
+
+import io
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from itertools import groupby
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Sequence, Tuple, Union
+
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
+
+from .buffers import (
+    BinarySource,
+    InMemoryFile,
+    as_image_source,
+    atomic_write,
+    is_path,
+    open_binary,
+)
+from .images import (
+    PDF_RESOLUTION,
+    ConversionSettings,
+    EncodedImage,
+    ImageFrame,
+    displayed_size,
+    encode_page,
+    iter_frames,
+    resolve_page_size,
+    write_image_page,
+)
+from .merging import SourceCopier
+from .output import OutputOptions
+from .parallel import ordered_map
+from .pdfwriter import StreamingPdfWriter, document_info
+from .ranges import Range, parse_page_ranges
+from .splitting import part_filename
+from .stats import MergeStats, SplitStats, peak_rss_bytes
+
+
+@dataclass(frozen=True)
+class _PdfInput:
+    source: BinarySource
+
+
+@dataclass(frozen=True)
+class _ImageInput:
+    images: Tuple[Union[Path, InMemoryFile], ...]
+    settings: ConversionSettings
+    normalize_sizes: bool
+
+
+@dataclass(frozen=True)
+class _Select:
+    pages: Union[str, Tuple[int, ...]]
+
+
+_Stage = Union[_PdfInput, _ImageInput, _Select]
+
+
+class _PdfPage(NamedTuple):
+    """Page ``index`` (0-based) of the PDF added by stage ``source``."""
+
+    source: int
+    index: int
+
+
+class _ImagePage(NamedTuple):
+    frame: ImageFrame
+    settings: ConversionSettings
+
+
+_PlannedPage = Union[_PdfPage, _ImagePage]
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """A lazily evaluated document built from PDFs and images, written out at the end.
+
+    Each method returns a new pipeline with one more stage, so runs read left to right::
+
+        Pipeline().add_pdfs(["cover.pdf"]).add_images(scans, page_size="A4").split(
+            "1-10,11-", "chapters"
+        )
+
+    Nothing is read until a terminal method (:meth:`write`, :meth:`write_io`,
+    :meth:`split`, :meth:`split_io`) runs. Stages only ever describe pages: PDF pages are
+    copied straight from their sources and images are encoded straight into each output,
+    so no intermediate document is written or parsed again. Pipelines over paths and
+    ``bytes`` can be pickled and run in another process.
+
+    ``deduplicate`` and ``output_options`` behave as in :func:`merge_pdfs`; ``workers``
+    encodes images in a process pool as in :func:`convert_images_to_pdf`.
+    """
+
+    stages: Tuple[_Stage, ...] = ()
+    deduplicate: bool = False
+    output_options: OutputOptions | None = None
+    workers: int = 1
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1")
+
+    def add_pdfs(self, sources: Sequence[BinarySource]) -> "Pipeline":
+        """Append every page of ``sources`` (paths, buffers or seekable file objects)."""
+
+        stages = tuple(
+            _PdfInput(Path(source).expanduser().resolve() if is_path(source) else source)
+            for source in sources
+        )
+        return replace(self, stages=self.stages + stages)
+
+    def add_images(
+        self,
+        images: Sequence[BinarySource],
+        *,
+        normalize_sizes: bool = False,
+        jpeg_passthrough: bool = False,
+        page_size: str | tuple[float, float] | None = None,
+        dpi: float = PDF_RESOLUTION,
+        max_size: tuple[int, int] | None = None,
+        jpeg_quality: int | None = None,
+        pixel_budget: int | None = None,
+    ) -> "Pipeline":
+        """Append one page per image frame, with the options of :func:`convert_images_to_pdf`.
+
+        ``normalize_sizes`` matches the first image of this call only.
+        """
+
+        if not images:
+            raise ValueError("至少需要选择一张图片。")
+        settings = ConversionSettings(
+            jpeg_passthrough=jpeg_passthrough,
+            page_size=resolve_page_size(page_size),
+            dpi=dpi,
+            max_size=max_size,
+            jpeg_quality=jpeg_quality,
+            pixel_budget=pixel_budget,
+        )
+        sources = tuple(as_image_source(image, index) for index, image in enumerate(images))
+        return replace(
+            self, stages=self.stages + (_ImageInput(sources, settings, normalize_sizes),)
+        )
+
+    def select(self, pages: str | Sequence[int]) -> "Pipeline":
+        """Keep only ``pages`` of everything added so far.
+
+        ``pages`` is either a range expression as accepted by :func:`parse_page_ranges`,
+        which keeps document order, or a sequence of 1-based page numbers, which may
+        reorder and repeat pages.
+        """
+
+        selection = pages if isinstance(pages, str) else tuple(int(page) for page in pages)
+        return replace(self, stages=self.stages + (_Select(selection),))
+
+    def write(self, output_path: str | Path, *, stats: MergeStats | None = None) -> Path:
+        """Write every page to ``output_path`` and return the destination path."""
+
+        destination = Path(output_path).expanduser().resolve()
+        with atomic_write(destination) as handle:
+            self.write_io(handle, title=destination.stem, stats=stats)
+        return destination
+
+    def write_io(
+        self,
+        output: BinaryIO,
+        *,
+        title: str | None = None,
+        stats: MergeStats | None = None,
+    ) -> int:
+        """Write every page to the writable ``output`` and return the page count."""
+
+        started = time.perf_counter()
+        pages = self._plan()
+        encoded = self._encoded([pages])
+        try:
+            writer = self._render(pages, encoded, output, title=title, stats=stats)
+        finally:
+            encoded.close()
+        if stats is not None:
+            stats.sources += sum(not isinstance(stage, _Select) for stage in self.stages)
+            stats.pages += writer.page_count
+            stats.bytes_written += writer.bytes_written
+            stats.elapsed += time.perf_counter() - started
+            stats.peak_rss_bytes = peak_rss_bytes()
+        return writer.page_count
+
+    def split(
+        self,
+        ranges_expr: str,
+        output_dir: str | Path,
+        *,
+        stem: str = "document",
+        stats: SplitStats | None = None,
+    ) -> list[Path]:
+        """Write each range of ``ranges_expr`` to ``output_dir``, named as by :func:`split_pdf`."""
+
+        destination_dir = Path(output_dir).expanduser().resolve()
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        exported: list[Path] = []
+        for name, data in self.split_io(ranges_expr, stem=stem, stats=stats):
+            destination = destination_dir / name
+            with atomic_write(destination) as handle:
+                handle.write(data)
+            exported.append(destination)
+        if stats is not None:
+            stats.outputs.extend(exported)
+        return exported
+
+    def split_io(
+        self,
+        ranges_expr: str,
+        *,
+        stem: str = "document",
+        stats: SplitStats | None = None,
+    ) -> Iterator[tuple[str, bytes]]:
+        """Yield ``(filename, pdf_bytes)`` for each range of ``ranges_expr`` as it is written.
+
+        Only one part is held in memory at a time. Image pages are encoded by the worker
+        pool ahead of the part being written; a page in several overlapping ranges is
+        encoded again for each part that contains it.
+        """
+
+        started = time.perf_counter()
+        pages = self._plan()
+        ranges: list[Range] = parse_page_ranges(ranges_expr, len(pages))
+        parts = [pages[start - 1 : end] for start, end in ranges]
+        encoded = self._encoded(parts)
+        try:
+            for index, ((start, end), part) in enumerate(zip(ranges, parts), start=1):
+                name = part_filename(stem, index, start, end)
+                buffer = io.BytesIO()
+                self._render(part, encoded, buffer, title=Path(name).stem)
+                data = buffer.getvalue()
+                if stats is not None:
+                    stats.parts += 1
+                    stats.pages += len(part)
+                    stats.bytes_written += len(data)
+                    stats.elapsed = time.perf_counter() - started
+                    stats.peak_rss_bytes = peak_rss_bytes()
+                yield name, data
+        finally:
+            encoded.close()
+
+    def _plan(self) -> list[_PlannedPage]:
+        """Resolve the stages into the ordered list of pages to write."""
+
+        pages: list[_PlannedPage] = []
+        for position, stage in enumerate(self.stages):
+            if isinstance(stage, _PdfInput):
+                with open_binary(stage.source) as handle:
+                    count = len(PdfReader(handle).pages)
+                pages.extend(_PdfPage(position, index) for index in range(count))
+            elif isinstance(stage, _ImageInput):
+                settings = stage.settings
+                if stage.normalize_sizes and settings.reference_size is None:
+                    first = ImageFrame(stage.images[0])
+                    settings = replace(settings, reference_size=displayed_size(first, settings))
+                pages.extend(
+                    _ImagePage(frame, settings) for frame in iter_frames(stage.images, settings)
+                )
+            else:
+                pages = _selected(pages, stage.pages)
+        if not pages:
+            raise ValueError("The pipeline produces no pages.")
+        return pages
+
+    def _encoded(self, parts: Sequence[Sequence[_PlannedPage]]) -> Iterator[EncodedImage]:
+        images = (page for part in parts for page in part if isinstance(page, _ImagePage))
+        return ordered_map(_encode, images, workers=self.workers)
+
+    def _render(
+        self,
+        pages: Sequence[_PlannedPage],
+        encoded: Iterator[EncodedImage],
+        handle: BinaryIO,
+        *,
+        title: str | None,
+        stats: MergeStats | None = None,
+    ) -> StreamingPdfWriter:
+        """Write ``pages`` as one document, taking image pages from ``encoded`` in order.
+
+        A PDF source stays open from its first to its last run of pages in this document,
+        so objects shared between its runs (fonts, images) are written once.
+        """
+
+        writer = StreamingPdfWriter(handle, options=self.output_options)
+        streams: dict[bytes, IndirectObject] | None = {} if self.deduplicate else None
+        last_run = {
+            page.source: position
+            for position, page in enumerate(pages)
+            if isinstance(page, _PdfPage)
+        }
+        copiers: dict[int, tuple[ExitStack, PdfReader, SourceCopier]] = {}
+        try:
+            position = 0
+            for source, run in groupby(pages, key=lambda page: getattr(page, "source", None)):
+                run = list(run)
+                position += len(run)
+                if source is None:
+                    for _ in run:
+                        write_image_page(writer, next(encoded))
+                    continue
+                if source not in copiers:
+                    stack = ExitStack()
+                    stage = self.stages[source]
+                    reader = PdfReader(stack.enter_context(open_binary(stage.source)))
+                    copier = SourceCopier(reader, writer, streams=streams, stats=stats)
+                    copiers[source] = (stack, reader, copier)
+                stack, reader, copier = copiers[source]
+                copier.copy_pages([reader.pages[page.index] for page in run])
+                if last_run[source] < position:
+                    del copiers[source]
+                    stack.close()
+        finally:
+            for stack, _, _ in copiers.values():
+                stack.close()
+        writer.close(document_info(title))
+        return writer
+
+
+def _selected(pages: list[_PlannedPage], selection: str | tuple[int, ...]) -> list[_PlannedPage]:
+    if isinstance(selection, str):
+        ranges = parse_page_ranges(selection, len(pages))
+        return [page for start, end in ranges for page in pages[start - 1 : end]]
+    for number in selection:
+        if not 1 <= number <= len(pages):
+            raise ValueError(f"Page {number} is outside 1-{len(pages)}")
+    return [pages[number - 1] for number in selection]
+
+
+def _encode(page: _ImagePage) -> EncodedImage:
+    return encode_page(page.frame, page.settings)
@@ -0,0 +1,158 @@
+"""Cheap PDF inspection: page count, version and encryption without loading pages."""
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from pypdf import PdfReader
+from pypdf.errors import FileNotDecryptedError, PdfReadError
+
+from .parallel import ordered_map
+
+
+@dataclass(frozen=True)
+class PdfInfo:
+    """What :func:`probe_pdf` learned about one file.
+
+    ``pages`` is None when the page tree cannot be read without a user password; ``error``
+    carries the reason a file could not be probed at all (other fields are then empty).
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+    version: str | None = None
+    pages: int | None = None
+    encrypted: bool = False
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def probe_pdf(path: str | Path) -> PdfInfo:
+    """Read only the header, xref, trailer, catalog and page-tree root of ``path``.
+
+    Individual pages are never visited, so the cost does not depend on the page count.
+    Unreadable files are reported through :attr:`PdfInfo.error` rather than raised.
+    """
+
+    path = Path(path).expanduser().resolve()
+    size = mtime_ns = 0
+    try:
+        stat = path.stat()
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        with path.open("rb") as handle:
+            reader = PdfReader(handle)
+            version = reader.pdf_header.removeprefix("%PDF-") or None
+            encrypted = reader.is_encrypted
+            try:
+                root = reader.trailer["/Root"].get_object()
+                # A catalog /Version may only raise the header version.
+                catalog_version = str(root.get("/Version") or "")[1:]
+                if _version_key(catalog_version) > _version_key(version):
+                    version = catalog_version
+                pages = int(root["/Pages"].get_object()["/Count"])
+            except FileNotDecryptedError:
+                pages = None
+    except (PdfReadError, KeyError, TypeError, ValueError, OSError) as exc:
+        return PdfInfo(path, size, mtime_ns, error=str(exc) or type(exc).__name__)
+    return PdfInfo(path, size, mtime_ns, version, pages, encrypted)
+
+
+def _version_key(version: str | None) -> tuple[int, ...]:
+    # Numeric parts, so 1.10 sorts after 1.9; anything unparsable sorts first.
+    try:
+        return tuple(int(part) for part in (version or "").split("."))
+    except ValueError:
+        return (-1,)
+
+
+class ProbeIndex:
+    """Persistent cache of :class:`PdfInfo` keyed by ``(path, size, mtime)``.
+
+    Backed by a SQLite file so thousands of entries load lazily and survive restarts. A
+    file whose size or modification time changed simply misses and is probed again.
+    """
+
+    def __init__(self, database: str | Path) -> None:
+        self._connection = sqlite3.connect(str(database))
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version TEXT,"
+            " pages INTEGER, encrypted INTEGER, error TEXT)"
+        )
+
+    def __enter__(self) -> "ProbeIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def get(self, path: Path, size: int, mtime_ns: int) -> PdfInfo | None:
+        row = self._connection.execute(
+            "SELECT version, pages, encrypted, error FROM probes"
+            " WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(path), size, mtime_ns),
+        ).fetchone()
+        if row is None:
+            return None
+        version, pages, encrypted, error = row
+        return PdfInfo(path, size, mtime_ns, version, pages, bool(encrypted), error)
+
+    def put(self, infos: Iterable[PdfInfo]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        str(info.path),
+                        info.size,
+                        info.mtime_ns,
+                        info.version,
+                        info.pages,
+                        int(info.encrypted),
+                        info.error,
+                    )
+                    for info in infos
+                ],
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def probe_pdfs(
+    paths: Iterable[str | Path],
+    *,
+    workers: int = 1,
+    index: ProbeIndex | None = None,
+) -> list[PdfInfo]:
+    """Probe every path, in order, reusing and refreshing ``index`` when given.
+
+    Only files missing from the index (or changed since) are opened; with ``workers > 1``
+    those are probed in a process pool.
+    """
+
+    resolved = [Path(path).expanduser().resolve() for path in paths]
+    found: dict[int, PdfInfo] = {}
+    if index is not None:
+        for position, path in enumerate(resolved):
+            try:
+                stat = path.stat()
+            except OSError:
+                # Left to probe_pdf, which reports the error in its PdfInfo.
+                continue
+            cached = index.get(path, stat.st_size, stat.st_mtime_ns)
+            if cached is not None:
+                found[position] = cached
+
+    misses = [position for position in range(len(resolved)) if position not in found]
+    probed = list(ordered_map(probe_pdf, [resolved[i] for i in misses], workers=workers))
+    found.update(zip(misses, probed))
+    if index is not None and probed:
+        index.put(probed)
+    return [found[position] for position in range(len(resolved))]
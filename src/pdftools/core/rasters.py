@@ -0,0 +1,125 @@
+"""Band-by-band decoding for rasters too large to load in one piece."""
+from __future__ import annotations
+
+import warnings
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+from PIL import Image
+
+from .buffers import InMemoryFile
+from .errors import PDFOperationError
+
+
+def open_frame(
+    path: Path | InMemoryFile, frame: int = 0, *, lift_guard: bool = False
+) -> Image.Image:
+    """Open ``path`` lazily and position it on ``frame``.
+
+    With ``lift_guard`` Pillow's decompression-bomb warning is silenced for this call only,
+    so the caller must hold decoding to its own pixel budget. Images Pillow refuses
+    outright, above twice ``Image.MAX_IMAGE_PIXELS``, still raise
+    :class:`PDFOperationError`.
+    """
+
+    source = path.open() if isinstance(path, InMemoryFile) else path
+    if not lift_guard:
+        image = Image.open(source)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            try:
+                image = Image.open(source)
+            except Image.DecompressionBombError as exc:
+                raise PDFOperationError(str(exc)) from exc
+    if frame:
+        image.seek(frame)
+    return image
+
+
+def iter_bands(path: Path | InMemoryFile, frame: int, rows_per_band: int) -> Iterator[Image.Image]:
+    """Decode ``frame`` of ``path`` as consecutive full-width bands of rows.
+
+    Only uncompressed layouts (raw TIFF strips or tiles, BMP, PPM, ...) can be split this
+    way because each row lives at a known file offset: the rows of a band are read from
+    there and decoded with :func:`PIL.Image.frombytes`. Anything else raises
+    :class:`PDFOperationError`. Every yielded band is a loaded image the caller closes.
+    """
+
+    with open_frame(path, frame, lift_guard=True) as probe:
+        width, height = probe.size
+        mode = probe.mode
+        tiles = [_normalize_raw_tile(tile, mode) for tile in probe.tile]
+        palette = probe.palette
+        info = dict(probe.info)
+
+    rows_per_band = max(1, rows_per_band)
+    with path.open("rb") as handle:
+        for top in range(0, height, rows_per_band):
+            bottom = min(height, top + rows_per_band)
+            band = Image.new(mode, (width, bottom - top))
+            band.info.update(info)
+            if palette is not None:
+                band.putpalette(palette.palette, palette.rawmode or palette.mode)
+            for tile in tiles:
+                sliced = _slice_tile(tile, top, bottom)
+                if sliced is not None:
+                    _paste_tile(band, handle, mode, sliced)
+            yield band
+
+
+def _paste_tile(band: Image.Image, handle: BinaryIO, mode: str, tile: Any) -> None:
+    _, (x0, y0, x1, y1), offset, (rawmode, stride, ystep) = tile[:4]
+    expected = (y1 - y0) * stride
+    handle.seek(offset)
+    data = handle.read(expected)
+    if len(data) < expected - stride:
+        raise PDFOperationError("Image data ends before its last row.")
+    # The final row may stop short of its padding at the end of the file.
+    data = data.ljust(expected, b"\0")
+    part = Image.frombytes(mode, (x1 - x0, y1 - y0), data, "raw", rawmode, stride, ystep)
+    band.paste(part, (x0, y0))
+    part.close()
+
+
+def _normalize_raw_tile(tile: Any, mode: str) -> Any:
+    codec, extents, offset, args = tile[:4]
+    if codec != "raw":
+        raise PDFOperationError(
+            f"Image is too large for the pixel budget and its {codec!r} encoding cannot be "
+            "decoded in strips."
+        )
+    if not isinstance(args, tuple):
+        args = (args,)
+    rawmode = args[0]
+    stride = args[1] if len(args) > 1 else 0
+    ystep = args[2] if len(args) > 2 else 1
+    if not stride:
+        tile_width = extents[2] - extents[0]
+        try:
+            stride = len(Image.new(mode, (tile_width, 1)).tobytes("raw", rawmode))
+        except ValueError as exc:
+            raise PDFOperationError(f"Unsupported raw layout {rawmode!r} for strips.") from exc
+    return _replace_tile(tile, extents, offset, (rawmode, stride, ystep))
+
+
+def _slice_tile(tile: Any, top: int, bottom: int) -> Any | None:
+    """Restrict a raw tile to image rows ``[top, bottom)`` relative to a band at ``top``."""
+
+    _, (x0, y0, x1, y1), offset, (rawmode, stride, ystep) = tile[:4]
+    first, last = max(top, y0), min(bottom, y1)
+    if first >= last:
+        return None
+    if ystep < 0:
+        # Bottom-up storage: the last requested row is the first one in the file.
+        offset += (y1 - last) * stride
+    else:
+        offset += (first - y0) * stride
+    return _replace_tile(
+        tile, (x0, first - top, x1, last - top), offset, (rawmode, stride, ystep)
+    )
+
+
+def _replace_tile(tile: Any, extents: tuple[int, ...], offset: int, args: tuple) -> Any:
+    fields = (tile[0], extents, offset, args)
+    return type(tile)(*fields) if hasattr(tile, "_fields") else fields
@@ -0,0 +1,149 @@
+"""Trim page resource dictionaries down to what their content streams use."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from pypdf import PageObject
+from pypdf.errors import PdfReadError
+from pypdf.generic import ContentStream, DictionaryObject, IndirectObject, NameObject, PdfObject
+
+# Resource categories that are pruned, keyed to the operator that names their entries.
+PRUNED_CATEGORIES = {"/XObject": b"Do", "/Font": b"Tf"}
+# Guards against pathological or cyclic nesting of form XObjects.
+_MAX_FORM_DEPTH = 32
+
+
+def used_resource_names(
+    content: PdfObject | None, resources: DictionaryObject, pdf: object, depth: int = 0
+) -> dict[str, set[str]] | None:
+    """Names of ``/XObject`` and ``/Font`` entries that ``content`` draws from ``resources``.
+
+    Form XObjects without their own ``/Resources`` inherit the caller's dictionary, so their
+    content is scanned too. Returns None when the content cannot be parsed, in which case
+    callers must keep every resource.
+    """
+
+    used: dict[str, set[str]] = {category: set() for category in PRUNED_CATEGORIES}
+    if content is None:
+        return used
+    try:
+        operations = ContentStream(content, pdf).operations
+    except (PdfReadError, ValueError, KeyError, TypeError):
+        return None
+
+    xobjects = resources.get("/XObject")
+    xobjects = xobjects.get_object() if xobjects is not None else DictionaryObject()
+    for operands, operator in operations:
+        if not operands:
+            continue
+        for category, name_operator in PRUNED_CATEGORIES.items():
+            if operator == name_operator and isinstance(operands[0], NameObject):
+                used[category].add(operands[0])
+        if operator != b"Do" or operands[0] not in xobjects:
+            continue
+        form = xobjects[operands[0]].get_object()
+        if form.get("/Subtype") != "/Form" or "/Resources" in form:
+            continue
+        if depth >= _MAX_FORM_DEPTH:
+            return None
+        nested = used_resource_names(form, resources, pdf, depth + 1)
+        if nested is None:
+            return None
+        for category, names in nested.items():
+            used[category] |= names
+    return used
+
+
+def pruned_page(page: PageObject) -> tuple[PageObject, list[PdfObject]]:
+    """Return a shallow copy of ``page`` whose XObject and Font maps keep only used entries.
+
+    The source page and its (possibly shared) resource dictionaries are left untouched.
+    The second item lists the dropped resource values, for size accounting.
+    """
+
+    resources = page.get("/Resources")
+    if resources is None:
+        return page, []
+    resources = resources.get_object()
+    used = used_resource_names(page.get("/Contents"), resources, page.pdf)
+    if used is None:
+        return page, []
+
+    dropped: list[PdfObject] = []
+    trimmed = DictionaryObject(resources)
+    for category, names in used.items():
+        entries = resources.get(category)
+        if entries is None:
+            continue
+        entries = entries.get_object()
+        kept = DictionaryObject()
+        for name, value in entries.items():
+            if name in names:
+                kept[name] = value
+            else:
+                dropped.append(value)
+        trimmed[NameObject(category)] = kept
+    if not dropped:
+        return page, []
+
+    # Keep the original reference so annotations pointing at the page still resolve to it.
+    copy = PageObject(page.pdf, page.indirect_reference)
+    copy.update(page)
+    copy[NameObject("/Resources")] = trimmed
+    return copy, dropped
+
+
+class _CountingSink:
+    """Write target that only measures how many bytes an object serializes to."""
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+
+def exclusive_size(dropped: Iterable[PdfObject], kept: Iterable[PdfObject]) -> int:
+    """Approximate serialized bytes of objects reachable only from ``dropped``.
+
+    Indirect objects also reachable from ``kept`` would still be written, so they do not
+    count as saved. Each counted object includes its ``obj``/``endobj`` framing and xref
+    entry.
+    """
+
+    still_written = _reachable(kept)
+    sink = _CountingSink()
+    count = 0
+    for key, obj in _reachable_objects(dropped).items():
+        if key in still_written:
+            continue
+        obj.write_to_stream(sink)
+        count += 1
+    return sink.size + count * len(b"1 0 obj\n\nendobj\n0000000000 00000 n \n")
+
+
+def _reachable(roots: Iterable[PdfObject]) -> set[tuple[int, int, int]]:
+    return set(_reachable_objects(roots))
+
+
+def _reachable_objects(roots: Iterable[PdfObject]) -> dict[tuple[int, int, int], PdfObject]:
+    found: dict[tuple[int, int, int], PdfObject] = {}
+    stack = list(roots)
+    while stack:
+        item = stack.pop()
+        if isinstance(item, IndirectObject):
+            key = (id(item.pdf), item.idnum, item.generation)
+            if key in found:
+                continue
+            item_object = item.get_object()
+            found[key] = item_object
+            stack.append(item_object)
+        elif isinstance(item, DictionaryObject):
+            stack.extend(value for key, value in item.items() if key != "/Parent")
+        elif isinstance(item, list):
+            stack.extend(item)
+    return found
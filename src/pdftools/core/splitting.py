@@ -0,0 +1,189 @@
+"""Part writers behind ``split_pdf`` and ``burst_pdf``."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Sequence
+
+from pypdf import PdfReader, PdfWriter
+
+from .events import IDLE, Tracker
+from .merging import stream_pages
+from .output import OutputOptions
+from .parallel import ordered_map
+from .ranges import Range
+from .resources import exclusive_size, pruned_page
+from .stats import SplitStats, peak_rss_bytes
+
+
+@dataclass(frozen=True)
+class PartJob:
+    """Pages ``start``-``end`` (1-based, inclusive) of ``source`` written to ``destination``."""
+
+    source: Path
+    start: int
+    end: int
+    destination: Path
+    prune_resources: bool = False
+    output_options: OutputOptions | None = None
+
+
+@dataclass(frozen=True)
+class PartResult:
+    destination: Path
+    pages: int
+    size: int
+    peak_rss: int | None
+    bytes_saved: int = 0
+
+
+# Worker processes keep the source open between jobs instead of re-parsing it per part.
+_worker_reader: tuple[Path, int, PdfReader] | None = None
+
+
+def part_filename(stem: str, index: int, start: int, end: int) -> str:
+    """Name parts ``{stem}_partNN_SS[-EE].pdf`` as ``split_pdf`` always has."""
+
+    suffix = f"{start:02d}" if start == end else f"{start:02d}-{end:02d}"
+    return f"{stem}_part{index:02d}_{suffix}.pdf"
+
+
+def part_jobs(
+    source: Path,
+    ranges: Sequence[Range],
+    output_dir: Path,
+    *,
+    prune_resources: bool = False,
+    output_options: OutputOptions | None = None,
+) -> Iterator[PartJob]:
+    for index, (start, end) in enumerate(ranges, start=1):
+        destination = output_dir / part_filename(source.stem, index, start, end)
+        yield PartJob(source, start, end, destination, prune_resources, output_options)
+
+
+def burst_ranges(total_pages: int, pages_per_part: int) -> list[Range]:
+    """Chunk ``total_pages`` into consecutive ranges of ``pages_per_part`` pages."""
+
+    if pages_per_part < 1:
+        raise ValueError("pages_per_part must be at least 1")
+    return [
+        (start, min(start + pages_per_part - 1, total_pages))
+        for start in range(1, total_pages + 1, pages_per_part)
+    ]
+
+
+def render_part(
+    reader: PdfReader,
+    start: int,
+    end: int,
+    handle: BinaryIO,
+    *,
+    prune_resources: bool = False,
+    output_options: OutputOptions | None = None,
+) -> int:
+    """Write pages ``start``-``end`` (1-based, inclusive) of ``reader`` as a PDF to ``handle``.
+
+    With ``prune_resources`` each page only carries the fonts and XObjects its content
+    streams reference; returns roughly how many bytes that left out. ``output_options``
+    sends the part through the compact streaming writer.
+    """
+
+    pages = []
+    dropped = []
+    for page_index in range(start - 1, end):
+        page = reader.pages[page_index]
+        if prune_resources:
+            page, unused = pruned_page(page)
+            dropped.extend(unused)
+        pages.append(page)
+    if output_options is not None:
+        stream_pages(reader, pages, handle, options=output_options)
+    else:
+        writer = PdfWriter()
+        for page in pages:
+            writer.add_page(page)
+        writer.write(handle)
+    return exclusive_size(dropped, pages) if dropped else 0
+
+
+def write_part(job: PartJob, reader: PdfReader) -> PartResult:
+    """Copy the job's pages from ``reader`` into a new PDF at ``job.destination``."""
+
+    with job.destination.open("wb") as handle:
+        saved = render_part(
+            reader,
+            job.start,
+            job.end,
+            handle,
+            prune_resources=job.prune_resources,
+            output_options=job.output_options,
+        )
+    return PartResult(
+        job.destination,
+        job.end - job.start + 1,
+        job.destination.stat().st_size,
+        peak_rss_bytes(),
+        saved,
+    )
+
+
+def _write_part_in_worker(job: PartJob) -> PartResult:
+    global _worker_reader
+    mtime = job.source.stat().st_mtime_ns
+    if _worker_reader is None or _worker_reader[:2] != (job.source, mtime):
+        if _worker_reader is not None:
+            _worker_reader[2].stream.close()
+        _worker_reader = (job.source, mtime, PdfReader(job.source.open("rb")))
+    return write_part(job, _worker_reader[2])
+
+
+def write_parts(
+    jobs: Iterable[PartJob],
+    *,
+    reader: PdfReader | None = None,
+    workers: int = 1,
+    stats: SplitStats | None = None,
+    tracker: Tracker = IDLE,
+) -> list[Path]:
+    """Write every part, serially from ``reader`` or across ``workers`` processes.
+
+    Worker processes open the source lazily on their first job and reuse it afterwards.
+    ``tracker`` sees one ``write`` stage and the pages of each part as it completes.
+    """
+
+    started = time.perf_counter()
+    if workers > 1:
+        results: Iterable[PartResult] = ordered_map(
+            _write_part_in_worker, jobs, workers=workers, window=4 * workers
+        )
+    else:
+        if reader is None:
+            raise ValueError("A reader is required when writing parts serially.")
+        results = (write_part(job, reader) for job in jobs)
+
+    exported: list[Path] = []
+    peaks: list[int] = []
+    written = 0
+    with tracker.stage("write"):
+        for result in results:
+            exported.append(result.destination)
+            written += result.size
+            tracker.page(written, result.pages)
+            if stats is not None:
+                stats.parts += 1
+                stats.pages += result.pages
+                stats.bytes_written += result.size
+                if result.bytes_saved:
+                    stats.bytes_saved[result.destination] = result.bytes_saved
+                if result.peak_rss is not None:
+                    peaks.append(result.peak_rss)
+
+    if stats is not None:
+        stats.elapsed += time.perf_counter() - started
+        parent_peak = peak_rss_bytes()
+        if parent_peak is not None:
+            peaks.append(parent_peak)
+        stats.peak_rss_bytes = max(peaks, default=None)
+        stats.outputs.extend(exported)
+    return exported
@@ -0,0 +1,99 @@
+"""Run statistics filled in by core operations when a ``stats`` object is supplied."""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of the current process, or None where unsupported."""
+
+    try:
+        # Unlike ru_maxrss, which a spawned child inherits from the process that started
+        # it, the high-water mark here belongs to this process image alone.
+        with open("/proc/self/status", "rb") as status:
+            for line in status:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class SplitStats:
+    """Throughput figures for a split or burst run."""
+
+    parts: int = 0
+    pages: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    peak_rss_bytes: int | None = None
+    outputs: list[Path] = field(default_factory=list)
+    # Approximate bytes left out of each part by resource pruning; parts with no savings
+    # are omitted.
+    bytes_saved: dict[Path, int] = field(default_factory=dict)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def total_bytes_saved(self) -> int:
+        return sum(self.bytes_saved.values())
+
+
+@dataclass
+class MergeStats:
+    """Figures for a streaming merge, including what deduplication saved."""
+
+    sources: int = 0
+    pages: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    peak_rss_bytes: int | None = None
+    deduplicated_objects: int = 0
+    deduplicated_bytes: int = 0
+
+
+@dataclass
+class BatchStats:
+    """Totals of a manifest batch; rates count only the jobs that actually ran."""
+
+    jobs: int = 0
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    pages: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+
+    def add(self, status: str, pages: int = 0, bytes_written: int = 0) -> None:
+        self.jobs += 1
+        if status == "done":
+            self.done += 1
+        elif status == "skipped":
+            self.skipped += 1
+        else:
+            self.failed += 1
+        self.pages += pages
+        self.bytes_written += bytes_written
+
+    @property
+    def jobs_per_second(self) -> float:
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_written / self.elapsed if self.elapsed else 0.0
@@ -4,11 +4,20 @@ from __future__ import annotations
 from pathlib import Path
 
 from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QStatusBar, QTabWidget
-
-from pdftools.core import convert_images_to_pdf, merge_pdfs, split_pdf
+from PySide6.QtWidgets import (
+    QApplication,
+    QMainWindow,
+    QMessageBox,
+    QProgressBar,
+    QPushButton,
+    QStatusBar,
+    QTabWidget,
+)
+
+from pdftools.core import Event, convert_images_to_pdf, merge_pdfs, split_pdf
 from pdftools.gui.panels import MergePanel, PhotoToPDFPanel, SplitPanel
 from pdftools.services.tasks import TaskRunner
+from pdftools.services.thumbnails import ThumbnailCache, ThumbnailLoader
 
 
 class MainWindow(QMainWindow):
@@ -22,14 +31,23 @@ class MainWindow(QMainWindow):
         self.runner = TaskRunner()
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(220)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.runner.cancel_all)
+        self.status_bar.addPermanentWidget(self.progress_bar)
+        self.status_bar.addPermanentWidget(self.cancel_button)
+        self.runner.queue_changed.connect(self._update_activity)
+        self._update_activity()
 
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
         self.setCentralWidget(self.tabs)
 
-        self.merge_panel = MergePanel()
+        self.thumbnails = ThumbnailLoader(ThumbnailCache.from_env(), parent=self)
+        self.merge_panel = MergePanel(self.thumbnails)
         self.split_panel = SplitPanel()
-        self.photo_panel = PhotoToPDFPanel()
+        self.photo_panel = PhotoToPDFPanel(self.thumbnails)
         self.tabs.addTab(self.merge_panel, "合并")
         self.tabs.addTab(self.split_panel, "拆分")
         self.tabs.addTab(self.photo_panel, "照片转 PDF")
@@ -41,6 +59,10 @@ class MainWindow(QMainWindow):
         self.photo_panel.convert_requested.connect(self._handle_photo_convert)
         self.photo_panel.status_message.connect(self.status_bar.showMessage)
 
+    def closeEvent(self, event) -> None:
+        self.thumbnails.shutdown()
+        super().closeEvent(event)
+
     # ------------------------------------------------------------------ Ops
     def _handle_merge(self, files: list[str], output: str) -> None:
         self.merge_panel.set_running(True)
@@ -49,8 +71,12 @@ class MainWindow(QMainWindow):
             merge_pdfs,
             files,
             output,
+            observed=True,
+            process=True,
+            on_progress=self._show_progress,
             on_finished=lambda path: self._merge_finished(path),
             on_failed=lambda error: self._task_failed(error, self.merge_panel),
+            on_cancelled=lambda: self._task_cancelled(self.merge_panel),
         )
 
     def _handle_split(self, source: str, ranges: str, output_dir: str) -> None:
@@ -61,8 +87,12 @@ class MainWindow(QMainWindow):
             source,
             ranges,
             output_dir,
+            observed=True,
+            process=True,
+            on_progress=self._show_progress,
             on_finished=lambda paths: self._split_finished(paths),
             on_failed=lambda error: self._task_failed(error, self.split_panel),
+            on_cancelled=lambda: self._task_cancelled(self.split_panel),
         )
 
     def _handle_photo_convert(self, images: list[str], output: str, normalize: bool) -> None:
@@ -73,8 +103,12 @@ class MainWindow(QMainWindow):
             images,
             output,
             normalize_sizes=normalize,
+            observed=True,
+            process=True,
+            on_progress=self._show_progress,
             on_finished=lambda path: self._photo_convert_finished(path),
             on_failed=lambda error: self._task_failed(error, self.photo_panel),
+            on_cancelled=lambda: self._task_cancelled(self.photo_panel),
         )
 
     def _merge_finished(self, path: Path) -> None:
@@ -93,6 +127,27 @@ class MainWindow(QMainWindow):
         self.status_bar.showMessage("图片已转换为 PDF。")
         QMessageBox.information(self, "转换成功", f"文件已保存到\n{path}")
 
+    def _show_progress(self, event: Event) -> None:
+        if event.total_pages:
+            self.progress_bar.setRange(0, event.total_pages)
+            self.progress_bar.setValue(event.pages)
+        elif event.sources:
+            # Merges only know how many inputs they have, not how many pages.
+            self.progress_bar.setRange(0, event.sources)
+            self.progress_bar.setValue(event.source - 1)
+
+    def _update_activity(self) -> None:
+        busy = bool(self.runner.tasks())
+        if busy and self.progress_bar.isHidden():
+            # Indeterminate until the first progress event arrives.
+            self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+
+    def _task_cancelled(self, panel) -> None:
+        panel.set_running(False)
+        self.status_bar.showMessage("操作已取消。")
+
     def _task_failed(self, error: str, panel) -> None:
         panel.set_running(False)
         self.status_bar.showMessage("操作失败。")
@@ -0,0 +1,183 @@
+"""Item models backing the panels' file lists."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Sequence, Union
+
+from PySide6.QtCore import QAbstractListModel, QMimeData, QModelIndex, QPersistentModelIndex, Qt
+from PySide6.QtGui import QImage
+
+from pdftools.services.thumbnails import ThumbnailLoader
+
+# Above this many separate runs a removal resets the model instead of removing run by run.
+_MAX_REMOVED_RUNS = 32
+
+Index = Union[QModelIndex, QPersistentModelIndex]
+
+
+def row_runs(rows: Iterable[int]) -> list[tuple[int, int]]:
+    """Group row numbers into sorted, inclusive ``(first, last)`` runs of adjacent rows."""
+
+    runs: list[tuple[int, int]] = []
+    for row in sorted(set(rows)):
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+class PathListModel(QAbstractListModel):
+    """An ordered list of file paths that views only render where they are visible.
+
+    Paths are plain strings, so a view with uniform item sizes stays fluid with tens of
+    thousands of entries. Inserts arrive as one batch and :meth:`move_rows` shifts every
+    selected run past a single neighbour, so the cost of a move follows the selection,
+    not the length of the list, and views keep their selection. Files dropped from the
+    desktop are added when their suffix is one of ``suffixes`` (any when empty).
+
+    With ``thumbnails`` each row is decorated with its thumbnail, requested only when a
+    view paints the row and shown as a blank placeholder until it has loaded.
+    """
+
+    def __init__(
+        self,
+        suffixes: Iterable[str] = (),
+        parent=None,
+        *,
+        thumbnails: ThumbnailLoader | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._paths: list[str] = []
+        self._suffixes = frozenset(suffix.lower() for suffix in suffixes)
+        self._thumbnails = thumbnails
+        self._placeholder: QImage | None = None
+        if thumbnails is not None:
+            self._placeholder = QImage(thumbnails.size, thumbnails.size, QImage.Format_ARGB32)
+            self._placeholder.fill(Qt.transparent)
+            thumbnails.ready.connect(self._thumbnails_ready)
+
+    # ------------------------------------------------------------ Qt model API
+    def rowCount(self, parent: Index = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index: Index, role: int = Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._paths):
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole, Qt.EditRole):
+            return self._paths[index.row()]
+        if role == Qt.DecorationRole and self._thumbnails is not None:
+            return self._thumbnails.get(self._paths[index.row()]) or self._placeholder
+        return None
+
+    def flags(self, index: Index) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def supportedDropActions(self) -> Qt.DropActions:
+        return Qt.CopyAction
+
+    def mimeTypes(self) -> list[str]:
+        return ["text/uri-list"]
+
+    def canDropMimeData(self, data: QMimeData, action, row: int, column: int, parent) -> bool:
+        return data.hasUrls()
+
+    def dropMimeData(self, data: QMimeData, action, row: int, column: int, parent) -> bool:
+        paths = [url.toLocalFile() for url in data.urls() if url.isLocalFile()]
+        accepted = [path for path in paths if self._accepts(path)]
+        if not accepted:
+            return False
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._paths)
+        self.insert_paths(row, accepted)
+        return True
+
+    # ------------------------------------------------------------------- API
+    def paths(self) -> list[str]:
+        return list(self._paths)
+
+    def add_paths(self, paths: Iterable[str | Path]) -> int:
+        """Append ``paths`` in one batch and return how many were added."""
+
+        return self.insert_paths(len(self._paths), paths)
+
+    def insert_paths(self, row: int, paths: Iterable[str | Path]) -> int:
+        batch = [str(path) for path in paths]
+        if not batch:
+            return 0
+        row = max(0, min(row, len(self._paths)))
+        self.beginInsertRows(QModelIndex(), row, row + len(batch) - 1)
+        self._paths[row:row] = batch
+        self.endInsertRows()
+        return len(batch)
+
+    def remove_rows(self, rows: Iterable[int]) -> int:
+        """Remove the given rows and return how many were removed."""
+
+        runs = row_runs(row for row in rows if 0 <= row < len(self._paths))
+        if len(runs) > _MAX_REMOVED_RUNS:
+            removed = {row for first, last in runs for row in range(first, last + 1)}
+            self.beginResetModel()
+            self._paths = [path for row, path in enumerate(self._paths) if row not in removed]
+            self.endResetModel()
+            return len(removed)
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._paths[first : last + 1]
+            self.endRemoveRows()
+        return sum(last - first + 1 for first, last in runs)
+
+    def move_rows(self, rows: Sequence[int], offset: int) -> bool:
+        """Move the given rows one place up (``offset=-1``) or down (``offset=1``).
+
+        Each run of adjacent rows trades places with the single row beside it; a run
+        already at the edge stays where it is. Returns whether anything moved.
+        """
+
+        if offset not in (-1, 1):
+            raise ValueError("offset must be -1 or 1")
+        runs = row_runs(row for row in rows if 0 <= row < len(self._paths))
+        runs = [
+            (first, last)
+            for first, last in runs
+            if 0 <= (first - 1 if offset < 0 else last + 1) < len(self._paths)
+        ]
+        if not runs:
+            return False
+
+        # One layout change for all runs: announcing each run as its own row move makes
+        # the selection model re-resolve the whole selection once per run.
+        self.layoutAboutToBeChanged.emit()
+        moved: dict[int, int] = {}
+        for first, last in runs:
+            # Equal-length slice assignments never shift the rest of the list.
+            run = self._paths[first : last + 1]
+            if offset < 0:
+                self._paths[first - 1 : last + 1] = run + [self._paths[first - 1]]
+                moved[first - 1] = last
+            else:
+                self._paths[first : last + 2] = [self._paths[last + 1]] + run
+                moved[last + 1] = first
+            moved.update((row, row + offset) for row in range(first, last + 1))
+        previous = self.persistentIndexList()
+        self.changePersistentIndexList(
+            previous, [self.index(moved.get(index.row(), index.row())) for index in previous]
+        )
+        self.layoutChanged.emit()
+        return True
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._paths = []
+        self.endResetModel()
+
+    def _thumbnails_ready(self) -> None:
+        # Views repaint only the rows they show, so announcing every row stays cheap.
+        if self._paths:
+            last = self.index(len(self._paths) - 1)
+            self.dataChanged.emit(self.index(0), last, [Qt.DecorationRole])
+
+    def _accepts(self, path: str) -> bool:
+        return not self._suffixes or Path(path).suffix.lower() in self._suffixes
@@ -4,7 +4,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QSize, Signal
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QFileDialog,
@@ -12,8 +12,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMessageBox,
     QPushButton,
     QSizePolicy,
@@ -22,13 +21,45 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from pdftools.services.thumbnails import ThumbnailLoader
+
+from .models import PathListModel
+
+
+def path_list_view(model: PathListModel, thumbnails: ThumbnailLoader | None = None) -> QListView:
+    """A list view over ``model`` that lays out and paints only the rows on screen."""
+
+    view = QListView()
+    view.setModel(model)
+    if thumbnails is not None:
+        view.setIconSize(QSize(thumbnails.size, thumbnails.size))
+    # Uniform rows let the view skip measuring every entry, which keeps 50k rows fluid.
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched)
+    view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+    view.setAlternatingRowColors(True)
+    view.setDragDropMode(QAbstractItemView.DropOnly)
+    view.setAcceptDrops(True)
+    view.setDropIndicatorShown(True)
+    view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    return view
+
+
+def selected_rows(view: QListView) -> list[int]:
+    # Read the selection's ranges: selectedRows() is quadratic in the number of ranges.
+    rows: set[int] = set()
+    for selected in view.selectionModel().selection():
+        rows.update(range(selected.top(), selected.bottom() + 1))
+    return sorted(rows)
+
 
 class MergePanel(QWidget):
     merge_requested = Signal(list, str)
     status_message = Signal(str)
 
-    def __init__(self) -> None:
+    def __init__(self, thumbnails: ThumbnailLoader | None = None) -> None:
         super().__init__()
+        self._thumbnails = thumbnails
         self._setup_ui()
 
     def _setup_ui(self) -> None:
@@ -44,10 +75,10 @@ class MergePanel(QWidget):
         main_layout.addWidget(hint)
 
         list_row = QHBoxLayout()
-        self.file_list = QListWidget()
-        self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.file_list.setAlternatingRowColors(True)
-        self.file_list.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.file_model = PathListModel(
+            suffixes=[".pdf"], parent=self, thumbnails=self._thumbnails
+        )
+        self.file_list = path_list_view(self.file_model, self._thumbnails)
         list_row.addWidget(self.file_list)
 
         reorder_controls = QVBoxLayout()
@@ -99,51 +130,23 @@ class MergePanel(QWidget):
         files, _ = QFileDialog.getOpenFileNames(self, "选择 PDF", filter="PDF Files (*.pdf)")
         if not files:
             return
-        for file in files:
-            item = QListWidgetItem(str(file))
-            self.file_list.addItem(item)
+        self.file_model.add_paths(files)
         self.status_message.emit(f"已添加 {len(files)} 个文件。")
 
     def remove_selected(self) -> None:
-        for item in self.file_list.selectedItems():
-            row = self.file_list.row(item)
-            self.file_list.takeItem(row)
+        self.file_model.remove_rows(selected_rows(self.file_list))
         self.status_message.emit("已移除选中的文件。")
 
     def move_selected_up(self) -> None:
-        items = self.file_list.selectedItems()
-        if not items:
-            return
-        moved = False
-        for item in sorted(items, key=self.file_list.row):
-            row = self.file_list.row(item)
-            if row == 0:
-                continue
-            self.file_list.takeItem(row)
-            self.file_list.insertItem(row - 1, item)
-            item.setSelected(True)
-            moved = True
-        if moved:
+        if self.file_model.move_rows(selected_rows(self.file_list), -1):
             self.status_message.emit("已上移选中文件。")
 
     def move_selected_down(self) -> None:
-        items = self.file_list.selectedItems()
-        if not items:
-            return
-        moved = False
-        for item in sorted(items, key=self.file_list.row, reverse=True):
-            row = self.file_list.row(item)
-            if row == self.file_list.count() - 1:
-                continue
-            self.file_list.takeItem(row)
-            self.file_list.insertItem(row + 1, item)
-            item.setSelected(True)
-            moved = True
-        if moved:
+        if self.file_model.move_rows(selected_rows(self.file_list), 1):
             self.status_message.emit("已下移选中文件。")
 
     def clear_list(self) -> None:
-        self.file_list.clear()
+        self.file_model.clear()
         self.status_message.emit("列表已清空。")
 
     def choose_output(self) -> None:
@@ -156,7 +159,7 @@ class MergePanel(QWidget):
             self.output_path.setText(target)
 
     def emit_merge(self) -> None:
-        files = [self.file_list.item(index).text() for index in range(self.file_list.count())]
+        files = self.file_model.paths()
         output = self.output_path.text().strip()
         if not files:
             QMessageBox.warning(self, "缺少文件", "请至少添加一个 PDF。")
@@ -260,8 +263,9 @@ class PhotoToPDFPanel(QWidget):
 
     SUPPORTED_EXTENSIONS = "*.png *.jpg *.jpeg *.bmp *.tiff *.webp"
 
-    def __init__(self) -> None:
+    def __init__(self, thumbnails: ThumbnailLoader | None = None) -> None:
         super().__init__()
+        self._thumbnails = thumbnails
         self._setup_ui()
 
     def _setup_ui(self) -> None:
@@ -278,10 +282,11 @@ class PhotoToPDFPanel(QWidget):
 
         list_row = QHBoxLayout()
 
-        self.photo_list = QListWidget()
-        self.photo_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.photo_list.setAlternatingRowColors(True)
-        self.photo_list.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        suffixes = [pattern[1:] for pattern in self.SUPPORTED_EXTENSIONS.split()]
+        self.photo_model = PathListModel(
+            suffixes=suffixes, parent=self, thumbnails=self._thumbnails
+        )
+        self.photo_list = path_list_view(self.photo_model, self._thumbnails)
         list_row.addWidget(self.photo_list)
 
         controls = QVBoxLayout()
@@ -336,50 +341,23 @@ class PhotoToPDFPanel(QWidget):
         )
         if not files:
             return
-        for file in files:
-            self.photo_list.addItem(QListWidgetItem(file))
+        self.photo_model.add_paths(files)
         self.status_message.emit(f"已添加 {len(files)} 张图片。")
 
     def remove_selected(self) -> None:
-        for item in self.photo_list.selectedItems():
-            row = self.photo_list.row(item)
-            self.photo_list.takeItem(row)
+        self.photo_model.remove_rows(selected_rows(self.photo_list))
         self.status_message.emit("已移除选中的图片。")
 
     def move_selected_up(self) -> None:
-        items = self.photo_list.selectedItems()
-        if not items:
-            return
-        moved = False
-        for item in sorted(items, key=self.photo_list.row):
-            row = self.photo_list.row(item)
-            if row == 0:
-                continue
-            self.photo_list.takeItem(row)
-            self.photo_list.insertItem(row - 1, item)
-            item.setSelected(True)
-            moved = True
-        if moved:
+        if self.photo_model.move_rows(selected_rows(self.photo_list), -1):
             self.status_message.emit("已上移选中的图片。")
 
     def move_selected_down(self) -> None:
-        items = self.photo_list.selectedItems()
-        if not items:
-            return
-        moved = False
-        for item in sorted(items, key=self.photo_list.row, reverse=True):
-            row = self.photo_list.row(item)
-            if row == self.photo_list.count() - 1:
-                continue
-            self.photo_list.takeItem(row)
-            self.photo_list.insertItem(row + 1, item)
-            item.setSelected(True)
-            moved = True
-        if moved:
+        if self.photo_model.move_rows(selected_rows(self.photo_list), 1):
             self.status_message.emit("已下移选中的图片。")
 
     def clear_list(self) -> None:
-        self.photo_list.clear()
+        self.photo_model.clear()
         self.status_message.emit("图片列表已清空。")
 
     def choose_output(self) -> None:
@@ -395,7 +373,7 @@ class PhotoToPDFPanel(QWidget):
             self.output_path.setText(target)
 
     def emit_convert(self, normalize: bool) -> None:
-        files = [self.photo_list.item(index).text() for index in range(self.photo_list.count())]
+        files = self.photo_model.paths()
         output = self.output_path.text().strip()
         if not files:
             QMessageBox.warning(self, "缺少图片", "请至少选择一张图片。")
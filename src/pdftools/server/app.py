@@ -2,66 +2,348 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import os
+import shutil
 import tempfile
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, BinaryIO, Iterator, List
 
-from fastapi import FastAPI, File, Form, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import FormData
 import uvicorn
 
-from pdftools.core import merge_pdfs, split_pdf
+from pdftools.core import SplitStats, merge_pdfs_io, split_pdf_io
 
-app = FastAPI(title="pdfTools API", version="0.2.0")
+from .archives import COMPRESSION_METHODS, zip_stream
+from .cache import ResultCache, result_key
+from .jobs import Job, JobManager, JobSettings, JobStatus, QueueFull, merge_job, split_job
+from .metrics import CONTENT_TYPE, ServerMetrics
+from .uploads import UploadLimits, read_form, uploaded_files
 
 
-def _write_uploads(files: List[UploadFile], temp_dir: Path) -> list[Path]:
-    saved_paths: list[Path] = []
-    for upload in files:
-        destination = temp_dir / (upload.filename or "upload.pdf")
-        with destination.open("wb") as handle:
-            handle.write(upload.file.read())
-        saved_paths.append(destination)
-    return saved_paths
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    metrics: ServerMetrics = app.state.metrics
+    app.state.jobs = JobManager(JobSettings.from_env(), on_finished=metrics.record_job)
+    app.state.result_cache = ResultCache.from_env()
+    metrics.attach(app.state.jobs, app.state.result_cache)
+    try:
+        yield
+    finally:
+        app.state.jobs.shutdown()
 
 
-@app.post("/merge", response_class=FileResponse)
-async def merge_endpoint(files: List[UploadFile] = File(...)) -> FileResponse:
+app = FastAPI(title="pdfTools API", version="0.2.0", lifespan=_lifespan)
+app.state.upload_limits = UploadLimits.from_env()
+app.state.result_cache = None
+app.state.metrics = ServerMetrics()
+
+_CACHE_CHUNK = 256 * 1024
+
+
+def _multipart_body(properties: dict, required: list[str]) -> dict:
+    """OpenAPI request body for endpoints that parse their multipart form themselves."""
+
+    schema = {"type": "object", "properties": properties, "required": required}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": schema}},
+        }
+    }
+
+
+_FILE_SCHEMA = {"type": "string", "format": "binary"}
+_MERGE_FIELDS = {"files": {"type": "array", "items": _FILE_SCHEMA}}
+_SPLIT_FIELDS = {
+    "file": _FILE_SCHEMA,
+    "ranges": {"type": "string", "default": "all"},
+    "compression": {"enum": sorted(COMPRESSION_METHODS), "default": "stored"},
+}
+
+
+def _merge_uploads(files: List[UploadFile], spool_size: int) -> tuple[BinaryIO, int, int]:
+    """Merge into a spool that moves to disk beyond ``spool_size``; return it rewound."""
+
+    output = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    try:
+        pages = merge_pdfs_io([upload.file for upload in files], output)
+    except BaseException:
+        output.close()
+        raise
+    size = output.tell()
+    output.seek(0)
+    return output, pages, size
+
+
+def _upload_bytes(files: List[UploadFile]) -> int:
+    return sum(upload.size or 0 for upload in files)
+
+
+def _download_headers(filename: str, key: str, cache_outcome: str) -> dict[str, str]:
+    # Weak: equal inputs give equivalent output, but not byte-identical creation dates.
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": f'W/"{key}"',
+        "X-Cache": cache_outcome,
+    }
+
+
+def _file_chunks(handle) -> Iterator[bytes]:
+    with handle:
+        while chunk := handle.read(_CACHE_CHUNK):
+            yield chunk
+
+
+async def _cached_response(
+    request: Request, key: str, media_type: str, filename: str
+) -> Response | None:
+    """Answer from the client's copy (304) or the result cache, or return None."""
+
+    if f'W/"{key}"' in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": f'W/"{key}"'})
+    cache: ResultCache | None = request.app.state.result_cache
+    if cache is None:
+        return None
     loop = asyncio.get_event_loop()
-    with tempfile.TemporaryDirectory() as tmp:
-        tmp_dir = Path(tmp)
-        saved = await loop.run_in_executor(None, _write_uploads, files, tmp_dir)
-        destination = tmp_dir / "merged.pdf"
-        await loop.run_in_executor(None, merge_pdfs, saved, destination)
-        return FileResponse(destination, media_type="application/pdf", filename="merged.pdf")
-
-
-@app.post("/split", response_class=FileResponse)
-async def split_endpoint(
-    file: UploadFile = File(...),
-    ranges: str = Form("all"),
-) -> FileResponse:
+    handle = await loop.run_in_executor(None, cache.open, key)
+    if handle is None:
+        return None
+    headers = _download_headers(filename, key, "hit")
+    headers["Content-Length"] = str(os.fstat(handle.fileno()).st_size)
+    return StreamingResponse(_file_chunks(handle), media_type=media_type, headers=headers)
+
+
+def _text_field(form: FormData, name: str, default: str) -> str:
+    value = form.get(name)
+    return value if isinstance(value, str) else default
+
+
+def _compression_field(form: FormData) -> str:
+    compression = _text_field(form, "compression", "stored")
+    if compression not in COMPRESSION_METHODS:
+        raise HTTPException(400, f"Unknown compression {compression!r}.")
+    return compression
+
+
+@app.post(
+    "/merge",
+    response_class=Response,
+    openapi_extra=_multipart_body(_MERGE_FIELDS, ["files"]),
+)
+async def merge_endpoint(request: Request) -> Response:
+    metrics: ServerMetrics = request.app.state.metrics
+    form = await read_form(request, request.app.state.upload_limits)
     loop = asyncio.get_event_loop()
-    with tempfile.TemporaryDirectory() as tmp:
-        tmp_dir = Path(tmp)
-        source = tmp_dir / (file.filename or "source.pdf")
-        with source.open("wb") as handle:
-            handle.write(file.file.read())
-        output_dir = tmp_dir / "parts"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        exported: list[Path] = await loop.run_in_executor(None, split_pdf, source, ranges, output_dir)
-        archive = tmp_dir / "split.zip"
-        await loop.run_in_executor(None, _zip_files, exported, archive)
-        return FileResponse(archive, media_type="application/zip", filename="split_parts.zip")
-
-
-def _zip_files(files: list[Path], destination: Path) -> Path:
-    from zipfile import ZipFile
-
-    with ZipFile(destination, "w") as archive:
-        for path in files:
-            archive.write(path, arcname=path.name)
-    return destination
+    try:
+        files = uploaded_files(form, "files")
+        sources = [upload.file for upload in files]
+        key = await loop.run_in_executor(None, result_key, "merge", {}, sources)
+        cached = await _cached_response(request, key, "application/pdf", "merged.pdf")
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        spool_size = request.app.state.upload_limits.spool_size
+        try:
+            merged, pages, size = await loop.run_in_executor(
+                None, _merge_uploads, files, spool_size
+            )
+        except Exception:
+            metrics.errors.inc("merge", "sync")
+            raise
+        metrics.record(
+            "merge",
+            "sync",
+            time.perf_counter() - started,
+            pages=pages,
+            bytes_in=_upload_bytes(files),
+            bytes_out=size,
+        )
+    finally:
+        await form.close()
+    body: Iterator[bytes] = _file_chunks(merged)
+    cache: ResultCache | None = request.app.state.result_cache
+    if cache is not None:
+        body = cache.tee(key, body)
+    headers = _download_headers("merged.pdf", key, "miss")
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(body, media_type="application/pdf", headers=headers)
+
+
+@app.post(
+    "/split",
+    response_class=StreamingResponse,
+    openapi_extra=_multipart_body(_SPLIT_FIELDS, ["file"]),
+)
+async def split_endpoint(request: Request) -> Response:
+    """Stream a ZIP of the parts, sending each part as soon as it has been written."""
+
+    metrics: ServerMetrics = request.app.state.metrics
+    form = await read_form(request, request.app.state.upload_limits)
+    try:
+        file = uploaded_files(form, "file")[0]
+        ranges = _text_field(form, "ranges", "all")
+        compression = _compression_field(form)
+        stem = Path(file.filename or "source.pdf").stem
+        loop = asyncio.get_event_loop()
+        params = {"ranges": ranges, "compression": compression, "stem": stem}
+        key = await loop.run_in_executor(None, result_key, "split", params, [file.file])
+        cached = await _cached_response(request, key, "application/zip", "split_parts.zip")
+        if cached is not None:
+            await form.close()
+            return cached
+        started = time.perf_counter()
+        stats = SplitStats()
+        parts = split_pdf_io(file.file, ranges, stem=stem, stats=stats)
+        # Produce the first part before answering, so a bad range or an unreadable PDF
+        # still gets an error status instead of a truncated archive.
+        try:
+            first = await loop.run_in_executor(None, next, parts, None)
+        except Exception as exc:
+            metrics.errors.inc("split", "sync")
+            if isinstance(exc, ValueError):
+                raise HTTPException(400, str(exc)) from exc
+            raise
+    except BaseException:
+        await form.close()
+        raise
+    entries = itertools.chain([] if first is None else [first], parts)
+    archive = metrics.observe_stream(
+        zip_stream(entries, compression=COMPRESSION_METHODS[compression]),
+        "split",
+        started=started,
+        bytes_in=_upload_bytes([file]),
+        pages=lambda: stats.pages,
+    )
+    cache: ResultCache | None = request.app.state.result_cache
+    if cache is not None:
+        archive = cache.tee(key, archive)
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers=_download_headers("split_parts.zip", key, "miss"),
+        # The uploaded file is read while the body streams, so it is closed afterwards.
+        background=BackgroundTask(form.close),
+    )
+
+
+def _save_uploads(files: List[UploadFile], directory: Path) -> list[Path]:
+    """Copy uploads into a job's directory so its process can read them."""
+
+    saved = []
+    for index, upload in enumerate(files, start=1):
+        path = directory / f"input{index:03d}.pdf"
+        with path.open("wb") as handle:
+            shutil.copyfileobj(upload.file, handle)
+        saved.append(path)
+    return saved
+
+
+async def _submit_job(
+    request: Request,
+    kind: str,
+    result_name: str,
+    media_type: str,
+    prepare,
+) -> JSONResponse:
+    """Reserve a job slot, then read the upload and queue ``prepare(form, inputs)``'s task.
+
+    The slot is taken before the body is read, so a full queue answers 429 without
+    receiving the upload.
+    """
+
+    jobs: JobManager = request.app.state.jobs
+    try:
+        job = jobs.create(kind, result_name, media_type)
+    except QueueFull as exc:
+        raise HTTPException(429, str(exc), headers={"Retry-After": "5"}) from exc
+    try:
+        form = await read_form(request, request.app.state.upload_limits)
+        try:
+            field = "files" if kind == "merge" else "file"
+            files = uploaded_files(form, field)
+            loop = asyncio.get_event_loop()
+            inputs = await loop.run_in_executor(None, _save_uploads, files, job.directory)
+            job.input_bytes = _upload_bytes(files)
+            target, args = prepare(form, files, inputs)
+        finally:
+            await form.close()
+    except BaseException:
+        jobs.discard(job)
+        raise
+    jobs.start(job, target, *args)
+    return JSONResponse(job.describe(), 202, headers={"Location": f"/jobs/{job.id}"})
+
+
+def _find_job(request: Request, job_id: str) -> Job:
+    try:
+        return request.app.state.jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(404, f"Unknown job {job_id}.") from None
+
+
+@app.post(
+    "/jobs/merge",
+    status_code=202,
+    openapi_extra=_multipart_body(_MERGE_FIELDS, ["files"]),
+)
+async def submit_merge_job(request: Request) -> JSONResponse:
+    """Queue a merge; poll ``/jobs/{id}`` and fetch ``/jobs/{id}/result`` when done."""
+
+    return await _submit_job(
+        request,
+        "merge",
+        "merged.pdf",
+        "application/pdf",
+        lambda form, files, inputs: (merge_job, (inputs,)),
+    )
+
+
+@app.post(
+    "/jobs/split",
+    status_code=202,
+    openapi_extra=_multipart_body(_SPLIT_FIELDS, ["file"]),
+)
+async def submit_split_job(request: Request) -> JSONResponse:
+    """Queue a split whose result is the ZIP archive ``/split`` would stream."""
+
+    def prepare(form: FormData, files: List[UploadFile], inputs: list[Path]):
+        stem = Path(files[0].filename or "source.pdf").stem
+        ranges = _text_field(form, "ranges", "all")
+        return split_job, (inputs[0], ranges, stem, _compression_field(form))
+
+    return await _submit_job(request, "split", "split_parts.zip", "application/zip", prepare)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(request: Request, job_id: str) -> dict:
+    return _find_job(request, job_id).describe()
+
+
+@app.get("/jobs/{job_id}/result", response_class=FileResponse)
+async def job_result(request: Request, job_id: str) -> FileResponse:
+    job = _find_job(request, job_id)
+    if job.status is not JobStatus.SUCCEEDED:
+        raise HTTPException(409, f"Job {job_id} is {job.status.value}.")
+    return FileResponse(job.result, media_type=job.media_type, filename=job.result.name)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(request: Request, job_id: str) -> dict:
+    _find_job(request, job_id)
+    return request.app.state.jobs.cancel(job_id).describe()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus scrape target."""
+
+    return Response(request.app.state.metrics.render(), media_type=CONTENT_TYPE)
 
 
 def run() -> None:
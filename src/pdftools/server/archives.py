@@ -0,0 +1,47 @@
+"""ZIP archives produced incrementally for streaming responses."""
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+# Form values accepted for the ``compression`` field of /split.
+COMPRESSION_METHODS = {"stored": ZIP_STORED, "deflated": ZIP_DEFLATED}
+
+
+class _Sink:
+    """Write-only target; without ``seek``/``tell`` ZipFile writes a streamable archive."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(
+    entries: Iterable[tuple[str, bytes]],
+    *,
+    compression: int = ZIP_STORED,
+    compresslevel: int | None = None,
+) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``entries`` piece by piece, one member as soon as it arrives.
+
+    Only the member being added is held in memory; the central directory follows the last
+    member. PDFs are already compressed, so ``ZIP_STORED`` is usually the better trade.
+    """
+
+    sink = _Sink()
+    with ZipFile(sink, "w", compression=compression, compresslevel=compresslevel) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
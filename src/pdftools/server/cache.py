@@ -0,0 +1,51 @@
+"""Content-addressed cache of endpoint results on local disk."""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Mapping, Sequence
+
+from pdftools import __version__
+from pdftools.core.diskcache import DiskCache
+
+_HASH_CHUNK = 1 << 20
+
+
+def result_key(operation: str, params: Mapping[str, str], inputs: Sequence[BinaryIO]) -> str:
+    """Hash the operation, its parameters and the bytes of ``inputs`` (in order) to a key.
+
+    Every input is read from its current position to the end and rewound afterwards. The
+    package version is part of the key, so upgrades never serve results of older code.
+    """
+
+    digest = hashlib.sha256(f"pdftools {__version__}\0{operation}\0".encode())
+    for name in sorted(params):
+        digest.update(f"{name}\0{params[name]}\0".encode())
+    for handle in inputs:
+        start = handle.tell()
+        content = hashlib.sha256()
+        while chunk := handle.read(_HASH_CHUNK):
+            content.update(chunk)
+        handle.seek(start)
+        digest.update(content.digest())
+    return digest.hexdigest()
+
+
+class ResultCache(DiskCache):
+    """Endpoint results keyed by :func:`result_key`, shared by every server process."""
+
+    @classmethod
+    def from_env(cls) -> "ResultCache | None":
+        """Build the cache from ``PDFTOOLS_CACHE_DIR`` and ``PDFTOOLS_CACHE_MAX_BYTES``.
+
+        Returns None, disabling caching, when the maximum is ``0``. Defaults to 1 GiB in
+        the system temporary directory.
+        """
+
+        max_bytes = int(os.environ.get("PDFTOOLS_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+        if not max_bytes:
+            return None
+        default = Path(tempfile.gettempdir()) / "pdftools-cache"
+        return cls(Path(os.environ.get("PDFTOOLS_CACHE_DIR", default)), max_bytes)
@@ -0,0 +1,345 @@
+"""Background jobs: bounded, isolated worker processes with queueing, limits and cancellation."""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable
+
+from pdftools.core import Event, MergeStats, SplitStats, merge_pdfs, split_pdf_io
+from pdftools.core.events import PAGE, STAGE_END
+from pdftools.core.stats import peak_rss_bytes
+
+from .archives import COMPRESSION_METHODS, zip_stream
+
+# How often a supervisor wakes up to check the deadline while a job is silent.
+_POLL_INTERVAL = 0.5
+
+
+class QueueFull(Exception):
+    """Raised by :meth:`JobManager.create` when every slot and queue place is taken."""
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass(frozen=True)
+class JobSettings:
+    """Limits of the job subsystem.
+
+    ``workers`` jobs run at once, each in its own process; up to ``queue_depth`` more
+    wait. A job running longer than ``time_limit`` seconds is killed, and ``memory_limit``
+    caps each job process's address space in bytes (POSIX only). Finished jobs and their
+    files under ``directory`` are removed ``retention`` seconds after they end.
+    """
+
+    workers: int = 2
+    queue_depth: int = 16
+    time_limit: float | None = 600.0
+    memory_limit: int | None = None
+    retention: float = 3600.0
+    directory: Path = field(default_factory=lambda: Path(tempfile.gettempdir()) / "pdftools-jobs")
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1")
+        if self.queue_depth < 0:
+            raise ValueError("queue_depth must not be negative")
+
+    @classmethod
+    def from_env(cls) -> "JobSettings":
+        """Read overrides from ``PDFTOOLS_JOB_WORKERS``, ``PDFTOOLS_JOB_QUEUE_DEPTH``,
+        ``PDFTOOLS_JOB_TIME_LIMIT``, ``PDFTOOLS_JOB_MEMORY_LIMIT``, ``PDFTOOLS_JOB_RETENTION``
+        and ``PDFTOOLS_JOB_DIR``; a limit of ``0`` disables it.
+        """
+
+        defaults = cls()
+        env = os.environ.get
+        time_limit = float(env("PDFTOOLS_JOB_TIME_LIMIT", defaults.time_limit or 0))
+        memory_limit = int(env("PDFTOOLS_JOB_MEMORY_LIMIT", defaults.memory_limit or 0))
+        return cls(
+            workers=int(env("PDFTOOLS_JOB_WORKERS", defaults.workers)),
+            queue_depth=int(env("PDFTOOLS_JOB_QUEUE_DEPTH", defaults.queue_depth)),
+            time_limit=time_limit or None,
+            memory_limit=memory_limit or None,
+            retention=float(env("PDFTOOLS_JOB_RETENTION", defaults.retention)),
+            directory=Path(env("PDFTOOLS_JOB_DIR", str(defaults.directory))),
+        )
+
+
+@dataclass
+class Job:
+    """State of one submitted job; ``result`` exists once the job has succeeded.
+
+    ``pages`` and ``peak_rss_bytes`` are reported by the job process when it succeeds.
+    """
+
+    id: str
+    kind: str
+    directory: Path
+    result: Path
+    media_type: str
+    status: JobStatus = JobStatus.QUEUED
+    progress: float = 0.0
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    input_bytes: int = 0
+    pages: int | None = None
+    peak_rss_bytes: int | None = None
+    _future: Future | None = field(default=None, repr=False)
+    _process: Any = field(default=None, repr=False)
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "progress": round(self.progress, 4),
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobManager:
+    """Queue jobs and run each in a fresh process, at most ``settings.workers`` at a time.
+
+    A process per job (rather than a shared pool) is what lets a job that overruns its
+    time limit, or is cancelled while running, be killed without affecting the others.
+    ``on_finished`` is called with every job that ends, whatever its outcome.
+    """
+
+    def __init__(
+        self, settings: JobSettings, *, on_finished: Callable[[Job], None] | None = None
+    ) -> None:
+        self.settings = settings
+        self._on_finished = on_finished
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.workers, thread_name_prefix="pdftools-job"
+        )
+        settings.directory.mkdir(parents=True, exist_ok=True)
+
+    def create(self, kind: str, result_name: str, media_type: str) -> Job:
+        """Reserve a slot and a working directory for a new job, or raise :class:`QueueFull`."""
+
+        self._purge()
+        with self._lock:
+            active = sum(not job.status.finished for job in self._jobs.values())
+            if active >= self.settings.workers + self.settings.queue_depth:
+                raise QueueFull(f"{active} jobs are already queued or running.")
+            job_id = uuid.uuid4().hex
+            directory = self.settings.directory / job_id
+            directory.mkdir(parents=True)
+            job = Job(job_id, kind, directory, directory / result_name, media_type)
+            self._jobs[job_id] = job
+        return job
+
+    def start(self, job: Job, target: Callable[..., int], *args: Any) -> None:
+        """Queue ``target(*args, result, progress=...)`` to run in a job process.
+
+        ``target`` returns the number of pages it wrote.
+        """
+
+        job._future = self._executor.submit(self._supervise, job, target, args)
+
+    def discard(self, job: Job) -> None:
+        """Forget a created job that could not be started."""
+
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def get(self, job_id: str) -> Job:
+        self._purge()
+        with self._lock:
+            return self._jobs[job_id]
+
+    def counts(self) -> dict[JobStatus, int]:
+        with self._lock:
+            counts = dict.fromkeys(JobStatus, 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status.finished:
+                return job
+            job.status = JobStatus.CANCELLED
+            job.finished = time.time()
+            process = job._process
+        if job._future is not None:
+            job._future.cancel()
+        if process is not None:
+            process.kill()
+        self._finished(job)
+        return job
+
+    def shutdown(self) -> None:
+        """Kill running jobs and remove every job directory."""
+
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for job in self._jobs.values():
+                shutil.rmtree(job.directory, ignore_errors=True)
+            self._jobs.clear()
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.settings.retention
+        with self._lock:
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.status.finished and job.finished is not None and job.finished < cutoff
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _supervise(self, job: Job, target: Callable[..., None], args: tuple) -> None:
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_job,
+            args=(sender, self.settings.memory_limit, target, (*args, job.result)),
+            daemon=True,
+        )
+        with self._lock:
+            if job.status is not JobStatus.QUEUED:
+                return
+            job.status = JobStatus.RUNNING
+            job.started = time.time()
+            job._process = process
+            process.start()
+        sender.close()
+
+        status, error = JobStatus.FAILED, None
+        limit = self.settings.time_limit
+        deadline = None if limit is None else job.started + limit
+        try:
+            while True:
+                timeout = _POLL_INTERVAL
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.time())
+                    if timeout <= 0:
+                        process.kill()
+                        error = f"Job exceeded its time limit of {limit:g}s."
+                        break
+                if not receiver.poll(timeout):
+                    continue
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    error = f"Job process exited with code {process.exitcode}."
+                    break
+                if message[0] == "progress":
+                    job.progress = message[1]
+                    continue
+                if message[0] == "done":
+                    status = JobStatus.SUCCEEDED
+                    job.pages, job.peak_rss_bytes = message[1:]
+                else:
+                    error = message[1]
+                break
+        finally:
+            receiver.close()
+            process.join()
+            with self._lock:
+                job._process = None
+                ended = job.status is JobStatus.RUNNING
+                if ended:
+                    job.status, job.error = status, error
+                    job.finished = time.time()
+                    if status is JobStatus.SUCCEEDED:
+                        job.progress = 1.0
+            if ended:
+                self._finished(job)
+
+    def _finished(self, job: Job) -> None:
+        if self._on_finished is not None:
+            self._on_finished(job)
+
+
+def _run_job(
+    connection, memory_limit: int | None, target: Callable[..., int], args: tuple
+) -> None:
+    """Entry point of a job process: run ``target`` and report back over ``connection``."""
+
+    if memory_limit is not None:
+        try:
+            import resource
+        except ImportError:  # pragma: no cover - Windows
+            pass
+        else:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        pages = target(*args, progress=lambda fraction: connection.send(("progress", fraction)))
+    except MemoryError:
+        connection.send(("error", "Job exceeded its memory limit."))
+    except Exception as exc:  # noqa: BLE001 - reported to the client as the job error
+        connection.send(("error", str(exc) or type(exc).__name__))
+    else:
+        connection.send(("done", pages, peak_rss_bytes()))
+    finally:
+        connection.close()
+
+
+def merge_job(inputs: list[Path], result: Path, *, progress: Callable[[float], None]) -> int:
+    def observe(event: Event) -> None:
+        # Page totals are unknown until every input is open, so progress is by input.
+        if event.kind == STAGE_END and event.stage == "copy":
+            progress(event.source / event.sources)
+
+    stats = MergeStats()
+    merge_pdfs(inputs, result, stats=stats, observer=observe)
+    return stats.pages
+
+
+def split_job(
+    source: Path,
+    ranges: str,
+    stem: str,
+    compression: str,
+    result: Path,
+    *,
+    progress: Callable[[float], None],
+) -> int:
+    def observe(event: Event) -> None:
+        if event.kind == PAGE:
+            progress(event.pages / event.total_pages)
+
+    stats = SplitStats()
+    parts = split_pdf_io(source, ranges, stem=stem, stats=stats, observer=observe)
+
+    with result.open("wb") as handle:
+        for chunk in zip_stream(parts, compression=COMPRESSION_METHODS[compression]):
+            handle.write(chunk)
+    return stats.pages
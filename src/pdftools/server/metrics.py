@@ -0,0 +1,275 @@
+"""Operation metrics rendered in the Prometheus text exposition format."""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from pdftools.core.stats import peak_rss_bytes
+
+from .cache import ResultCache
+from .jobs import Job, JobManager, JobStatus
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+_MEMORY_BUCKETS = tuple(2**power * 1024 * 1024 for power in range(5, 14))  # 32 MiB-8 GiB
+_ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+# Label values, in the order of the metric's label names.
+Labels = Tuple[str, ...]
+# Computes (labels, value) pairs at scrape time.
+Source = Optional[Callable[[], Iterable[Tuple[Labels, float]]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A running total; ``source`` replaces the values at scrape time when given."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = (), source: Source = None
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[Labels, float] = {}
+        self._source = source
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            if self._source is not None:
+                self._values.update(self._source())
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_label_text(self.labels, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = _LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts with a final +Inf slot, sum)
+        self._series: dict[Labels, tuple[list[int], float]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        with self._lock:
+            counts, total = self._series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[labels] = (counts, total + value)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((labels, (list(c), s)) for labels, (c, s) in self._series.items())
+        for labels, (counts, total) in series:
+            cumulative = 0
+            bounds = [_number(float(bound)) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_label_text(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.labels, labels)} {_number(total)}"
+            yield f"{self.name}_count{_label_text(self.labels, labels)} {cumulative}"
+
+
+class ServerMetrics:
+    """Everything ``/metrics`` reports.
+
+    Operations are recorded through :meth:`record` (synchronous endpoints),
+    :meth:`observe_stream` (streamed responses) and :meth:`record_job` (finished jobs);
+    queue and cache figures are read from :meth:`attach`-ed sources at scrape time.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: JobManager | None = None
+        self._cache: ResultCache | None = None
+        self.duration = Histogram(
+            "pdftools_operation_duration_seconds",
+            "Time from receiving an operation's input to finishing its output.",
+            ("operation", "mode"),
+        )
+        self.pages = Counter(
+            "pdftools_pages_total", "Pages written by completed operations.", ("operation",)
+        )
+        self.throughput = Gauge(
+            "pdftools_pages_per_second",
+            "Pages per second of the most recent completed operation.",
+            ("operation",),
+        )
+        self.bytes_in = Counter(
+            "pdftools_input_bytes_total", "Bytes of input received.", ("operation",)
+        )
+        self.bytes_out = Counter(
+            "pdftools_output_bytes_total", "Bytes of output produced.", ("operation",)
+        )
+        self.errors = Counter(
+            "pdftools_errors_total", "Operations that failed.", ("operation", "mode")
+        )
+        self.job_peak_rss = Histogram(
+            "pdftools_job_peak_rss_bytes",
+            "Peak resident memory of each finished job process.",
+            ("operation",),
+            buckets=_MEMORY_BUCKETS,
+        )
+        self.jobs = Gauge(
+            "pdftools_jobs",
+            "Jobs currently known, by status (queued is the queue depth).",
+            ("status",),
+            source=self._job_counts,
+        )
+        self.cache = Counter(
+            "pdftools_cache_lookups_total",
+            "Result cache lookups by outcome.",
+            ("outcome",),
+            source=self._cache_counts,
+        )
+        self.server_rss = Gauge(
+            "pdftools_server_peak_rss_bytes",
+            "Peak resident memory of this server process.",
+            source=lambda: [((), peak_rss_bytes() or 0)],
+        )
+        self._metrics = (
+            self.duration,
+            self.pages,
+            self.throughput,
+            self.bytes_in,
+            self.bytes_out,
+            self.errors,
+            self.job_peak_rss,
+            self.jobs,
+            self.cache,
+            self.server_rss,
+        )
+
+    def attach(self, jobs: JobManager | None = None, cache: ResultCache | None = None) -> None:
+        self._jobs = jobs
+        self._cache = cache
+
+    def record(
+        self,
+        operation: str,
+        mode: str,
+        elapsed: float,
+        *,
+        pages: int,
+        bytes_in: int,
+        bytes_out: int,
+    ) -> None:
+        self.duration.observe(operation, mode, value=elapsed)
+        self.pages.inc(operation, amount=pages)
+        if elapsed > 0:
+            self.throughput.set(operation, value=pages / elapsed)
+        self.bytes_in.inc(operation, amount=bytes_in)
+        self.bytes_out.inc(operation, amount=bytes_out)
+
+    def observe_stream(
+        self,
+        chunks: Iterable[bytes],
+        operation: str,
+        *,
+        started: float,
+        bytes_in: int,
+        pages: Callable[[], int],
+    ) -> Iterator[bytes]:
+        """Pass a streamed response through, recording it once the last chunk is sent.
+
+        ``started`` is a :func:`time.perf_counter` value; ``pages`` is read at the end.
+        """
+
+        written = 0
+        try:
+            for chunk in chunks:
+                written += len(chunk)
+                yield chunk
+        except Exception:
+            self.errors.inc(operation, "sync")
+            raise
+        elapsed = time.perf_counter() - started
+        self.record(
+            operation, "sync", elapsed, pages=pages(), bytes_in=bytes_in, bytes_out=written
+        )
+
+    def record_job(self, job: Job) -> None:
+        """Record a job that just finished; cancelled jobs only leave their queue slot."""
+
+        if job.status is JobStatus.FAILED:
+            self.errors.inc(job.kind, "job")
+        if job.status is not JobStatus.SUCCEEDED or job.started is None:
+            return
+        self.record(
+            job.kind,
+            "job",
+            (job.finished or time.time()) - job.started,
+            pages=job.pages or 0,
+            bytes_in=job.input_bytes,
+            bytes_out=job.result.stat().st_size,
+        )
+        if job.peak_rss_bytes is not None:
+            self.job_peak_rss.observe(job.kind, value=job.peak_rss_bytes)
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def _job_counts(self) -> list[tuple[Labels, float]]:
+        if self._jobs is None:
+            return []
+        counts = self._jobs.counts()
+        return [((status.value,), counts[status]) for status in _ACTIVE_STATUSES]
+
+    def _cache_counts(self) -> list[tuple[Labels, float]]:
+        if self._cache is None:
+            return []
+        return [(("hit",), self._cache.hits), (("miss",), self._cache.misses)]
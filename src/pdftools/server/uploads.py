@@ -0,0 +1,95 @@
+"""Bounded, chunked reception of multipart uploads."""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+
+@dataclass(frozen=True)
+class UploadLimits:
+    """How request bodies are received.
+
+    ``chunk_size`` is the most bytes handed to the multipart parser and written to an
+    upload's spool at once; ``spool_size`` is how much of each uploaded file stays in
+    memory before it moves to a temporary file. Bodies larger than ``max_request_bytes``
+    are rejected with 413, before reading when ``Content-Length`` already says so.
+    """
+
+    chunk_size: int = 64 * 1024
+    spool_size: int = 1024 * 1024
+    max_request_bytes: int | None = 1024 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.chunk_size < 1 or self.spool_size < 0:
+            raise ValueError("chunk_size must be positive and spool_size non-negative")
+        if self.max_request_bytes is not None and self.max_request_bytes < 1:
+            raise ValueError("max_request_bytes must be positive")
+
+    @classmethod
+    def from_env(cls) -> "UploadLimits":
+        """Read overrides from ``PDFTOOLS_UPLOAD_CHUNK_SIZE``, ``PDFTOOLS_UPLOAD_SPOOL_SIZE``
+        and ``PDFTOOLS_MAX_REQUEST_BYTES``; a maximum of ``0`` disables the ceiling.
+        """
+
+        defaults = cls()
+        maximum = os.environ.get("PDFTOOLS_MAX_REQUEST_BYTES")
+        return cls(
+            chunk_size=int(os.environ.get("PDFTOOLS_UPLOAD_CHUNK_SIZE", defaults.chunk_size)),
+            spool_size=int(os.environ.get("PDFTOOLS_UPLOAD_SPOOL_SIZE", defaults.spool_size)),
+            max_request_bytes=(
+                defaults.max_request_bytes if maximum is None else int(maximum) or None
+            ),
+        )
+
+
+def _too_large(limits: UploadLimits) -> HTTPException:
+    return HTTPException(413, f"Request body exceeds {limits.max_request_bytes} bytes.")
+
+
+async def _chunks(request: Request, limits: UploadLimits) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if limits.max_request_bytes is not None and received > limits.max_request_bytes:
+            raise _too_large(limits)
+        for start in range(0, len(chunk), limits.chunk_size):
+            yield chunk[start : start + limits.chunk_size]
+
+
+async def read_form(request: Request, limits: UploadLimits) -> FormData:
+    """Parse a multipart body chunk by chunk, spooling files as they arrive.
+
+    Peak memory per request is bounded by ``chunk_size`` plus ``spool_size`` per file no
+    matter how large the upload is. The caller must ``await form.close()`` when done.
+    """
+
+    declared = request.headers.get("content-length", "")
+    if (
+        limits.max_request_bytes is not None
+        and declared.isdigit()
+        and int(declared) > limits.max_request_bytes
+    ):
+        raise _too_large(limits)
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(415, "Expected a multipart/form-data body.")
+
+    parser = MultiPartParser(request.headers, _chunks(request, limits))
+    parser.spool_max_size = limits.spool_size
+    try:
+        return await parser.parse()
+    except MultiPartException as exc:
+        raise HTTPException(400, exc.message) from exc
+
+
+def uploaded_files(form: FormData, field: str) -> list[UploadFile]:
+    """Return the files sent as ``field``, rejecting requests that sent none."""
+
+    files = [value for value in form.getlist(field) if isinstance(value, UploadFile)]
+    if not files:
+        raise HTTPException(422, f"Missing file field {field!r}.")
+    return files
@@ -1,30 +1,130 @@
 """Generic background task helpers shared by GUI and future agents."""
 from __future__ import annotations
 
+import itertools
+import multiprocessing
+import signal
+import threading
+import time
 import traceback
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Any, Callable
 
 from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 
+from pdftools.core.events import PAGE, STAGE_END, Event
+
+# How often a process task's supervisor checks for cancellation while the task is silent.
+_POLL_INTERVAL = 0.1
+# How long a cancelled process task gets to clean up before it is killed.
+_TERMINATE_TIMEOUT = 5.0
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task, at its next progress event, once the task has been cancelled."""
+
+
+class CancelToken:
+    """Thread-safe flag a task polls to stop early."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class TaskState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def done(self) -> bool:
+        return self in (TaskState.FINISHED, TaskState.FAILED, TaskState.CANCELLED)
+
+
+class _Throttle:
+    """Let through one event per ``interval`` seconds, plus stage ends and the last page."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        # The first event always passes, however soon after boot the monotonic clock starts.
+        self._last = float("-inf")
+
+    def due(self, event: Event) -> bool:
+        now = time.monotonic()
+        final = event.kind == STAGE_END or (
+            event.kind == PAGE and event.pages == event.total_pages
+        )
+        if final or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
+
 
 class WorkerSignals(QObject):
     started = Signal()
     finished = Signal(object)
     failed = Signal(str)
+    # The latest core Event, at most once per progress interval.
+    progress = Signal(object)
+    cancelled = Signal()
 
 
 class Worker(QRunnable):
+    """Run ``fn(*args, **kwargs)`` and report the outcome through :attr:`signals`.
+
+    With ``observed`` set, ``fn`` also receives :meth:`observe` as ``observer=``: it raises
+    :class:`TaskCancelled` once ``token`` is cancelled and emits ``progress`` at most every
+    ``progress_interval`` seconds, plus once for the last page and the end of every stage
+    so nothing is lost.
+    """
+
     def __init__(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
         super().__init__()
         self.fn = fn
         self.args = args
         self.kwargs = kwargs
         self.signals = WorkerSignals()
+        # The Task keeps the runnable alive, so it can still be taken out of the queue.
+        self.setAutoDelete(False)
+        self.token = CancelToken()
+        self.observed = False
+        self.progress_interval = 0.1
+        self.last_event: Event | None = None
+        self._throttle: _Throttle | None = None
+
+    def observe(self, event: Event) -> None:
+        self.token.raise_if_cancelled()
+        self.last_event = event
+        if self._throttle is None:
+            self._throttle = _Throttle(self.progress_interval)
+        if self._throttle.due(event):
+            self.signals.progress.emit(event)
 
     def run(self) -> None:  # pragma: no cover - run inside Qt thread pool
+        if self.token.cancelled:
+            self.signals.cancelled.emit()
+            return
         self.signals.started.emit()
+        kwargs = dict(self.kwargs, observer=self.observe) if self.observed else self.kwargs
         try:
-            result = self.fn(*self.args, **self.kwargs)
+            result = self.fn(*self.args, **kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+            return
         except Exception:  # noqa: BLE001
             error = traceback.format_exc()
             self.signals.failed.emit(error)
@@ -32,16 +132,173 @@ class Worker(QRunnable):
         self.signals.finished.emit(result)
 
 
+class ProcessWorker(Worker):
+    """Run ``fn`` in a fresh process while this runnable's pool thread supervises it.
+
+    The process keeps CPU-bound work off the GUI interpreter's GIL, and a crash in native
+    code fails only this task. Cancelling terminates the process, so even unobserved tasks
+    stop at once; the child unwinds as if ``SystemExit`` had been raised, letting
+    ``finally`` blocks such as :func:`~pdftools.core.buffers.atomic_write`'s remove staged
+    files, and is killed if it has not exited within ``_TERMINATE_TIMEOUT`` seconds.
+    ``fn``, its arguments and its result must be picklable; progress events of an observed
+    task are throttled in the child before they cross the pipe.
+    """
+
+    def run(self) -> None:  # pragma: no cover - run inside Qt thread pool
+        if self.token.cancelled:
+            self.signals.cancelled.emit()
+            return
+        self.signals.started.emit()
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        interval = self.progress_interval if self.observed else None
+        process = context.Process(
+            target=_run_in_process,
+            args=(sender, self.fn, self.args, self.kwargs, interval),
+            daemon=True,
+        )
+        try:
+            process.start()
+        except Exception:  # noqa: BLE001 - e.g. an unpicklable argument
+            receiver.close()
+            self.signals.failed.emit(traceback.format_exc())
+            return
+        finally:
+            sender.close()
+
+        outcome: tuple[str, Any] | None = None
+        try:
+            while outcome is None:
+                if self.token.cancelled:
+                    process.terminate()
+                    process.join(_TERMINATE_TIMEOUT)
+                    if process.is_alive():
+                        process.kill()
+                    outcome = ("cancelled", None)
+                elif receiver.poll(_POLL_INTERVAL):
+                    try:
+                        kind, payload = receiver.recv()
+                    except EOFError:
+                        outcome = ("crashed", None)
+                        continue
+                    if kind == "progress":
+                        self.last_event = payload
+                        self.signals.progress.emit(payload)
+                    else:
+                        outcome = (kind, payload)
+        finally:
+            receiver.close()
+            process.join()
+
+        kind, payload = outcome
+        if kind == "finished":
+            self.signals.finished.emit(payload)
+        elif kind == "failed":
+            self.signals.failed.emit(payload)
+        elif kind == "crashed":
+            self.signals.failed.emit(f"Task process exited with code {process.exitcode}.")
+        else:
+            self.signals.cancelled.emit()
+
+
+def _run_in_process(
+    connection,
+    fn: Callable[..., Any],
+    args: tuple,
+    kwargs: dict[str, Any],
+    progress_interval: float | None,
+) -> None:
+    """Entry point of a :class:`ProcessWorker` process."""
+
+    signal.signal(signal.SIGTERM, _exit_on_terminate)
+    if progress_interval is not None:
+        throttle = _Throttle(progress_interval)
+
+        def observe(event: Event) -> None:
+            if throttle.due(event):
+                connection.send(("progress", event))
+
+        kwargs = dict(kwargs, observer=observe)
+    try:
+        result = fn(*args, **kwargs)
+    except Exception:  # noqa: BLE001 - reported to the GUI as the task error
+        connection.send(("failed", traceback.format_exc()))
+    else:
+        connection.send(("finished", result))
+    finally:
+        connection.close()
+
+
+def _exit_on_terminate(signum: int, frame: Any) -> None:
+    raise SystemExit(128 + signum)
+
+
+@dataclass(eq=False)
+class Task:
+    """A submitted task as seen by :meth:`TaskRunner.tasks`.
+
+    ``progress`` is the most recent event of an observed task. :meth:`cancel` drops a
+    queued task at once; a running process task is terminated, and a running thread task
+    stops at its next progress event when it was submitted with ``observed=True`` and
+    otherwise runs to completion.
+    """
+
+    id: int
+    name: str
+    priority: int
+    state: TaskState = TaskState.QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    _worker: Worker | None = field(default=None, repr=False)
+    _runner: "TaskRunner | None" = field(default=None, repr=False)
+
+    @property
+    def progress(self) -> Event | None:
+        return self._worker.last_event if self._worker is not None else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._worker is not None and self._worker.token.cancelled
+
+    def cancel(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel(self)
+
+
 class TaskRunner(QObject):
-    """High-level helper to schedule blocking work off the UI thread."""
+    """High-level helper to schedule blocking work off the UI thread.
+
+    Tasks run on the runner's own pool of ``max_workers`` threads, so one window's batch
+    never competes with unrelated users of Qt's global pool; higher ``priority`` tasks
+    leave the queue first. Each task runs on a pool thread or, with ``process=True``, in a
+    process of its own supervised from a pool thread (see :class:`ProcessWorker`); either
+    way ``max_workers`` bounds how many run at once.
+    """
 
     task_started = Signal()
     task_finished = Signal(object)
     task_failed = Signal(str)
+    task_cancelled = Signal()
+    # Emitted whenever a task is queued, starts or ends.
+    queue_changed = Signal()
 
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = 2, *, progress_interval: float = 0.1) -> None:
         super().__init__()
-        self.pool = QThreadPool.globalInstance()
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.progress_interval = progress_interval
+        self._tasks: dict[int, Task] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self.pool.maxThreadCount()
+
+    def set_max_workers(self, count: int) -> None:
+        self.pool.setMaxThreadCount(max(1, count))
 
     def run(
         self,
@@ -49,14 +306,99 @@ class TaskRunner(QObject):
         *args: Any,
         on_finished: Callable[[Any], None] | None = None,
         on_failed: Callable[[str], None] | None = None,
+        on_progress: Callable[[Event], None] | None = None,
+        on_cancelled: Callable[[], None] | None = None,
+        priority: int = 0,
+        observed: bool = False,
+        process: bool = False,
+        name: str | None = None,
         **kwargs: Any,
-    ) -> None:
-        worker = Worker(fn, *args, **kwargs)
-        worker.signals.started.connect(self.task_started)
+    ) -> Task:
+        """Queue ``fn(*args, **kwargs)`` and return its :class:`Task`.
+
+        With ``observed`` the call also receives ``observer=``, the hook core operations
+        use to report progress, which is how cancellation reaches a running thread task.
+        ``process`` runs the call in a separate process; ``fn`` and everything it takes and
+        returns must then be picklable.
+        """
+
+        worker = (ProcessWorker if process else Worker)(fn, *args, **kwargs)
+        worker.progress_interval = self.progress_interval
+        worker.observed = observed
+        task = Task(
+            next(self._ids),
+            name or getattr(fn, "__name__", "task"),
+            priority,
+            _worker=worker,
+            _runner=self,
+        )
+
+        signals = worker.signals
+        signals.started.connect(lambda: self._settle(task, TaskState.RUNNING))
+        signals.started.connect(self.task_started)
+        signals.finished.connect(lambda _: self._settle(task, TaskState.FINISHED))
         if on_finished:
-            worker.signals.finished.connect(on_finished)
-        worker.signals.finished.connect(self.task_finished)
+            signals.finished.connect(on_finished)
+        signals.finished.connect(self.task_finished)
+        signals.failed.connect(lambda _: self._settle(task, TaskState.FAILED))
         if on_failed:
-            worker.signals.failed.connect(on_failed)
-        worker.signals.failed.connect(self.task_failed)
-        self.pool.start(worker)
+            signals.failed.connect(on_failed)
+        signals.failed.connect(self.task_failed)
+        signals.cancelled.connect(lambda: self._settle(task, TaskState.CANCELLED))
+        if on_cancelled:
+            signals.cancelled.connect(on_cancelled)
+        signals.cancelled.connect(self.task_cancelled)
+        if on_progress:
+            signals.progress.connect(on_progress)
+
+        with self._lock:
+            self._tasks[task.id] = task
+        self.pool.start(worker, priority)
+        self.queue_changed.emit()
+        return task
+
+    def tasks(self) -> list[Task]:
+        """Queued and running tasks, running first, then in the order they will start."""
+
+        with self._lock:
+            tasks = list(self._tasks.values())
+        return sorted(
+            tasks, key=lambda task: (task.state is not TaskState.RUNNING, -task.priority, task.id)
+        )
+
+    def queued_count(self) -> int:
+        with self._lock:
+            return sum(task.state is TaskState.QUEUED for task in self._tasks.values())
+
+    def running_count(self) -> int:
+        with self._lock:
+            return sum(task.state is TaskState.RUNNING for task in self._tasks.values())
+
+    def cancel(self, task: Task) -> None:
+        worker = task._worker
+        if worker is None or task.state.done:
+            return
+        worker.token.cancel()
+        # A task still waiting in the pool is taken out and never starts.
+        if self.pool.tryTake(worker):
+            worker.signals.cancelled.emit()
+
+    def cancel_all(self) -> None:
+        for task in self.tasks():
+            self.cancel(task)
+
+    def wait(self, timeout: int = -1) -> bool:
+        """Block until every task has ended (``timeout`` in milliseconds, -1 for ever)."""
+
+        return self.pool.waitForDone(timeout)
+
+    def _settle(self, task: Task, state: TaskState) -> None:
+        with self._lock:
+            if task.state.done:
+                return
+            task.state = state
+            if state is TaskState.RUNNING:
+                task.started = time.time()
+            else:
+                self._tasks.pop(task.id, None)
+        self.queue_changed.emit()
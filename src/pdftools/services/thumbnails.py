@@ -0,0 +1,250 @@
+"""Thumbnails of images and PDF first pages, rendered off the UI thread and cached on disk."""
+from __future__ import annotations
+
+import hashlib
+import io
+import itertools
+import os
+import sqlite3
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+
+from PIL import Image, ImageOps
+from PySide6.QtCore import (
+    QBuffer,
+    QByteArray,
+    QIODevice,
+    QObject,
+    QRunnable,
+    QSize,
+    QStandardPaths,
+    Qt,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QImage
+from PySide6.QtPdf import QPdfDocument
+
+from pdftools.core.diskcache import DiskCache
+
+_HASH_CHUNK = 1 << 20
+
+
+def render_thumbnail(path: str | Path, size: int) -> bytes:
+    """Render ``path`` (an image, or the first page of a PDF) to fit ``size`` pixels as PNG."""
+
+    path = Path(path)
+    if path.suffix.lower() == ".pdf":
+        return _render_pdf_page(path, size)
+    with Image.open(path) as image:
+        # JPEG decodes straight to a reduced scale, so large scans stay cheap.
+        image.draft("RGB", (size, size))
+        thumbnail = ImageOps.exif_transpose(image)
+        thumbnail.thumbnail((size, size))
+        if thumbnail.mode not in ("RGB", "RGBA", "L", "LA"):
+            thumbnail = thumbnail.convert("RGBA")
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _render_pdf_page(path: Path, size: int) -> bytes:
+    document = QPdfDocument(None)
+    try:
+        if document.load(str(path)) != QPdfDocument.Error.None_ or document.pageCount() < 1:
+            raise ValueError(f"Cannot render {path.name}.")
+        page = document.pagePointSize(0).toSize()
+        page.scale(QSize(size, size), Qt.KeepAspectRatio)
+        image = document.render(0, page.expandedTo(QSize(1, 1)))
+    finally:
+        document.close()
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data.data())
+
+
+class ThumbnailCache:
+    """PNG thumbnails keyed by a file's content hash and the thumbnail size.
+
+    Thumbnails live in a :class:`~pdftools.core.diskcache.DiskCache`, which evicts the
+    least recently used ones beyond ``max_bytes``. Content digests are remembered per
+    path, size and modification time, so files seen before are not read again just to
+    find their thumbnail.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = Path(directory)
+        self._store = DiskCache(self.directory, max_bytes)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS digests ("
+                " path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, digest TEXT)"
+            )
+
+    @classmethod
+    def from_env(cls) -> "ThumbnailCache | None":
+        """Build the cache from ``PDFTOOLS_THUMBNAIL_DIR`` and ``PDFTOOLS_THUMBNAIL_MAX_BYTES``.
+
+        Returns None, leaving thumbnails in memory only, when the maximum is ``0``.
+        Defaults to 256 MiB under the platform's per-user cache location.
+        """
+
+        max_bytes = int(os.environ.get("PDFTOOLS_THUMBNAIL_MAX_BYTES", 256 * 1024 * 1024))
+        if not max_bytes:
+            return None
+        root = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        default = Path(root or Path.home() / ".cache" / "pdftools") / "thumbnails"
+        return cls(Path(os.environ.get("PDFTOOLS_THUMBNAIL_DIR", default)), max_bytes)
+
+    def thumbnail(self, path: str | Path, size: int) -> bytes:
+        """Return the cached thumbnail of ``path``, rendering and storing it on a miss."""
+
+        key = self._key(Path(path), size)
+        handle = self._store.open(key)
+        if handle is not None:
+            with handle:
+                return handle.read()
+        data = render_thumbnail(path, size)
+        self._store.put(key, data)
+        return data
+
+    def _key(self, path: Path, size: int) -> str:
+        digest = hashlib.sha256(f"thumbnail {size}\0".encode())
+        digest.update(self._content_digest(path).encode())
+        return digest.hexdigest()
+
+    def _content_digest(self, path: Path) -> str:
+        stat = path.stat()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT digest FROM digests WHERE path = ? AND size = ? AND mtime = ?",
+                (str(path), stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        if row is not None:
+            return row[0]
+        content = hashlib.sha256()
+        with path.open("rb") as handle:
+            while chunk := handle.read(_HASH_CHUNK):
+                content.update(chunk)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, content.hexdigest()),
+            )
+        return content.hexdigest()
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        connection = sqlite3.connect(
+            self.directory / "digests.sqlite", timeout=30, isolation_level=None
+        )
+        return closing(connection)
+
+
+class _JobSignals(QObject):
+    # path, QImage or None when the file could not be rendered
+    done = Signal(str, object)
+
+
+class _ThumbnailJob(QRunnable):
+    def __init__(
+        self, path: str, size: int, cache: ThumbnailCache | None, signals: _JobSignals
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.size = size
+        self.cache = cache
+        self.signals = signals
+
+    def run(self) -> None:  # pragma: no cover - run inside Qt thread pool
+        try:
+            if self.cache is not None:
+                data = self.cache.thumbnail(self.path, self.size)
+            else:
+                data = render_thumbnail(self.path, self.size)
+        except Exception:  # noqa: BLE001 - unreadable files simply get no thumbnail
+            self.signals.done.emit(self.path, None)
+            return
+        self.signals.done.emit(self.path, QImage.fromData(data, "PNG"))
+
+
+class ThumbnailLoader(QObject):
+    """Hand out thumbnails to item models, loading missing ones in the background.
+
+    :meth:`get` returns a thumbnail from memory or schedules it and returns None; views
+    only ask for rows on screen, and the most recent request runs first, so whatever is
+    visible loads before rows scrolled past. ``ready`` fires (coalesced) once new
+    thumbnails are in. The last ``memory_items`` thumbnails stay in memory.
+    """
+
+    ready = Signal()
+
+    def __init__(
+        self,
+        cache: ThumbnailCache | None = None,
+        *,
+        size: int = 64,
+        max_workers: int = 2,
+        memory_items: int = 2048,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.size = size
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.memory_items = memory_items
+        self._images: OrderedDict[str, QImage] = OrderedDict()
+        self._failed: set[str] = set()
+        self._pending: dict[str, _ThumbnailJob] = {}
+        self._priorities = itertools.count(1)
+        self._signals = _JobSignals(self)
+        self._signals.done.connect(self._finished)
+        self._notify = QTimer(self)
+        self._notify.setSingleShot(True)
+        self._notify.setInterval(50)
+        self._notify.timeout.connect(self.ready)
+
+    def get(self, path: str) -> QImage | None:
+        image = self._images.get(path)
+        if image is not None:
+            self._images.move_to_end(path)
+            return image
+        if path not in self._failed:
+            self._schedule(path)
+        return None
+
+    def shutdown(self) -> None:
+        """Drop queued work and wait for thumbnails already rendering."""
+
+        self.pool.clear()
+        self._pending.clear()
+        self.pool.waitForDone()
+
+    def _schedule(self, path: str) -> None:
+        # Later requests outrank earlier ones: they are what the view shows now.
+        priority = next(self._priorities) % (1 << 31)
+        job = self._pending.get(path)
+        if job is not None:
+            if self.pool.tryTake(job):
+                self.pool.start(job, priority)
+            return
+        job = _ThumbnailJob(path, self.size, self.cache, self._signals)
+        self._pending[path] = job
+        self.pool.start(job, priority)
+
+    def _finished(self, path: str, image: QImage | None) -> None:
+        self._pending.pop(path, None)
+        if image is None or image.isNull():
+            self._failed.add(path)
+            return
+        self._images[path] = image
+        while len(self._images) > self.memory_items:
+            self._images.popitem(last=False)
+        if not self._notify.isActive():
+            self._notify.start()
+
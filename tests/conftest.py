@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pypdf import PdfWriter
+
+
+def _create_sample_pdf(path: Path, pages: int) -> None:
+    writer = PdfWriter()
+    for index in range(pages):
+        writer.add_blank_page(width=100 + index, height=200)
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+@pytest.fixture
+def create_sample_pdf() -> Callable[[Path, int], None]:
+    """Write a PDF of blank pages whose widths count up from 100 points."""
+
+    return _create_sample_pdf
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+
+from pdftools.core import BatchStats, load_manifest, run_batch
+from pdftools.core.batch import DONE, FAILED, SKIPPED
+
+
+@pytest.fixture
+def inputs(tmp_path, create_sample_pdf) -> None:
+    create_sample_pdf(tmp_path / "a.pdf", 2)
+    create_sample_pdf(tmp_path / "b.pdf", 3)
+    Image.new("RGB", (40, 30), (255, 0, 0)).save(tmp_path / "one.png")
+    Image.new("RGB", (30, 40), (0, 0, 255)).save(tmp_path / "two.png")
+
+
+def write_json_manifest(directory: Path) -> Path:
+    manifest = directory / "jobs.json"
+    jobs = [
+        {"operation": "merge", "inputs": ["a.pdf", "b.pdf"], "output": "out/merged.pdf"},
+        {"operation": "split", "input": "b.pdf", "ranges": "1,3", "output": "out/parts"},
+        {"operation": "photo-to-pdf", "inputs": ["one.png", "two.png"], "output": "out/p.pdf"},
+    ]
+    manifest.write_text(json.dumps({"jobs": jobs}), encoding="utf-8")
+    return manifest
+
+
+def test_load_manifest__reads_csv_relative_to_manifest(tmp_path) -> None:
+    manifest = tmp_path / "jobs.csv"
+    manifest.write_text(
+        "operation,inputs,output,pages_per_part,normalize_sizes\n"
+        "merge,a.pdf|b.pdf,merged.pdf,,\n"
+        "split,b.pdf,parts,2,\n"
+        "photo-to-pdf,one.png|two.png,photos.pdf,,yes\n",
+        encoding="utf-8",
+    )
+
+    merge, split, photos = load_manifest(manifest)
+
+    assert merge.inputs == (tmp_path / "a.pdf", tmp_path / "b.pdf")
+    assert merge.output == tmp_path / "merged.pdf"
+    assert split.pages_per_part == 2 and split.ranges is None
+    assert photos.normalize_sizes is True
+
+
+def test_load_manifest__names_the_invalid_job(tmp_path) -> None:
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"operation": "merge", "inputs": ["a.pdf"], "output": "m.pdf"},
+                {"operation": "rotate", "inputs": ["a.pdf"], "output": "r.pdf"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError, match="job 2"):
+        load_manifest(manifest)
+
+
+def test_run_batch__runs_every_operation_and_resumes(tmp_path, inputs) -> None:
+    jobs = load_manifest(write_json_manifest(tmp_path))
+
+    stats = BatchStats()
+    results = run_batch(jobs, stats=stats)
+
+    assert [result.status for result in results] == [DONE, DONE, DONE]
+    assert len(PdfReader(tmp_path / "out" / "merged.pdf").pages) == 5
+    assert sorted(path.name for path in (tmp_path / "out" / "parts").iterdir()) == [
+        "b_part01_01.pdf",
+        "b_part02_03.pdf",
+    ]
+    assert len(PdfReader(tmp_path / "out" / "p.pdf").pages) == 2
+    assert stats.done == 3 and stats.pages == 5 + 2 + 2
+    assert stats.bytes_written == sum(
+        path.stat().st_size for path in (tmp_path / "out").rglob("*.pdf")
+    )
+    assert not list((tmp_path / "out").rglob(".pdftools-partial-*"))
+
+    (tmp_path / "out" / "parts" / "b_part02_03.pdf").unlink()
+    rerun = BatchStats()
+    results = run_batch(jobs, stats=rerun)
+
+    assert [result.status for result in results] == [SKIPPED, DONE, SKIPPED]
+    assert (rerun.skipped, rerun.done) == (2, 1)
+
+
+def test_run_batch__reports_failures_and_keeps_going(tmp_path, inputs) -> None:
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"operation": "merge", "inputs": ["missing.pdf"], "output": "bad.pdf"},
+                {"operation": "merge", "inputs": ["a.pdf"], "output": "good.pdf"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    stats = BatchStats()
+    bad, good = run_batch(load_manifest(manifest), stats=stats)
+
+    assert bad.status == FAILED and "missing.pdf" in bad.error
+    assert not (tmp_path / "bad.pdf").exists()
+    assert good.status == DONE
+    assert (stats.done, stats.failed) == (1, 1)
+
+
+def test_run_batch__process_pool_matches_serial_run(tmp_path, inputs) -> None:
+    jobs = load_manifest(write_json_manifest(tmp_path))
+
+    results = run_batch(jobs, workers=2)
+
+    assert [result.job for result in results] == jobs
+    assert [result.status for result in results] == [DONE, DONE, DONE]
+    assert [result.pages for result in results] == [5, 2, 2]
+
+
+def test_run_batch__rejects_jobs_sharing_an_output(tmp_path) -> None:
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"operation": "merge", "inputs": ["a.pdf"], "output": "same.pdf"},
+                {"operation": "photo-to-pdf", "inputs": ["one.png"], "output": "same.pdf"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError, match="same.pdf"):
+        run_batch(load_manifest(manifest))
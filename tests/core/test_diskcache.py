@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from pdftools.core.diskcache import DiskCache
+
+
+def test_disk_cache__evicts_least_recently_used_over_max_bytes(tmp_path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.put("aa-old", b"a" * 40)
+    cache.put("bb-stale", b"b" * 40)
+    cache.open("aa-old").close()
+
+    cache.put("cc-new", b"c" * 40)
+
+    assert cache.open("bb-stale") is None
+    with cache.open("aa-old") as handle:
+        assert handle.read() == b"a" * 40
+    with cache.open("cc-new") as handle:
+        assert handle.read() == b"c" * 40
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_cache__skips_entries_larger_than_the_cache(tmp_path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.put("aa-kept", b"a" * 40)
+
+    cache.put("bb-huge", b"b" * 101)
+
+    assert cache.open("bb-huge") is None
+    assert cache.open("aa-kept") is not None
+
+
+def test_disk_cache__tee_stores_nothing_when_abandoned(tmp_path) -> None:
+    cache = DiskCache(tmp_path, max_bytes=100)
+
+    chunks = cache.tee("aa-partial", [b"one", b"two"])
+    assert next(chunks) == b"one"
+    chunks.close()
+
+    assert cache.open("aa-partial") is None
+    assert not list((tmp_path / "aa").iterdir())
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+from PIL import Image
+
+from pdftools.core import (
+    Event,
+    TimingRecorder,
+    convert_images_to_pdf,
+    merge_pdfs,
+    merge_pdfs_io,
+    split_pdf,
+    split_pdf_io,
+)
+from pdftools.core.events import PAGE, STAGE_END, STAGE_START
+
+
+def stages(events: list[Event]) -> list[tuple[str, str]]:
+    return [(event.kind, event.stage) for event in events if event.kind != PAGE]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_merge__reports_stages_and_pages_per_source(tmp_path, streaming, create_sample_pdf) -> None:
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    create_sample_pdf(first, 2)
+    create_sample_pdf(second, 3)
+    events: list[Event] = []
+
+    output = merge_pdfs(
+        [first, second], tmp_path / "merged.pdf", streaming=streaming, observer=events.append
+    )
+
+    assert {event.operation for event in events} == {"merge"}
+    assert len({event.run for event in events}) == 1
+    ends = [(event.stage, event.source) for event in events if event.kind == STAGE_END]
+    final = "finish" if streaming else "write"
+    assert ends == [("open", 1), ("copy", 1), ("open", 2), ("copy", 2), (final, 2)]
+    assert all(event.sources == 2 for event in events)
+    pages = [event for event in events if event.kind == PAGE]
+    assert pages[-1].pages == 5
+    assert pages[-1].total_pages is None
+    if streaming:
+        assert [event.pages for event in pages] == [1, 2, 3, 4, 5]
+        assert [event.bytes_written for event in pages] == sorted(
+            event.bytes_written for event in pages
+        )
+    else:
+        assert pages[-1].bytes_written == output.stat().st_size
+    assert all(later.elapsed >= earlier.elapsed for earlier, later in zip(events, events[1:]))
+
+
+def test_stages__pair_up_with_durations(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 2)
+    events: list[Event] = []
+
+    merge_pdfs_io([source, source], io.BytesIO(), observer=events.append)
+
+    kinds = stages(events)
+    assert kinds[::2] == [(STAGE_START, stage) for _, stage in kinds[1::2]]
+    assert {kind for kind, _ in kinds[1::2]} == {STAGE_END}
+    assert all(event.duration >= 0 for event in events if event.kind == STAGE_END)
+    assert all(event.duration is None for event in events if event.kind != STAGE_END)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_split__reports_parts_out_of_total(tmp_path, workers, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 6)
+    events: list[Event] = []
+
+    outputs = split_pdf(
+        source, "1-2,4-", tmp_path / "parts", workers=workers, observer=events.append
+    )
+
+    pages = [event for event in events if event.kind == PAGE]
+    assert [(event.pages, event.total_pages) for event in pages] == [(2, 5), (5, 5)]
+    assert pages[-1].bytes_written == sum(path.stat().st_size for path in outputs)
+    assert stages(events) == [
+        (STAGE_START, "open"),
+        (STAGE_END, "open"),
+        (STAGE_START, "write"),
+        (STAGE_END, "write"),
+    ]
+
+
+def test_split_io__times_each_part(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 4)
+    events: list[Event] = []
+
+    parts = list(split_pdf_io(source.read_bytes(), "1,3-4", observer=events.append))
+
+    rendered = [event for event in events if event.kind == STAGE_END and event.stage == "render"]
+    assert len(rendered) == len(parts) == 2
+    pages = [event for event in events if event.kind == PAGE]
+    assert [(event.pages, event.total_pages) for event in pages] == [(1, 3), (3, 3)]
+    assert pages[-1].bytes_written == sum(len(data) for _, data in parts)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_convert__reports_every_page(tmp_path, streaming) -> None:
+    images = []
+    for index in range(3):
+        path = tmp_path / f"scan{index}.png"
+        Image.new("RGB", (40, 60), (index * 60, 0, 0)).save(path)
+        images.append(path)
+    events: list[Event] = []
+
+    output = convert_images_to_pdf(
+        images, tmp_path / "scans.pdf", streaming=streaming, observer=events.append
+    )
+
+    pages = [event for event in events if event.kind == PAGE]
+    assert pages[-1].pages == pages[-1].total_pages == 3
+    assert [e.stage for e in events if e.kind == STAGE_END].count("decode") >= 3
+    if not streaming:
+        assert pages[-1].bytes_written == output.stat().st_size
+
+
+def test_observer_exception__aborts_the_operation(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 3)
+
+    def cancel(event: Event) -> None:
+        if event.kind == PAGE:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        merge_pdfs([source], tmp_path / "merged.pdf", streaming=True, observer=cancel)
+
+
+def test_timing_recorder__sums_stages_across_runs(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 3)
+    recorder = TimingRecorder()
+
+    merge_pdfs_io([source], io.BytesIO(), observer=recorder)
+    merge_pdfs_io([source, source], io.BytesIO(), observer=recorder)
+    list(split_pdf_io(source, "1,3", observer=recorder))
+
+    report = recorder.report()
+    merge = report["merge"]
+    assert merge["runs"] == 2
+    assert merge["pages"] == 9
+    assert merge["stages"]["open"]["count"] == 3
+    assert merge["stages"]["finish"]["count"] == 2
+    assert sum(stage["seconds"] for stage in merge["stages"].values()) <= merge["elapsed"]
+    assert 0 <= merge["stages"]["copy"]["share"] <= 1
+    assert report["split"]["stages"]["render"]["count"] == 2
+
+    dumped = recorder.dump(tmp_path / "timings.json")
+    assert json.loads(dumped.read_text(encoding="utf-8"))["merge"]["runs"] == 2
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+import mmap
+from pathlib import Path
+
+from PIL import Image
+from pypdf import PdfReader
+
+from pdftools.core import (
+    SplitStats,
+    convert_images_to_pdf_io,
+    merge_pdfs_io,
+    split_pdf,
+    split_pdf_io,
+)
+
+
+def page_widths(data: bytes | Path) -> list[int]:
+    source = data if isinstance(data, Path) else io.BytesIO(data)
+    return [int(page.mediabox.width) for page in PdfReader(source).pages]
+
+
+class WriteOnly:
+    """A sink without ``seek``/``tell``, like a socket or an HTTP response body."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def test_merge_pdfs_io__reads_buffers_maps_and_files(tmp_path, create_sample_pdf) -> None:
+    first, second, third = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    create_sample_pdf(first, 2)
+    create_sample_pdf(second, 1)
+    create_sample_pdf(third, 3)
+    output = WriteOnly()
+
+    with third.open("rb") as handle, second.open("rb") as file_object:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pages = merge_pdfs_io([first.read_bytes(), file_object, mapped], output)
+
+    assert pages == 6
+    assert page_widths(b"".join(output.chunks)) == [100, 101, 100, 100, 101, 102]
+
+
+def test_split_pdf_io__matches_path_based_split(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "doc.pdf"
+    create_sample_pdf(source, 5)
+    stats = SplitStats()
+
+    parts = list(split_pdf_io(memoryview(source.read_bytes()), "1-2,4-", stem="doc", stats=stats))
+
+    on_disk = split_pdf(source, "1-2,4-", tmp_path / "out")
+    assert [name for name, _ in parts] == [path.name for path in on_disk]
+    assert [page_widths(data) for _, data in parts] == [page_widths(p) for p in on_disk]
+    assert (stats.parts, stats.pages) == (2, 4)
+    assert stats.bytes_written == sum(len(data) for _, data in parts)
+
+
+def _png_bytes(size: tuple[int, int], color: tuple[int, int, int]) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_convert_images_to_pdf_io__accepts_in_memory_images(tmp_path) -> None:
+    bmp = io.BytesIO()
+    Image.new("RGB", (60, 40), (0, 200, 0)).save(bmp, "BMP")
+    bmp.seek(0)
+    images = [_png_bytes((30, 20), (200, 0, 0)), bmp, bytearray(_png_bytes((10, 50), (0, 0, 9)))]
+    output = io.BytesIO()
+
+    # Workers receive pickled copies; the BMP is decoded in strips under the pixel budget.
+    convert_images_to_pdf_io(images, output, workers=2, pixel_budget=1_000, max_size=(60, 60))
+
+    reader = PdfReader(io.BytesIO(output.getvalue()))
+    images = [page["/Resources"]["/XObject"]["/image"] for page in reader.pages]
+    sizes = [(int(image["/Width"]), int(image["/Height"])) for image in images]
+    assert sizes == [(30, 20), (60, 40), (10, 50)]
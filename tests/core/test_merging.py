@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.annotations import Link
+from pypdf.generic import DictionaryObject, NameObject, NumberObject, StreamObject
+
+from pdftools.core import MergeStats, OutputOptions, merge_pdfs, merging
+from pdftools.core.operations import PDFOperationError
+
+
+def create_image_pdf(
+    path: Path, pages: int, *, image_bytes: int = 1_000, label: str = ""
+) -> None:
+    """Pages that each draw one random-payload image and link to the following page."""
+
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for index in range(pages):
+        image = StreamObject()
+        image.set_data(os.urandom(image_bytes))
+        image.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(1),
+                NameObject("/Height"): NumberObject(image_bytes // 3),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            }
+        )
+        page = writer.add_blank_page(width=100 + index, height=200)
+        content = StreamObject()
+        content.set_data(
+            f"q 10 0 0 10 0 0 cm /Im0 Do Q BT /F1 12 Tf 10 50 Td ({label}{index}) Tj ET".encode()
+        )
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/XObject"): DictionaryObject(
+                    {NameObject("/Im0"): writer._add_object(image)}
+                ),
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+            }
+        )
+    for index in range(pages - 1):
+        writer.add_annotation(index, Link(rect=(0, 0, 10, 10), target_page_index=index + 1))
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_merge_pdfs__streaming_matches_default_pages(tmp_path) -> None:
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    create_image_pdf(first, 3, label="a")
+    create_image_pdf(second, 2, label="b")
+
+    default = merge_pdfs([first, second], tmp_path / "default.pdf")
+    streamed = merge_pdfs([first, second], tmp_path / "streamed.pdf", streaming=True)
+
+    expected, actual = PdfReader(default), PdfReader(streamed)
+    assert len(actual.pages) == 5
+    for want, got in zip(expected.pages, actual.pages):
+        assert got.mediabox == want.mediabox
+        assert got.extract_text() == want.extract_text()
+        image = got["/Resources"]["/XObject"]["/Im0"].get_object()
+        assert image.get_data() == want["/Resources"]["/XObject"]["/Im0"].get_object().get_data()
+
+
+def test_merge_pdfs__streaming_links_point_at_copied_pages(tmp_path) -> None:
+    source = tmp_path / "linked.pdf"
+    create_image_pdf(source, 3)
+
+    merged = PdfReader(merge_pdfs([source, source], tmp_path / "out.pdf", streaming=True))
+
+    page_numbers = {page.indirect_reference.idnum: i for i, page in enumerate(merged.pages)}
+    targets = [
+        page_numbers[annotation.get_object()["/Dest"][0].idnum]
+        for page in merged.pages
+        for annotation in page.get("/Annots", [])
+    ]
+    assert targets == [1, 2, 4, 5]
+    assert merged.trailer["/Root"]["/Pages"]["/Count"] == 6
+
+
+_PEAK_RSS_SCRIPT = """
+import sys
+from pdftools.core import merge_pdfs
+from pdftools.core.stats import peak_rss_bytes
+source, count, output = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+merge_pdfs([source] * count, output, streaming=True)
+print(peak_rss_bytes())
+"""
+
+
+def _peak_rss_of_streaming_merge(tmp_path: Path, source: Path, count: int) -> int:
+    output = tmp_path / f"merged_{count}.pdf"
+    completed = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(source), str(count), str(output)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    assert len(PdfReader(output).pages) == 4 * count
+    return int(completed.stdout.strip())
+
+
+def test_merge_pdfs__streaming_peak_memory_follows_largest_input(tmp_path) -> None:
+    pytest.importorskip("resource")
+    source = tmp_path / "large.pdf"
+    # ~16 MB of image data per input; holding 16 inputs at once would need ~256 MB.
+    create_image_pdf(source, 4, image_bytes=4_000_000)
+
+    few = _peak_rss_of_streaming_merge(tmp_path, source, 2)
+    many = _peak_rss_of_streaming_merge(tmp_path, source, 16)
+
+    assert many - few < 48 * 1024 * 1024
+
+
+def create_template_pdf(path: Path, logo: bytes, invoice: int) -> None:
+    """An invoice page sharing its logo with every other invoice but with its own text."""
+
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=200, height=200)
+    image = StreamObject()
+    image.set_data(logo)
+    image.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(1),
+            NameObject("/Height"): NumberObject(len(logo) // 3),
+            NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+        }
+    )
+    content = StreamObject()
+    content.set_data(f"q 10 0 0 10 0 0 cm /Logo Do Q % invoice {invoice}".encode())
+    page[NameObject("/Contents")] = writer._add_object(content)
+    page[NameObject("/Resources")] = DictionaryObject(
+        {
+            NameObject("/XObject"): DictionaryObject(
+                {NameObject("/Logo"): writer._add_object(image)}
+            )
+        }
+    )
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_merge_pdfs__deduplicates_identical_streams(tmp_path) -> None:
+    logo = os.urandom(30_000)
+    sources = []
+    for invoice in range(5):
+        sources.append(tmp_path / f"invoice{invoice}.pdf")
+        create_template_pdf(sources[-1], logo, invoice)
+    stats = MergeStats()
+
+    plain = merge_pdfs(sources, tmp_path / "plain.pdf", streaming=True)
+    deduplicated = merge_pdfs(sources, tmp_path / "dedup.pdf", deduplicate=True, stats=stats)
+
+    assert stats.sources == 5
+    assert stats.pages == 5
+    assert stats.deduplicated_objects == 4
+    assert stats.deduplicated_bytes > 4 * 30_000
+    assert stats.bytes_written == deduplicated.stat().st_size
+    assert plain.stat().st_size - deduplicated.stat().st_size >= 4 * 30_000
+
+    pages = PdfReader(deduplicated).pages
+    logos = {page["/Resources"]["/XObject"].raw_get("/Logo").idnum for page in pages}
+    assert len(logos) == 1
+    # Content streams differ per invoice and stay separate.
+    invoices = [page.get_contents().get_data()[-1:] for page in pages]
+    assert invoices == [b"0", b"1", b"2", b"3", b"4"]
+
+
+def test_merge_pdfs__streaming_failure_keeps_existing_output(tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 2)
+    destination = merge_pdfs([source], tmp_path / "merged.pdf")
+    original = destination.read_bytes()
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.7\nnot really")
+
+    with pytest.raises(PDFOperationError, match="broken.pdf"):
+        merge_pdfs([source, broken], destination, streaming=True)
+
+    assert destination.read_bytes() == original
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".partial")] == []
+
+
+def test_merge_pdfs__append_adds_incremental_update(tmp_path) -> None:
+    first, second, third = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    create_image_pdf(first, 3, label="a")
+    create_image_pdf(second, 2, label="b")
+    create_image_pdf(third, 1, label="c")
+    ledger = merge_pdfs([first], tmp_path / "ledger.pdf")
+    original = ledger.read_bytes()
+    stats = MergeStats()
+
+    merge_pdfs([second], ledger, append=True, stats=stats)
+    assert stats.pages == 2
+    assert stats.bytes_written == ledger.stat().st_size - len(original)
+    merge_pdfs([third], ledger, append=True)
+
+    data = ledger.read_bytes()
+    assert data.startswith(original)
+    assert data.count(b"%%EOF") == 3
+    reader = PdfReader(ledger, strict=True)
+    assert [page.extract_text() for page in reader.pages] == ["a0", "a1", "a2", "b0", "b1", "c0"]
+    assert [int(page.mediabox.width) for page in reader.pages] == [100, 101, 102, 100, 101, 100]
+
+
+def test_merge_pdfs__append_creates_missing_output(tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 2)
+
+    created = merge_pdfs([source], tmp_path / "new.pdf", append=True)
+
+    assert len(PdfReader(created).pages) == 2
+
+
+def test_merge_pdfs__append_rejects_modified_base(tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 1, label="a")
+    ledger = merge_pdfs([source], tmp_path / "ledger.pdf")
+    merge_pdfs([source], ledger, append=True)
+    data = bytearray(ledger.read_bytes())
+    data[data.rindex(b"(a0)") + 1] = ord("z")
+    ledger.write_bytes(bytes(data))
+
+    with pytest.raises(PDFOperationError, match="modified"):
+        merge_pdfs([source], ledger, append=True)
+    assert ledger.read_bytes() == bytes(data)
+
+
+def _touch_header_comment(path: Path) -> None:
+    # The binary comment on the second line is not parsed, so the file stays readable.
+    data = bytearray(path.read_bytes())
+    data[10] ^= 0x01
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("output_options", [None, OutputOptions()])
+def test_merge_pdfs__first_append_checks_streamed_base(tmp_path, output_options) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 1)
+    ledger = merge_pdfs(
+        [source], tmp_path / "ledger.pdf", streaming=True, output_options=output_options
+    )
+    _touch_header_comment(ledger)
+    assert len(PdfReader(ledger).pages) == 1
+
+    with pytest.raises(PDFOperationError, match="modified"):
+        merge_pdfs([source], ledger, append=True)
+
+
+def test_merge_pdfs__append_reads_only_the_last_update(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 1)
+    ledger = merge_pdfs([source], tmp_path / "ledger.pdf", streaming=True)
+    merge_pdfs([source], ledger, append=True)
+    last_update = ledger.stat().st_size
+    merge_pdfs([source], ledger, append=True)
+    hashed = []
+    hash_range = merging._hash_range
+
+    def recording(handle, digest, start, end):
+        hashed.append((start, end))
+        hash_range(handle, digest, start, end)
+
+    monkeypatch.setattr(merging, "_hash_range", recording)
+    merge_pdfs([source], ledger, append=True)
+
+    assert len(hashed) == 1
+    assert hashed[0][0] == last_update
+
+
+def test_merge_pdfs__append_rejects_foreign_update(tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 1)
+    ledger = merge_pdfs([source], tmp_path / "ledger.pdf")
+    merge_pdfs([source], ledger, append=True)
+    writer = PdfWriter(ledger, incremental=True)
+    writer.add_metadata({"/Title": "edited elsewhere"})
+    edited = tmp_path / "edited.pdf"
+    writer.write(edited)
+    edited.replace(ledger)
+
+    with pytest.raises(PDFOperationError, match="modified"):
+        merge_pdfs([source], ledger, append=True)
+
+
+def test_merge_pdfs__failed_append_leaves_base_untouched(tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 1)
+    ledger = merge_pdfs([source], tmp_path / "ledger.pdf")
+    original = ledger.read_bytes()
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    with pytest.raises(PDFOperationError, match="broken.pdf"):
+        merge_pdfs([source, broken], ledger, append=True)
+
+    assert ledger.read_bytes() == original
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import os
+import subprocess
+import sys
+import warnings
 from pathlib import Path
 
 import pytest
 from PIL import Image
 from pypdf import PdfReader
 
-from pdftools.core.operations import convert_images_to_pdf
+from pdftools.core.operations import PDFOperationError, convert_images_to_pdf
 
 
 def create_sample_image(path: Path, color: tuple[int, int, int]) -> None:
@@ -36,6 +40,22 @@ def test_convert_images_to_pdf__requires_images(tmp_path) -> None:
         convert_images_to_pdf([], output)
 
 
+def test_convert_images_to_pdf__streaming_failure_keeps_existing_output(tmp_path) -> None:
+    image = tmp_path / "one.png"
+    create_sample_image(image, (255, 0, 0))
+    output = convert_images_to_pdf([image], tmp_path / "photos.pdf", streaming=True)
+    original = output.read_bytes()
+    truncated = tmp_path / "truncated.jpg"
+    Image.effect_noise((400, 400), 50).convert("RGB").save(truncated)
+    truncated.write_bytes(truncated.read_bytes()[: truncated.stat().st_size // 2])
+
+    with pytest.raises(OSError, match="truncated"):
+        convert_images_to_pdf([image, truncated], output, streaming=True)
+
+    assert output.read_bytes() == original
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".partial")] == []
+
+
 def test_convert_images_to_pdf__normalizes_page_size_when_requested(tmp_path) -> None:
     wide = tmp_path / "wide.png"
     tall = tmp_path / "tall.png"
@@ -51,3 +71,244 @@ def test_convert_images_to_pdf__normalizes_page_size_when_requested(tmp_path) ->
     second_box = reader.pages[1].mediabox
     assert first_box.width == second_box.width
     assert first_box.height == second_box.height
+
+
+def _image_payloads(pdf_path: Path) -> list[tuple[object, bytes]]:
+    reader = PdfReader(pdf_path)
+    payloads = []
+    for page in reader.pages:
+        image = page["/Resources"]["/XObject"]["/image"].get_object()
+        payloads.append((tuple(page.mediabox), image.get_data()))
+    return payloads
+
+
+def test_convert_images_to_pdf__streaming_matches_default_output(tmp_path) -> None:
+    sources = [tmp_path / "wide.png", tmp_path / "alpha.png", tmp_path / "tall.png"]
+    Image.new("RGB", (200, 100), (0, 0, 255)).save(sources[0])
+    Image.new("RGBA", (80, 80), (255, 0, 0, 128)).save(sources[1])
+    Image.new("RGB", (100, 200), (255, 255, 0)).save(sources[2])
+
+    for normalize in (False, True):
+        default = convert_images_to_pdf(
+            sources, tmp_path / f"default_{normalize}.pdf", normalize_sizes=normalize
+        )
+        streamed = convert_images_to_pdf(
+            sources,
+            tmp_path / f"streamed_{normalize}.pdf",
+            normalize_sizes=normalize,
+            streaming=True,
+        )
+        assert _image_payloads(streamed) == _image_payloads(default)
+
+
+_PEAK_RSS_SCRIPT = """
+import sys
+from pdftools.core.operations import convert_images_to_pdf
+from pdftools.core.stats import peak_rss_bytes
+source, count, output = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+convert_images_to_pdf([source] * count, output, streaming=True)
+print(peak_rss_bytes())
+"""
+
+
+def _peak_rss_of_streaming_run(tmp_path: Path, source: Path, count: int) -> int:
+    output = tmp_path / f"peak_{count}.pdf"
+    completed = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(source), str(count), str(output)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    assert len(PdfReader(output).pages) == count
+    return int(completed.stdout.strip())
+
+
+def test_convert_images_to_pdf__streaming_peak_memory_is_flat(tmp_path) -> None:
+    pytest.importorskip("resource")
+    source = tmp_path / "large.png"
+    # ~12 MB once decoded; keeping 24 of them alive would need ~290 MB.
+    Image.new("RGB", (2000, 2000), (10, 120, 200)).save(source)
+
+    few = _peak_rss_of_streaming_run(tmp_path, source, 2)
+    many = _peak_rss_of_streaming_run(tmp_path, source, 24)
+
+    assert many - few < 48 * 1024 * 1024
+
+
+def _save_jpeg(path: Path, size: tuple[int, int], orientation: int | None = None) -> None:
+    image = Image.new("RGB", size, (200, 30, 30))
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    image.save(path, "JPEG", exif=exif)
+
+
+def test_convert_images_to_pdf__jpeg_passthrough_embeds_original_bytes(tmp_path) -> None:
+    upright = tmp_path / "upright.jpg"
+    rotated = tmp_path / "rotated.jpg"
+    mirrored = tmp_path / "mirrored.jpg"
+    fallback = tmp_path / "fallback.png"
+    _save_jpeg(upright, (120, 80))
+    _save_jpeg(rotated, (120, 80), orientation=6)
+    _save_jpeg(mirrored, (120, 80), orientation=2)
+    Image.new("RGBA", (50, 40), (0, 0, 255, 128)).save(fallback)
+
+    output = tmp_path / "passthrough.pdf"
+    convert_images_to_pdf([upright, rotated, mirrored, fallback], output, jpeg_passthrough=True)
+
+    pages = PdfReader(output).pages
+    for page, source in zip(pages, (upright, rotated, mirrored)):
+        image = page["/Resources"]["/XObject"]["/image"].get_object()
+        assert image["/Filter"] == "/DCTDecode"
+        assert image._data == source.read_bytes()
+    assert pages[0].get("/Rotate", 0) == 0
+    assert pages[1]["/Rotate"] == 90
+    assert pages[2].get_contents().get_data().startswith(b"q -28.8")
+    fallback_image = pages[3]["/Resources"]["/XObject"]["/image"].get_object()
+    assert fallback_image["/Width"] == 50
+
+
+def test_convert_images_to_pdf__jpeg_passthrough_normalizes_displayed_size(tmp_path) -> None:
+    portrait = tmp_path / "portrait.jpg"
+    landscape = tmp_path / "landscape.png"
+    _save_jpeg(portrait, (300, 150), orientation=8)
+    Image.new("RGB", (90, 60), (0, 255, 0)).save(landscape)
+
+    output = tmp_path / "normalized.pdf"
+    convert_images_to_pdf(
+        [portrait, landscape], output, normalize_sizes=True, jpeg_passthrough=True
+    )
+
+    first, second = PdfReader(output).pages
+    # The first page is displayed as 150x300 px, so the PNG is resized to match it.
+    assert first["/Rotate"] == 270
+    assert (first.mediabox.width, first.mediabox.height) == (72, 36)
+    assert (second.mediabox.width, second.mediabox.height) == (36, 72)
+
+
+def test_convert_images_to_pdf__workers_preserve_page_order(tmp_path) -> None:
+    sources = []
+    for index in range(7):
+        source = tmp_path / f"page{index}.png"
+        Image.new("RGB", (40 + index * 10, 60), (index * 30, 0, 0)).save(source)
+        sources.append(source)
+
+    serial = convert_images_to_pdf(sources, tmp_path / "serial.pdf", normalize_sizes=True)
+    parallel = convert_images_to_pdf(
+        sources, tmp_path / "parallel.pdf", normalize_sizes=True, workers=3
+    )
+
+    assert _image_payloads(parallel) == _image_payloads(serial)
+
+
+def test_convert_images_to_pdf__downsamples_to_target_dpi(tmp_path, monkeypatch) -> None:
+    from PIL import JpegImagePlugin
+
+    source = tmp_path / "large.jpg"
+    Image.effect_noise((4000, 3000), 40).convert("RGB").save(source, quality=90)
+    drafts: list[tuple[int, int]] = []
+    original_draft = JpegImagePlugin.JpegImageFile.draft
+
+    def record_draft(self, mode, size):
+        drafts.append(size)
+        return original_draft(self, mode, size)
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", record_draft)
+
+    output = tmp_path / "a4.pdf"
+    convert_images_to_pdf([source], output, page_size="A4", dpi=100, jpeg_quality=60)
+
+    page = PdfReader(output).pages[0]
+    image = page["/Resources"]["/XObject"]["/image"].get_object()
+    assert float(page.mediabox.width) == pytest.approx(595.28)
+    assert float(page.mediabox.height) == pytest.approx(841.89)
+    assert (image["/Width"], image["/Height"]) == (827, 620)
+    assert drafts == [(827, 620)]
+    assert output.stat().st_size < source.stat().st_size / 4
+
+
+def test_convert_images_to_pdf__max_size_keeps_physical_page_size(tmp_path) -> None:
+    source = tmp_path / "scan.png"
+    Image.new("RGB", (1200, 600), (0, 0, 0)).save(source)
+
+    output = tmp_path / "capped.pdf"
+    convert_images_to_pdf([source], output, max_size=(300, 300))
+
+    page = PdfReader(output).pages[0]
+    image = page["/Resources"]["/XObject"]["/image"].get_object()
+    assert (image["/Width"], image["/Height"]) == (300, 150)
+    assert (page.mediabox.width, page.mediabox.height) == (288, 144)
+
+
+@pytest.mark.parametrize("suffix", [".tif", ".bmp"])
+def test_convert_images_to_pdf__decodes_oversized_rasters_in_strips(tmp_path, suffix) -> None:
+    source = tmp_path / f"scan{suffix}"
+    original = Image.effect_noise((600, 400), 60).convert("RGB")
+    original.save(source)
+    guard = Image.MAX_IMAGE_PIXELS
+
+    output = tmp_path / "scan.pdf"
+    convert_images_to_pdf([source], output, pixel_budget=10_000)
+
+    image = PdfReader(output).pages[0]["/Resources"]["/XObject"]["/image"].get_object()
+    assert image["/Filter"] == "/FlateDecode"
+    assert (image["/Width"], image["/Height"]) == (600, 400)
+    assert image.get_data() == original.tobytes()
+    assert Image.MAX_IMAGE_PIXELS == guard
+
+
+def test_convert_images_to_pdf__pixel_budget_leaves_pillow_guard_in_force(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 200_000)
+    source = tmp_path / "scan.tif"
+    Image.new("RGB", (600, 400), (40, 80, 120)).save(source)
+
+    output = tmp_path / "scan.pdf"
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", Image.DecompressionBombWarning)
+        convert_images_to_pdf([source], output, pixel_budget=10_000)
+
+    assert len(PdfReader(output).pages) == 1
+    with pytest.warns(Image.DecompressionBombWarning):
+        Image.open(source).close()
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000)
+    with pytest.raises(PDFOperationError, match="decompression bomb"):
+        convert_images_to_pdf([source], output, pixel_budget=10_000)
+
+
+def test_convert_images_to_pdf__reduces_strips_to_requested_size(tmp_path) -> None:
+    source = tmp_path / "scan.tif"
+    Image.new("RGB", (900, 500), (40, 80, 120)).save(source)
+
+    output = tmp_path / "scan.pdf"
+    convert_images_to_pdf([source], output, pixel_budget=20_000, max_size=(300, 300))
+
+    page = PdfReader(output).pages[0]
+    image = page["/Resources"]["/XObject"]["/image"].get_object()
+    assert (image["/Width"], image["/Height"]) == (300, 167)
+    assert (page.mediabox.width, page.mediabox.height) == (216, 120)
+
+
+def test_convert_images_to_pdf__rejects_oversized_compressed_rasters(tmp_path) -> None:
+    source = tmp_path / "scan.png"
+    Image.new("RGB", (600, 400), (0, 0, 0)).save(source)
+
+    with pytest.raises(PDFOperationError):
+        convert_images_to_pdf([source], tmp_path / "scan.pdf", pixel_budget=10_000)
+
+
+def test_convert_images_to_pdf__emits_every_tiff_frame(tmp_path) -> None:
+    source = tmp_path / "stack.tif"
+    frames = [Image.new("RGB", (50 + 10 * index, 40), (index * 80, 0, 0)) for index in range(3)]
+    frames[0].save(source, save_all=True, append_images=frames[1:])
+
+    output = tmp_path / "stack.pdf"
+    convert_images_to_pdf([source, source], output, streaming=True)
+
+    widths = [
+        page["/Resources"]["/XObject"]["/image"].get_object()["/Width"]
+        for page in PdfReader(output).pages
+    ]
+    assert widths == [50, 60, 70, 50, 60, 70]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import zlib
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject, StreamObject
+
+from pdftools.core import OutputOptions, convert_images_to_pdf, merge_pdfs, split_pdf
+
+
+def create_text_pdf(path: Path, pages: int) -> None:
+    """Pages with long, unfiltered content streams and per-page resource dictionaries."""
+
+    writer = PdfWriter()
+    for index in range(pages):
+        page = writer.add_blank_page(width=300, height=300)
+        content = StreamObject()
+        lines = "".join(
+            f"BT /F1 10 Tf 10 {y} Td (line {y} of page {index}) Tj ET\n"
+            for y in range(10, 290, 10)
+        )
+        content.set_data(lines.encode("ascii"))
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject(
+                    {
+                        NameObject("/F1"): DictionaryObject(
+                            {
+                                NameObject("/Type"): NameObject("/Font"),
+                                NameObject("/Subtype"): NameObject("/Type1"),
+                                NameObject("/BaseFont"): NameObject("/Helvetica"),
+                            }
+                        )
+                    }
+                )
+            }
+        )
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_output_options__validates_combinations() -> None:
+    with pytest.raises(ValueError):
+        OutputOptions(object_streams=True, xref_stream=False)
+    with pytest.raises(ValueError):
+        OutputOptions(compression_level=10)
+
+
+def test_merge_pdfs__compact_output_is_smaller_and_equivalent(tmp_path) -> None:
+    source = tmp_path / "text.pdf"
+    create_text_pdf(source, 8)
+
+    plain = merge_pdfs([source, source], tmp_path / "plain.pdf")
+    compact = merge_pdfs(
+        [source, source],
+        tmp_path / "compact.pdf",
+        output_options=OutputOptions(objects_per_stream=5),
+    )
+
+    data = compact.read_bytes()
+    assert data.startswith(b"%PDF-1.5")
+    assert data.count(b"/Type /ObjStm") >= 3
+    assert b"/Type /XRef" in data and b"\nxref\n" not in data
+    assert compact.stat().st_size < plain.stat().st_size / 2
+    expected = [page.extract_text() for page in PdfReader(plain).pages]
+    reader = PdfReader(compact, strict=True)
+    assert [page.extract_text() for page in reader.pages] == expected
+    assert all(page["/Contents"]["/Filter"] == "/FlateDecode" for page in reader.pages)
+
+
+def test_merge_pdfs__recompression_alone_keeps_classic_xref(tmp_path) -> None:
+    source = tmp_path / "text.pdf"
+    create_text_pdf(source, 2)
+    options = OutputOptions(object_streams=False, xref_stream=False)
+
+    merged = merge_pdfs([source], tmp_path / "out.pdf", output_options=options)
+
+    data = merged.read_bytes()
+    assert data.startswith(b"%PDF-1.4") and b"\nxref\n" in data
+    contents = PdfReader(merged).pages[0]["/Contents"].get_object()
+    assert zlib.decompress(contents._data) == contents.get_data()
+    assert b"line 10 of page 0" in contents.get_data()
+
+
+def test_split_pdf__writes_compact_parts(tmp_path) -> None:
+    source = tmp_path / "text.pdf"
+    create_text_pdf(source, 4)
+
+    plain = split_pdf(source, "1-2,3-4", tmp_path / "plain")
+    compact = split_pdf(source, "1-2,3-4", tmp_path / "compact", output_options=OutputOptions())
+
+    for before, after in zip(plain, compact):
+        assert after.stat().st_size < before.stat().st_size
+        assert [page.extract_text() for page in PdfReader(after, strict=True).pages] == [
+            page.extract_text() for page in PdfReader(before).pages
+        ]
+
+
+def test_convert_images_to_pdf__accepts_output_options(tmp_path) -> None:
+    image_path = tmp_path / "flat.png"
+    Image.new("RGB", (120, 80), (10, 120, 200)).save(image_path)
+
+    output = convert_images_to_pdf(
+        [image_path] * 3, tmp_path / "photos.pdf", output_options=OutputOptions()
+    )
+
+    reader = PdfReader(output, strict=True)
+    assert len(reader.pages) == 3
+    assert reader.pages[0]["/Resources"]["/XObject"]["/image"]["/Width"] == 120
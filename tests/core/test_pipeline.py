@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import io
+import pickle
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+
+from pdftools.core import (
+    MergeStats,
+    Pipeline,
+    SplitStats,
+    convert_images_to_pdf,
+    merge_pdfs,
+    split_pdf,
+)
+
+
+def create_images(directory: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = directory / f"scan{index}.png"
+        Image.new("RGB", (60 + index, 90), (index * 40, 80, 160)).save(path)
+        paths.append(path)
+    return paths
+
+
+def page_sizes(source: Path | bytes) -> list[tuple[int, int]]:
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return [(int(page.mediabox.width), int(page.mediabox.height)) for page in reader.pages]
+
+
+def test_pipeline__matches_convert_merge_split_chain(tmp_path, create_sample_pdf) -> None:
+    cover = tmp_path / "cover.pdf"
+    create_sample_pdf(cover, 2)
+    scans = create_images(tmp_path, 3)
+
+    photos = convert_images_to_pdf(scans, tmp_path / "photos.pdf", page_size="A5")
+    merged = merge_pdfs([cover, photos], tmp_path / "merged.pdf")
+    expected = split_pdf(merged, "1-2,3-", tmp_path / "chained")
+
+    pipeline = Pipeline().add_pdfs([cover]).add_images(scans, page_size="A5")
+    parts = pipeline.split("1-2,3-", tmp_path / "piped", stem="merged")
+
+    assert [part.name for part in parts] == [part.name for part in expected]
+    for part, reference in zip(parts, expected):
+        assert page_sizes(part) == page_sizes(reference)
+    assert not (tmp_path / "piped" / "photos.pdf").exists()
+
+
+def test_pipeline__select_reorders_and_mixes_sources(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 4)
+    scans = create_images(tmp_path, 1)
+    stats = MergeStats()
+
+    output = (
+        Pipeline()
+        .add_pdfs([source])
+        .add_images(scans)
+        .select([5, 4, 1, 2])
+        .write(tmp_path / "out.pdf", stats=stats)
+    )
+
+    widths = [width for width, _ in page_sizes(output)]
+    assert widths[1:] == [103, 100, 101]
+    assert widths[0] == 14  # 60 pixels at 300 DPI
+    assert stats.pages == 4 and stats.sources == 2
+    assert PdfReader(output).metadata.title == "out"
+
+
+def test_pipeline__range_selection_keeps_document_order(tmp_path, create_sample_pdf) -> None:
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    create_sample_pdf(first, 3)
+    create_sample_pdf(second, 2)
+    output = io.BytesIO()
+
+    pages = Pipeline().add_pdfs([first, second.read_bytes()]).select("2-4").write_io(output)
+
+    assert pages == 3
+    assert [width for width, _ in page_sizes(output.getvalue())] == [101, 102, 100]
+
+
+def test_pipeline__split_io_encodes_images_once_across_parts(tmp_path) -> None:
+    scans = create_images(tmp_path, 4)
+    stats = SplitStats()
+
+    parts = list(Pipeline(workers=2).add_images(scans).split_io("1,3-4", stats=stats))
+
+    assert [name for name, _ in parts] == ["document_part01_01.pdf", "document_part02_03-04.pdf"]
+    assert [len(page_sizes(data)) for _, data in parts] == [1, 2]
+    assert stats.parts == 2 and stats.pages == 3
+
+
+def test_pipeline__is_lazy_and_picklable(tmp_path, create_sample_pdf) -> None:
+    missing = tmp_path / "later.pdf"
+    pipeline = Pipeline().add_pdfs([missing]).select("1")
+
+    restored = pickle.loads(pickle.dumps(pipeline))
+    create_sample_pdf(missing, 2)
+
+    assert restored == pipeline
+    assert page_sizes(restored.write(tmp_path / "out.pdf")) == [(100, 200)]
+
+
+def test_pipeline__rejects_out_of_range_selection(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 2)
+
+    with pytest.raises(ValueError):
+        Pipeline().add_pdfs([source]).select([3]).write(tmp_path / "out.pdf")
+
+
+def test_pipeline__failed_write_keeps_existing_output(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "source.pdf"
+    create_sample_pdf(source, 2)
+    output = Pipeline().add_pdfs([source]).write(tmp_path / "out.pdf")
+    original = output.read_bytes()
+
+    with pytest.raises(ValueError):
+        Pipeline().add_pdfs([source]).select([3]).write(output)
+
+    assert output.read_bytes() == original
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".partial")] == []
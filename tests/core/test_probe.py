@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import NameObject
+
+from pdftools.core import ProbeIndex, probe_pdf, probe_pdfs
+from pdftools.core import probe as probe_module
+
+
+def create_pdf(path: Path, pages: int, *, password: str | None = None) -> None:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=100, height=100)
+    if password is not None:
+        writer.encrypt(password, "owner")
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_probe_pdf__reads_counts_without_loading_pages(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "doc.pdf"
+    create_pdf(source, 7)
+
+    def fail(*_args):
+        raise AssertionError("probe must not walk the page tree")
+
+    monkeypatch.setattr(PdfReader, "_flatten", fail)
+    info = probe_pdf(source)
+
+    assert info.ok
+    assert (info.pages, info.encrypted, info.size) == (7, False, source.stat().st_size)
+    assert info.version == "1.3"
+
+
+def test_probe_pdf__reports_encryption_and_errors(tmp_path) -> None:
+    locked, open_locked = tmp_path / "locked.pdf", tmp_path / "owner.pdf"
+    broken = tmp_path / "broken.pdf"
+    create_pdf(locked, 2, password="secret")
+    create_pdf(open_locked, 3, password="")
+    broken.write_bytes(b"not a pdf at all")
+
+    locked_info, owner_info, broken_info = probe_pdfs([locked, open_locked, broken])
+
+    assert (locked_info.encrypted, locked_info.pages) == (True, None)
+    assert (owner_info.encrypted, owner_info.pages) == (True, 3)
+    assert not broken_info.ok and broken_info.pages is None
+
+
+def test_probe_pdf__compares_versions_numerically(tmp_path) -> None:
+    raised, lowered = tmp_path / "raised.pdf", tmp_path / "lowered.pdf"
+    for path, header, catalog in ((raised, "1.9", "/1.10"), (lowered, "1.7", "/1.4")):
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.pdf_header = f"%PDF-{header}"
+        writer.root_object[NameObject("/Version")] = NameObject(catalog)
+        with path.open("wb") as handle:
+            writer.write(handle)
+
+    assert probe_pdf(raised).version == "1.10"
+    assert probe_pdf(lowered).version == "1.7"
+
+
+def test_probe_pdfs__reports_missing_files_with_and_without_index(tmp_path) -> None:
+    present, missing = tmp_path / "a.pdf", tmp_path / "missing.pdf"
+    create_pdf(present, 2)
+
+    with ProbeIndex(tmp_path / "probe.sqlite") as index:
+        plain = probe_pdfs([present, missing])
+        indexed = probe_pdfs([present, missing], index=index)
+
+    for infos in (plain, indexed):
+        assert infos[0].pages == 2
+        assert not infos[1].ok and "missing.pdf" in infos[1].error
+        assert (infos[1].size, infos[1].pages) == (0, None)
+
+
+def test_probe_pdfs__index_skips_unchanged_files(tmp_path, monkeypatch) -> None:
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    create_pdf(first, 1)
+    create_pdf(second, 2)
+    database = tmp_path / "probe.sqlite"
+
+    with ProbeIndex(database) as index:
+        assert [info.pages for info in probe_pdfs([first, second], index=index)] == [1, 2]
+
+    probed: list[Path] = []
+    original = probe_module.probe_pdf
+
+    def counting(path):
+        probed.append(path)
+        return original(path)
+
+    monkeypatch.setattr(probe_module, "probe_pdf", counting)
+    create_pdf(second, 5)
+    with ProbeIndex(database) as index:
+        infos = probe_pdfs([first, second], index=index)
+
+    assert [info.pages for info in infos] == [1, 5]
+    assert probed == [second.resolve()]
+
+
+def test_probe_pdfs__parallel_keeps_order(tmp_path) -> None:
+    paths = []
+    for pages in (3, 1, 4, 1, 5):
+        paths.append(tmp_path / f"doc{len(paths)}.pdf")
+        create_pdf(paths[-1], pages)
+
+    infos = probe_pdfs(paths, workers=2)
+
+    assert [info.pages for info in infos] == [3, 1, 4, 1, 5]
+    assert [info.path for info in infos] == [path.resolve() for path in paths]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DictionaryObject, NameObject, NumberObject, StreamObject
+
+from pdftools.core import SplitStats, burst_pdf, split_pdf
+
+
+def page_widths(paths: list[Path]) -> list[list[int]]:
+    return [[int(page.mediabox.width) for page in PdfReader(path).pages] for path in paths]
+
+
+def test_split_pdf__keeps_part_naming_scheme(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "doc.pdf"
+    create_sample_pdf(source, 6)
+
+    exported = split_pdf(source, "1-2,5", tmp_path / "out")
+
+    assert [path.name for path in exported] == ["doc_part01_01-02.pdf", "doc_part02_05.pdf"]
+    assert page_widths(exported) == [[100, 101], [104]]
+
+
+def test_burst_pdf__writes_one_file_per_page(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "doc.pdf"
+    create_sample_pdf(source, 3)
+
+    exported = burst_pdf(source, tmp_path / "out")
+
+    assert [path.name for path in exported] == [
+        "doc_part01_01.pdf",
+        "doc_part02_02.pdf",
+        "doc_part03_03.pdf",
+    ]
+    assert page_widths(exported) == [[100], [101], [102]]
+
+
+def test_burst_pdf__parallel_chunks_report_throughput(tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "doc.pdf"
+    create_sample_pdf(source, 7)
+    stats = SplitStats()
+
+    exported = burst_pdf(source, tmp_path / "out", pages_per_part=3, workers=2, stats=stats)
+
+    assert [path.name for path in exported] == [
+        "doc_part01_01-03.pdf",
+        "doc_part02_04-06.pdf",
+        "doc_part03_07.pdf",
+    ]
+    assert page_widths(exported) == [[100, 101, 102], [103, 104, 105], [106]]
+    assert stats.parts == 3
+    assert stats.pages == 7
+    assert stats.outputs == exported
+    assert stats.bytes_written == sum(path.stat().st_size for path in exported)
+    assert stats.pages_per_second > 0
+
+
+def create_catalogue_pdf(path: Path, pages: int) -> None:
+    """Every page shares one resource dictionary holding all images, but draws only its own."""
+
+    writer = PdfWriter()
+    xobjects = DictionaryObject()
+    for index in range(pages):
+        image = StreamObject()
+        image.set_data(os.urandom(20_000))
+        image.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(100),
+                NameObject("/Height"): NumberObject(200),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            }
+        )
+        xobjects[NameObject(f"/Im{index}")] = writer._add_object(image)
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    resources = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/XObject"): writer._add_object(xobjects),
+                NameObject("/Font"): DictionaryObject(
+                    {NameObject("/F1"): writer._add_object(font)}
+                ),
+            }
+        )
+    )
+    for index in range(pages):
+        page = writer.add_blank_page(width=100, height=200)
+        content = StreamObject()
+        content.set_data(f"q 100 0 0 200 0 0 cm /Im{index} Do Q".encode("ascii"))
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = resources
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_split_pdf__prunes_unused_resources(tmp_path) -> None:
+    source = tmp_path / "catalogue.pdf"
+    create_catalogue_pdf(source, 6)
+    stats = SplitStats()
+
+    full = split_pdf(source, "1-2,5", tmp_path / "full")
+    pruned = split_pdf(source, "1-2,5", tmp_path / "pruned", prune_resources=True, stats=stats)
+
+    xobject_names = [
+        [sorted(page["/Resources"]["/XObject"]) for page in PdfReader(path).pages]
+        for path in pruned
+    ]
+    assert xobject_names == [[["/Im0"], ["/Im1"]], [["/Im4"]]]
+    assert all("/F1" not in page["/Resources"]["/Font"] for page in PdfReader(pruned[0]).pages)
+    for before, after in zip(full, pruned):
+        saved = before.stat().st_size - after.stat().st_size
+        assert saved > 60_000
+        assert abs(stats.bytes_saved[after] - saved) < saved * 0.05
+    assert stats.total_bytes_saved == sum(stats.bytes_saved.values())
+    # The source document itself keeps every resource.
+    assert len(PdfReader(source).pages[0]["/Resources"]["/XObject"]) == 6
+
+
+def test_burst_pdf__parallel_pruning_reports_savings(tmp_path) -> None:
+    source = tmp_path / "catalogue.pdf"
+    create_catalogue_pdf(source, 4)
+    stats = SplitStats()
+
+    exported = burst_pdf(source, tmp_path / "out", workers=2, prune_resources=True, stats=stats)
+
+    assert list(stats.bytes_saved) == exported
+    assert all(path.stat().st_size < 30_000 for path in exported)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import (
+    QCoreApplication,
+    QPersistentModelIndex,
+    QtMsgType,
+    qInstallMessageHandler,
+)
+from PySide6.QtTest import QAbstractItemModelTester
+
+from pdftools.gui.models import _MAX_REMOVED_RUNS, PathListModel, row_runs
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def model(qapp):
+    """A model of ``p0``..``p9`` checked by Qt's model tester after every change."""
+
+    warnings = []
+
+    def handler(kind, context, message) -> None:
+        if kind != QtMsgType.QtDebugMsg:
+            warnings.append(message)
+
+    previous = qInstallMessageHandler(handler)
+    model = PathListModel()
+    model.add_paths(f"p{row}" for row in range(10))
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield model
+    del tester
+    qInstallMessageHandler(previous)
+    assert warnings == []
+
+
+def persistent(model: PathListModel) -> dict[str, QPersistentModelIndex]:
+    return {path: QPersistentModelIndex(model.index(row)) for row, path in enumerate(model.paths())}
+
+
+def record(signal) -> list:
+    calls = []
+    signal.connect(lambda *args: calls.append(args))
+    return calls
+
+
+def test_row_runs__merges_adjacent_rows() -> None:
+    assert row_runs([5, 3, 4, 9, 1, 1]) == [(1, 1), (3, 5), (9, 9)]
+    assert row_runs([]) == []
+
+
+def test_insert_paths__adds_a_batch_in_one_insert(model) -> None:
+    inserted = record(model.rowsInserted)
+
+    assert model.insert_paths(2, ["a", "b", "c"]) == 3
+
+    assert [(first, last) for _, first, last in inserted] == [(2, 4)]
+    assert model.paths()[:6] == ["p0", "p1", "a", "b", "c", "p2"]
+    assert model.insert_paths(0, []) == 0
+    assert len(inserted) == 1
+
+
+def test_move_rows__moves_each_run_past_one_neighbour(model) -> None:
+    indexes = persistent(model)
+    layout = record(model.layoutChanged)
+
+    assert model.move_rows([2, 1, 5, 8], -1)
+
+    assert model.paths() == ["p1", "p2", "p0", "p3", "p5", "p4", "p6", "p8", "p7", "p9"]
+    assert len(layout) == 1
+    for path, index in indexes.items():
+        assert index.isValid() and model.data(index) == path
+
+
+def test_move_rows__leaves_runs_at_the_edge(model) -> None:
+    indexes = persistent(model)
+
+    assert not model.move_rows([0, 1], -1)
+    assert model.move_rows([3, 8, 9], 1)
+
+    assert model.paths() == ["p0", "p1", "p2", "p4", "p3", "p5", "p6", "p7", "p8", "p9"]
+    assert all(model.data(index) == path for path, index in indexes.items())
+    with pytest.raises(ValueError):
+        model.move_rows([1], 2)
+
+
+def test_remove_rows__removes_run_by_run_and_remaps_indexes(model) -> None:
+    indexes = persistent(model)
+    removed = record(model.rowsRemoved)
+
+    assert model.remove_rows([7, 2, 3, 8, 5, 42]) == 5
+
+    assert [(first, last) for _, first, last in removed] == [(7, 8), (5, 5), (2, 3)]
+    assert model.paths() == ["p0", "p1", "p4", "p6", "p9"]
+    for path, index in indexes.items():
+        if path in model.paths():
+            assert model.data(index) == path
+        else:
+            assert not index.isValid()
+
+
+def test_remove_rows__resets_above_the_run_limit(model) -> None:
+    model.add_paths(f"q{row}" for row in range(2 * _MAX_REMOVED_RUNS))
+    total = model.rowCount()
+    indexes = persistent(model)
+    reset = record(model.modelReset)
+    removed = record(model.rowsRemoved)
+    every_other = range(0, total, 2)
+
+    assert model.remove_rows(every_other) == len(every_other)
+
+    assert (len(reset), removed) == (1, [])
+    assert model.rowCount() == total - len(every_other)
+    assert model.paths()[:3] == ["p1", "p3", "p5"]
+    assert not any(index.isValid() for index in indexes.values())
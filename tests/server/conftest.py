@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from pdftools.server.app import app
+from pdftools.server.metrics import ServerMetrics
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """A client whose server keeps its result cache and job files under ``tmp_path``.
+
+    Each client also starts from fresh metrics.
+    """
+
+    monkeypatch.setenv("PDFTOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("PDFTOOLS_JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(app.state, "metrics", ServerMetrics())
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from pdftools.server.cache import result_key
+
+
+def test_result_key__covers_version_params_and_input_order(monkeypatch) -> None:
+    first, second = io.BytesIO(b"first"), io.BytesIO(b"second")
+    key = result_key("merge", {"a": "1", "b": "2"}, [first, second])
+
+    assert result_key("merge", {"b": "2", "a": "1"}, [first, second]) == key
+    assert first.tell() == 0 and second.tell() == 0
+    assert result_key("merge", {"a": "1", "b": "3"}, [first, second]) != key
+    assert result_key("split", {"a": "1", "b": "2"}, [first, second]) != key
+    assert result_key("merge", {"a": "1", "b": "2"}, [second, first]) != key
+
+    monkeypatch.setattr("pdftools.server.cache.__version__", "0.0.0-other")
+
+    assert result_key("merge", {"a": "1", "b": "2"}, [first, second]) != key
+
+
+@pytest.fixture
+def pdf_upload(tmp_path, create_sample_pdf) -> list:
+    source = tmp_path / "a.pdf"
+    create_sample_pdf(source, 2)
+    return [("files", ("a.pdf", source.read_bytes(), "application/pdf"))] * 2
+
+
+def test_merge_endpoint__reports_cache_miss_then_hit(client, pdf_upload) -> None:
+    miss = client.post("/merge", files=pdf_upload)
+    hit = client.post("/merge", files=pdf_upload)
+
+    assert (miss.status_code, hit.status_code) == (200, 200)
+    assert (miss.headers["x-cache"], hit.headers["x-cache"]) == ("miss", "hit")
+    assert hit.headers["etag"] == miss.headers["etag"]
+    assert hit.content == miss.content
+
+
+def test_merge_endpoint__answers_304_to_a_matching_etag(client, pdf_upload) -> None:
+    etag = client.post("/merge", files=pdf_upload).headers["etag"]
+
+    response = client.post("/merge", files=pdf_upload, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    stale = client.post("/merge", files=pdf_upload, headers={"If-None-Match": 'W/"other"'})
+    assert stale.status_code == 200
+
+
+def test_split_endpoint__keys_on_the_ranges(client, tmp_path, create_sample_pdf) -> None:
+    source = tmp_path / "a.pdf"
+    create_sample_pdf(source, 3)
+    upload = {"file": ("a.pdf", source.read_bytes(), "application/pdf")}
+
+    first = client.post("/split", files=upload, data={"ranges": "1"})
+    other = client.post("/split", files=upload, data={"ranges": "2-3"})
+    again = client.post("/split", files=upload, data={"ranges": "1"})
+
+    assert [response.headers["x-cache"] for response in (first, other, again)] == [
+        "miss",
+        "miss",
+        "hit",
+    ]
+    assert first.headers["etag"] != other.headers["etag"]
+    assert again.content == first.content
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import dataclasses
+import io
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pypdf import PdfReader
+
+from pdftools.server.app import app
+
+
+def sleeping_job(inputs: list[Path], result: Path, *, progress: Callable[[float], None]) -> int:
+    """Stands in for ``merge_job``: reports some progress, then runs until it is killed."""
+
+    progress(0.5)
+    time.sleep(60)
+    return 0
+
+
+@pytest.fixture
+def pdf_upload(tmp_path, create_sample_pdf) -> list:
+    source = tmp_path / "a.pdf"
+    create_sample_pdf(source, 2)
+    return [("files", ("a.pdf", source.read_bytes(), "application/pdf"))] * 2
+
+
+def configure(**changes) -> None:
+    jobs = app.state.jobs
+    jobs.settings = dataclasses.replace(jobs.settings, **changes)
+
+
+def wait_for(client, job_id: str, done: Callable[[dict], bool], timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        state = client.get(f"/jobs/{job_id}").json()
+        if done(state):
+            return state
+        assert time.monotonic() < deadline, f"job stuck in {state}"
+        time.sleep(0.05)
+
+
+def test_merge_job__result_is_served_once_succeeded(client, pdf_upload) -> None:
+    response = client.post("/jobs/merge", files=pdf_upload)
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+    state = wait_for(client, job_id, lambda state: state["status"] == "succeeded")
+    assert state["progress"] == 1.0
+
+    result = client.get(f"/jobs/{job_id}/result")
+
+    assert result.status_code == 200
+    assert result.headers["content-type"] == "application/pdf"
+    assert len(PdfReader(io.BytesIO(result.content)).pages) == 4
+
+
+def test_job_result__conflicts_until_the_job_succeeds(client, pdf_upload, monkeypatch) -> None:
+    monkeypatch.setattr("pdftools.server.app.merge_job", sleeping_job)
+    job_id = client.post("/jobs/merge", files=pdf_upload).json()["id"]
+
+    response = client.get(f"/jobs/{job_id}/result")
+
+    assert response.status_code == 409
+    assert client.get("/jobs/unknown/result").status_code == 404
+
+
+def test_submit_job__full_queue_answers_429_with_retry_after(
+    client, pdf_upload, monkeypatch
+) -> None:
+    monkeypatch.setattr("pdftools.server.app.merge_job", sleeping_job)
+    configure(workers=1, queue_depth=1)
+    first = client.post("/jobs/merge", files=pdf_upload)
+    second = client.post("/jobs/merge", files=pdf_upload)
+
+    rejected = client.post("/jobs/merge", files=pdf_upload)
+
+    assert (first.status_code, second.status_code) == (202, 202)
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "5"
+
+    client.delete(f"/jobs/{first.json()['id']}")
+    assert client.post("/jobs/merge", files=pdf_upload).status_code == 202
+
+
+def test_cancel_job__kills_a_running_job(client, pdf_upload, monkeypatch) -> None:
+    monkeypatch.setattr("pdftools.server.app.merge_job", sleeping_job)
+    job_id = client.post("/jobs/merge", files=pdf_upload).json()["id"]
+    wait_for(client, job_id, lambda state: state["progress"] == 0.5)
+    process = app.state.jobs.get(job_id)._process
+
+    response = client.delete(f"/jobs/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    process.join(timeout=10)
+    assert not process.is_alive()
+    time.sleep(0.2)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "cancelled"
+    assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+
+def test_job__killed_once_it_exceeds_the_time_limit(client, pdf_upload, monkeypatch) -> None:
+    monkeypatch.setattr("pdftools.server.app.merge_job", sleeping_job)
+    configure(time_limit=1.0)
+    job_id = client.post("/jobs/merge", files=pdf_upload).json()["id"]
+
+    state = wait_for(client, job_id, lambda state: state["finished"] is not None)
+
+    assert state["status"] == "failed"
+    assert state["error"] == "Job exceeded its time limit of 1s."
+    assert state["finished"] - state["started"] < 5
+
+
+def test_finished_jobs__are_purged_after_retention(client, pdf_upload) -> None:
+    job_id = client.post("/jobs/merge", files=pdf_upload).json()["id"]
+    wait_for(client, job_id, lambda state: state["status"] == "succeeded")
+    directory = app.state.jobs.get(job_id).directory
+    assert directory.is_dir()
+
+    configure(retention=0.0)
+
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert not directory.exists()
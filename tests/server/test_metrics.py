@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pdftools.server.metrics import CONTENT_TYPE, Counter, Gauge, Histogram
+
+
+def test_histogram__renders_cumulative_buckets_sum_and_count() -> None:
+    histogram = Histogram("op_seconds", "Time per operation.", ("operation",), buckets=(2.5, 1))
+    for value in (0.5, 2.5, 7.0):
+        histogram.observe("merge", value=value)
+
+    assert list(histogram.render()) == [
+        "# HELP op_seconds Time per operation.",
+        "# TYPE op_seconds histogram",
+        'op_seconds_bucket{operation="merge",le="1.0"} 1',
+        'op_seconds_bucket{operation="merge",le="2.5"} 2',
+        'op_seconds_bucket{operation="merge",le="+Inf"} 3',
+        'op_seconds_sum{operation="merge"} 10.0',
+        'op_seconds_count{operation="merge"} 3',
+    ]
+
+
+def test_counter__escapes_label_values() -> None:
+    counter = Counter("errors_total", "Errors.", ("path",))
+    counter.inc('C:\\in "quotes"\nnext', amount=2)
+
+    assert list(counter.render())[-1] == 'errors_total{path="C:\\\\in \\"quotes\\"\\nnext"} 2'
+
+
+def test_gauge__reads_its_source_at_scrape_time() -> None:
+    values = [((), 1)]
+    gauge = Gauge("queue_depth", "Jobs waiting.", source=lambda: values)
+    assert list(gauge.render())[-1] == "queue_depth 1"
+
+    values = [((), 4)]
+
+    assert list(gauge.render())[-1] == "queue_depth 4"
+
+
+def test_metrics_endpoint__reports_completed_operations(
+    client, tmp_path, create_sample_pdf
+) -> None:
+    source = tmp_path / "a.pdf"
+    create_sample_pdf(source, 2)
+    upload = [("files", ("a.pdf", source.read_bytes(), "application/pdf"))] * 2
+    assert client.post("/merge", files=upload).status_code == 200
+    assert client.post("/merge", files=upload).status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    lines = response.text.splitlines()
+    assert 'pdftools_pages_total{operation="merge"} 4' in lines
+    assert 'pdftools_operation_duration_seconds_count{operation="merge",mode="sync"} 1' in lines
+    assert (
+        'pdftools_operation_duration_seconds_bucket{operation="merge",mode="sync",le="+Inf"} 1'
+        in lines
+    )
+    assert 'pdftools_cache_lookups_total{outcome="hit"} 1' in lines
+    assert 'pdftools_cache_lookups_total{outcome="miss"} 1' in lines
+    assert 'pdftools_jobs{status="queued"} 0' in lines
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import NameObject, NumberObject, StreamObject
+
+from pdftools.server.app import app
+from pdftools.server.uploads import UploadLimits
+
+
+def create_image_pdf(path: Path, pages: int, *, image_bytes: int = 1_000) -> None:
+    """Pages that each carry one incompressible image of ``image_bytes``."""
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        image = StreamObject()
+        image.set_data(os.urandom(image_bytes))
+        image.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(1),
+                NameObject("/Height"): NumberObject(image_bytes // 3),
+                NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            }
+        )
+        page = writer.add_blank_page(width=100, height=100)
+        page[NameObject("/Resources")] = writer._add_object(image)
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+
+def test_merge_endpoint__streams_merged_pdf(client, tmp_path) -> None:
+    source = tmp_path / "a.pdf"
+    create_image_pdf(source, 2)
+    data = source.read_bytes()
+
+    response = client.post("/merge", files=[("files", ("a.pdf", data, "application/pdf"))] * 3)
+
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "miss"
+    assert int(response.headers["content-length"]) == len(response.content)
+    merged = tmp_path / "merged.pdf"
+    merged.write_bytes(response.content)
+    assert len(PdfReader(merged).pages) == 6
+
+
+def test_merge_endpoint__rejects_oversized_body(client, monkeypatch) -> None:
+    monkeypatch.setattr(app.state, "upload_limits", UploadLimits(max_request_bytes=1024))
+
+    response = client.post("/merge", files=[("files", ("a.pdf", b"x" * 4096, "application/pdf"))])
+
+    assert response.status_code == 413
+
+
+# TestClient reads the whole request body into memory and buffers the response, which
+# would hide the server's own footprint, so the script drives the ASGI app directly with
+# a body streamed from disk and discards the response as it arrives.
+_PEAK_RSS_SCRIPT = """
+import asyncio, sys
+from pdftools.core.stats import peak_rss_bytes
+from pdftools.server.app import app
+
+source, count = sys.argv[1], int(sys.argv[2])
+boundary = "pdftoolsboundary"
+
+
+def body():
+    for index in range(count):
+        yield (
+            f"--{boundary}\\r\\nContent-Disposition: form-data; name=\\"files\\"; "
+            f"filename=\\"{index}.pdf\\"\\r\\nContent-Type: application/pdf\\r\\n\\r\\n"
+        ).encode()
+        with open(source, "rb") as handle:
+            while chunk := handle.read(64 * 1024):
+                yield chunk
+        yield b"\\r\\n"
+    yield f"--{boundary}--\\r\\n".encode()
+
+
+async def main():
+    chunks = body()
+    status, received = [], 0
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal chunks
+        if chunks is None:
+            # The body has been sent; like a real server, wait until the response is over.
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        chunk = next(chunks, None)
+        if chunk is None:
+            chunks = None
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    content_type = f"multipart/form-data; boundary={boundary}".encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/merge", "raw_path": b"/merge",
+        "query_string": b"", "root_path": "", "headers": [(b"content-type", content_type)],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return status[0], received
+
+
+status, received = asyncio.run(main())
+print(status, received, peak_rss_bytes())
+"""
+
+
+def _peak_rss_of_merge_request(source: Path, count: int, image_bytes: int) -> int:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(source), str(count)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(sys.path),
+            "PDFTOOLS_CACHE_MAX_BYTES": "0",
+        },
+    )
+    status, received, peak = (int(value) for value in completed.stdout.split())
+    assert status == 200
+    assert received > count * image_bytes
+    return peak
+
+
+def test_merge_endpoint__peak_memory_stays_flat_as_upload_grows(tmp_path) -> None:
+    pytest.importorskip("resource")
+    source = tmp_path / "large.pdf"
+    # ~8 MB per uploaded file; 24 files add ~190 MB of upload and ~190 MB of output.
+    create_image_pdf(source, 2, image_bytes=4_000_000)
+
+    few = _peak_rss_of_merge_request(source, 2, 8_000_000)
+    many = _peak_rss_of_merge_request(source, 24, 8_000_000)
+
+    assert many - few < 48 * 1024 * 1024
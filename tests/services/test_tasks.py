@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+
+from pdftools.core.buffers import atomic_write
+from pdftools.core.events import PAGE, STAGE_END, STAGE_START, Event
+from pdftools.services import tasks
+from pdftools.services.tasks import (
+    TaskCancelled,
+    TaskRunner,
+    TaskState,
+    Worker,
+    _Throttle,
+)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def process_events_until(qapp, condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def page(pages: int, total: int = 10) -> Event:
+    return Event(PAGE, "split", pages=pages, total_pages=total)
+
+
+# Process task targets live at module level so the spawned process can import them.
+
+
+def write_pages(total: int, *, observer: Callable[[Event], None]) -> int:
+    for pages in range(1, total + 1):
+        observer(page(pages, total))
+    return total
+
+
+def sleep_after_writing_pid(path: str) -> None:
+    with open(path, "w") as handle:
+        handle.write(str(os.getpid()))
+    time.sleep(60)
+
+
+def sleep_while_staging(directory: str, pid_path: str) -> None:
+    with atomic_write(Path(directory) / "out.pdf") as handle:
+        handle.write(b"%PDF-")
+        sleep_after_writing_pid(pid_path)
+
+
+def exit_abruptly(code: int) -> None:
+    os._exit(code)
+
+
+def run_to_end(qapp, runner: TaskRunner, fn: Callable, *args, **kwargs) -> tuple:
+    outcome = []
+    task = runner.run(
+        fn,
+        *args,
+        on_finished=lambda result: outcome.append(("finished", result)),
+        on_failed=lambda error: outcome.append(("failed", error)),
+        on_cancelled=lambda: outcome.append(("cancelled", None)),
+        process=True,
+        **kwargs,
+    )
+    process_events_until(qapp, lambda: outcome, timeout=60)
+    return task, outcome[0]
+
+
+def test_throttle__passes_one_event_per_interval_plus_final_ones(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(tasks.time, "monotonic", lambda: now[0])
+    throttle = _Throttle(1.0)
+
+    assert throttle.due(page(1))
+    assert not throttle.due(page(2))
+    assert throttle.due(Event(STAGE_END, "split", stage="write"))
+    assert not throttle.due(Event(STAGE_START, "split", stage="write"))
+    assert throttle.due(page(10))
+    now[0] += 1.0
+    assert throttle.due(page(3))
+
+
+def test_worker_observe__throttles_progress_and_raises_once_cancelled(qapp) -> None:
+    worker = Worker(lambda: None)
+    worker.progress_interval = 3600
+    emitted = []
+    worker.signals.progress.connect(emitted.append)
+
+    for pages in range(1, 11):
+        worker.observe(page(pages))
+
+    assert [event.pages for event in emitted] == [1, 10]
+    assert worker.last_event.pages == 10
+    worker.token.cancel()
+    with pytest.raises(TaskCancelled):
+        worker.observe(page(1))
+
+
+def test_task_runner__orders_queue_by_priority_and_drops_cancelled_tasks(qapp) -> None:
+    runner = TaskRunner(max_workers=1)
+    gate = threading.Event()
+    ran = []
+    blocker = runner.run(gate.wait, 30, name="blocker")
+    process_events_until(qapp, lambda: blocker.state is TaskState.RUNNING)
+
+    low = runner.run(ran.append, "low", name="low")
+    dropped = runner.run(ran.append, "dropped", priority=1, name="dropped")
+    high = runner.run(ran.append, "high", priority=5, name="high")
+
+    assert runner.tasks() == [blocker, high, dropped, low]
+    assert (runner.queued_count(), runner.running_count()) == (3, 1)
+
+    cancelled = []
+    runner.task_cancelled.connect(lambda: cancelled.append(True))
+    dropped.cancel()
+
+    assert dropped.state is TaskState.CANCELLED and dropped.cancelled
+    assert cancelled == [True]
+    assert runner.tasks() == [blocker, high, low]
+    assert runner.queued_count() == 2
+
+    gate.set()
+    assert runner.wait(10_000)
+    process_events_until(qapp, lambda: not runner.tasks())
+
+    assert ran == ["high", "low"]
+    assert (blocker.state, high.state, low.state) == (TaskState.FINISHED,) * 3
+    assert runner.queued_count() == 0
+
+
+def test_process_task__sends_throttled_progress_across_the_pipe(qapp) -> None:
+    runner = TaskRunner(max_workers=1, progress_interval=3600)
+    events = []
+
+    task, outcome = run_to_end(
+        qapp, runner, write_pages, 50, observed=True, on_progress=events.append
+    )
+    process_events_until(qapp, lambda: task.state.done)
+
+    assert outcome == ("finished", 50)
+    assert task.state is TaskState.FINISHED
+    assert [event.pages for event in events] == [1, 50]
+    assert task.progress == page(50, 50)
+
+
+def test_process_task__cancel_kills_the_running_process(qapp, tmp_path) -> None:
+    runner = TaskRunner(max_workers=1)
+    pid_file = tmp_path / "pid"
+    cancelled = []
+    task = runner.run(
+        sleep_after_writing_pid,
+        str(pid_file),
+        on_cancelled=lambda: cancelled.append(True),
+        process=True,
+    )
+    process_events_until(qapp, lambda: pid_file.exists() and pid_file.read_text(), timeout=60)
+
+    task.cancel()
+    assert runner.wait(10_000)
+    process_events_until(qapp, lambda: cancelled)
+
+    assert task.state is TaskState.CANCELLED
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def test_process_task__cancel_lets_the_process_remove_staged_files(qapp, tmp_path) -> None:
+    runner = TaskRunner(max_workers=1)
+    output, pid_file = tmp_path / "out", tmp_path / "pid"
+    cancelled = []
+    task = runner.run(
+        sleep_while_staging,
+        str(output),
+        str(pid_file),
+        on_cancelled=lambda: cancelled.append(True),
+        process=True,
+    )
+    process_events_until(qapp, lambda: pid_file.exists() and pid_file.read_text(), timeout=60)
+    assert len(list(output.iterdir())) == 1
+
+    task.cancel()
+    assert runner.wait(10_000)
+    process_events_until(qapp, lambda: cancelled)
+
+    assert list(output.iterdir()) == []
+
+
+def test_process_task__unpicklable_argument_fails_the_task(qapp) -> None:
+    runner = TaskRunner(max_workers=1)
+
+    task, (kind, error) = run_to_end(qapp, runner, write_pages, lambda: None)
+
+    assert kind == "failed"
+    assert "pickle" in error.lower()
+    process_events_until(qapp, lambda: task.state is TaskState.FAILED)
+
+
+def test_process_task__crashed_process_fails_with_its_exit_code(qapp) -> None:
+    runner = TaskRunner(max_workers=1)
+
+    task, outcome = run_to_end(qapp, runner, exit_abruptly, 3)
+
+    assert outcome == ("failed", "Task process exited with code 3.")
+    process_events_until(qapp, lambda: task.state is TaskState.FAILED)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from pdftools.services import thumbnails
+from pdftools.services.thumbnails import ThumbnailCache
+
+
+def create_image(path: Path, color: tuple[int, int, int], size: tuple[int, int] = (80, 60)) -> Path:
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+def create_noise_image(path: Path) -> Path:
+    """An image whose thumbnail does not compress, so its size is predictable."""
+
+    Image.frombytes("RGB", (80, 60), os.urandom(80 * 60 * 3)).save(path)
+    return path
+
+
+@pytest.fixture
+def renders(monkeypatch) -> list:
+    """Records every rendered thumbnail while still rendering it."""
+
+    calls = []
+    render = thumbnails.render_thumbnail
+
+    def counting(path, size):
+        calls.append((Path(path).name, size))
+        return render(path, size)
+
+    monkeypatch.setattr(thumbnails, "render_thumbnail", counting)
+    return calls
+
+
+def test_thumbnail_cache__renders_once_per_content_and_size(tmp_path, renders) -> None:
+    cache = ThumbnailCache(tmp_path / "cache")
+    image = create_image(tmp_path / "a.png", (255, 0, 0))
+
+    first = cache.thumbnail(image, 32)
+    again = cache.thumbnail(image, 32)
+    cache.thumbnail(image, 16)
+
+    assert again == first
+    with Image.open(io.BytesIO(first)) as thumbnail:
+        assert thumbnail.size == (32, 24)
+    assert renders == [("a.png", 32), ("a.png", 16)]
+
+
+def test_thumbnail_cache__key_follows_content_and_size(tmp_path) -> None:
+    cache = ThumbnailCache(tmp_path / "cache")
+    image = create_image(tmp_path / "a.png", (255, 0, 0))
+    key = cache._key(image, 32)
+
+    assert cache._key(image, 64) != key
+    assert cache._key(create_image(tmp_path / "b.png", (255, 0, 0)), 32) == key
+
+    create_image(image, (0, 0, 255), size=(60, 80))
+    os.utime(image, ns=(0, image.stat().st_mtime_ns + 1_000_000))
+
+    assert cache._key(image, 32) != key
+
+
+def test_thumbnail_cache__reuses_the_stored_digest(tmp_path) -> None:
+    image = create_image(tmp_path / "a.png", (255, 0, 0))
+    key = ThumbnailCache(tmp_path / "cache")._key(image, 32)
+    stat = image.stat()
+
+    # Same size and modification time: a new instance trusts the stored digest
+    # rather than reading the file again.
+    image.write_bytes(bytes(reversed(image.read_bytes())))
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert ThumbnailCache(tmp_path / "cache")._key(image, 32) == key
+
+
+def test_thumbnail_cache__stays_within_max_bytes(tmp_path, renders) -> None:
+    # Each 24 x 18 pixel noise thumbnail takes about 1.2 KB, so three fit.
+    cache = ThumbnailCache(tmp_path / "cache", max_bytes=4096)
+    images = [create_noise_image(tmp_path / f"{index}.png") for index in range(6)]
+    for image in images:
+        cache.thumbnail(image, 24)
+
+    stored = [path for path in (tmp_path / "cache").glob("*/*") if not path.name.startswith(".")]
+    assert sum(path.stat().st_size for path in stored) <= 4096
+    assert 0 < len(stored) < len(images)
+
+    cache.thumbnail(images[-1], 24)
+    cache.thumbnail(images[0], 24)
+
+    assert renders.count(("5.png", 24)) == 1
+    assert renders.count(("0.png", 24)) == 2